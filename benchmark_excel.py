@@ -0,0 +1,201 @@
+import argparse
+import csv
+import os
+import time
+import tracemalloc
+
+from openpyxl import Workbook, load_workbook
+
+from utils.config import output_dir
+from utils.template import SAMPLE_FILE, BOUNDARY_SHEET
+
+
+class Phases:
+    """Accumulates wall time per named phase: `with phases("save"): ...`"""
+
+    def __init__(self):
+        self.times = {}
+        self._name = None
+
+    def __call__(self, name):
+        self._name = name
+        return self
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.times[self._name] = self.times.get(self._name, 0.0) + time.perf_counter() - self._start
+
+
+def sample_headers(columns):
+    """Header row of the reference sample, padded or trimmed to `columns`"""
+    wb = load_workbook(SAMPLE_FILE, read_only=True)
+    headers = list(next(wb[BOUNDARY_SHEET].iter_rows(max_row=1, values_only=True)))
+    wb.close()
+    return (headers + [f"Extra {i}" for i in range(len(headers), columns)])[:columns]
+
+
+def build_template(path, headers):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = BOUNDARY_SHEET
+    ws.append(headers)
+    wb.save(path)
+    return path
+
+
+def build_rows(count, columns):
+    """Boundary-like data: hierarchy names repeating per level, then numeric coordinates"""
+    names = columns - 2
+    return [tuple(f"Boundary {c}-{r // (4 ** max(0, names - 1 - c))}" for c in range(names))
+            + (round(-15.0 + r * 1e-4, 6), round(33.0 + r * 1e-4, 6)) for r in range(count)]
+
+
+def fill_cell_by_cell(template, rows, out, phases):
+    """What populate_template does today: ws.cell() for every value in the loaded template"""
+    with phases("load"):
+        wb = load_workbook(template)
+        ws = wb[BOUNDARY_SHEET]
+    with phases("fill"):
+        for row_idx, row in enumerate(rows, start=2):
+            for col_idx, value in enumerate(row, start=1):
+                ws.cell(row=row_idx, column=col_idx, value=value)
+    with phases("save"):
+        wb.save(out)
+    wb.close()
+
+
+def fill_row_append(template, rows, out, phases):
+    """ws.append() per row; any pre-formatted empty rows are removed first so data starts at row 2"""
+    with phases("load"):
+        wb = load_workbook(template)
+        ws = wb[BOUNDARY_SHEET]
+    with phases("fill"):
+        if ws.max_row > 1:
+            ws.delete_rows(2, ws.max_row - 1)
+        for row in rows:
+            ws.append(row)
+    with phases("save"):
+        wb.save(out)
+    wb.close()
+
+
+def fill_write_only(template, rows, out, phases):
+    """Stream a new workbook: every template sheet's values are copied, Boundary Data rows replaced.
+    Styles, data validations and column widths of the template are not carried over."""
+    with phases("load"):
+        src = load_workbook(template, read_only=True)
+        wb = Workbook(write_only=True)
+    with phases("fill"):
+        for name in src.sheetnames:
+            ws = wb.create_sheet(name)
+            source_rows = src[name].iter_rows(values_only=True)
+            if name == BOUNDARY_SHEET:
+                ws.append(next(source_rows))
+                source_rows = rows
+            for row in source_rows:
+                ws.append(row)
+        src.close()
+    with phases("save"):
+        wb.save(out)
+
+
+STRATEGIES = {
+    "cell_by_cell": fill_cell_by_cell,
+    "row_append": fill_row_append,
+    "write_only": fill_write_only,
+}
+
+
+def verify(out, headers, rows, phases):
+    """Read the output back in read-only mode and check headers, row count and every value"""
+    with phases("verify"):
+        wb = load_workbook(out, read_only=True)
+        read = wb[BOUNDARY_SHEET].iter_rows(values_only=True)
+        ok = list(next(read)) == list(headers)
+        count = 0
+        for expected, actual in zip(rows, read):
+            ok = ok and tuple(actual[:len(expected)]) == expected
+            count += 1
+        wb.close()
+    return ok and count == len(rows)
+
+
+def run_once(strategy, template, headers, rows, out):
+    phases = Phases()
+    STRATEGIES[strategy](template, rows, out, phases)
+    ok = verify(out, headers, rows, phases)
+    return phases.times, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark template population strategies (time and peak memory)")
+    parser.add_argument("--rows", default="1000,10000,50000", help="Comma-separated data row counts")
+    parser.add_argument("--columns", default="12", help="Comma-separated column widths (the real template has 12); ignored with --template")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES), help="Comma-separated subset of strategies")
+    parser.add_argument("--template", help="Downloaded template to populate (default: one built from the sample headers)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the best is reported")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the extra traced run that measures peak memory (tracemalloc is slow)")
+    parser.add_argument("--csv", default=os.path.join(output_dir, "benchmarks", "excel.csv"))
+    args = parser.parse_args()
+
+    work_dir = os.path.join(output_dir, "benchmarks")
+    os.makedirs(work_dir, exist_ok=True)
+    strategies = args.strategies.split(",")
+    results = []
+
+    print(f"{'STRATEGY':<14} {'ROWS':>7} {'COLS':>5} {'LOAD s':>8} {'FILL s':>8} {'SAVE s':>8} {'VERIFY s':>9} "
+          f"{'TOTAL s':>8} {'PEAK MiB':>9} {'KiB':>7} {'OK':>3}")
+    widths = [int(c) for c in args.columns.split(",")] if not args.template else [None]
+    for columns in widths:
+        if args.template:
+            template = args.template
+            wb = load_workbook(template, read_only=True)
+            headers = list(next(wb[BOUNDARY_SHEET].iter_rows(max_row=1, values_only=True)))
+            wb.close()
+            columns = len(headers)
+        else:
+            headers = sample_headers(columns)
+            template = build_template(os.path.join(work_dir, f"template_{columns}.xlsx"), headers)
+
+        for count in [int(r) for r in args.rows.split(",")]:
+            rows = build_rows(count, columns)
+            for strategy in strategies:
+                out = os.path.join(work_dir, f"{strategy}_{count}x{columns}.xlsx")
+                best = None
+                ok = True
+                for _ in range(args.repeat):
+                    times, run_ok = run_once(strategy, template, headers, rows, out)
+                    ok = ok and run_ok
+                    if best is None or sum(times.values()) < sum(best.values()):
+                        best = times
+
+                peak = None
+                if not args.no_memory:
+                    tracemalloc.start()
+                    run_once(strategy, template, headers, rows, out)
+                    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                    tracemalloc.stop()
+
+                row = {"strategy": strategy, "rows": count, "columns": columns,
+                       **{f"{phase}_s": round(best.get(phase, 0.0), 4) for phase in ("load", "fill", "save", "verify")},
+                       "total_s": round(sum(best.values()), 4),
+                       "peak_mib": round(peak, 1) if peak is not None else "",
+                       "file_kib": round(os.path.getsize(out) / 1024, 1), "ok": ok}
+                results.append(row)
+                print(f"{strategy:<14} {count:>7} {columns:>5} {row['load_s']:>8.3f} {row['fill_s']:>8.3f} "
+                      f"{row['save_s']:>8.3f} {row['verify_s']:>9.3f} {row['total_s']:>8.3f} "
+                      f"{(f'{peak:.1f}' if peak is not None else '-'):>9} {row['file_kib']:>7.0f} {'yes' if ok else 'NO':>3}")
+
+    os.makedirs(os.path.dirname(args.csv) or ".", exist_ok=True)
+    with open(args.csv, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0]))
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"\nResults written to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+import argparse
+import csv
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from urllib.parse import urlparse
+
+from openpyxl import Workbook
+
+from utils.api_client import APIClient
+from utils.auth import get_auth_token
+from utils.boundary_stream import stream_boundary_nodes, TreeSummary
+from utils.config import BASE_URL, tenantId, locale, output_dir
+from utils.data_loader import load_payload
+from utils.filestore import get_download_url, download_file
+from utils.localization_coverage import fetch_codes
+from utils.metrics import rss_bytes
+from utils.request_info import get_request_info
+from utils.template import BOUNDARY_SHEET
+from utils.xlsx_reader import XlsxReader
+
+PHASES = ("hierarchy_create", "generate", "template_download", "populate", "upload", "process",
+          "relationship_search", "localization_search")
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class RssSampler:
+    """Peak resident memory of this process while a phase runs, sampled every `interval` seconds"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start = self.peak = rss_bytes()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes())
+
+
+def boundary_paths(count, levels, fanout):
+    """`count` boundary paths in breadth-first order (parents before children), `fanout` children each"""
+    queue = deque([()])
+    emitted = 0
+    while queue and emitted < count:
+        parent = queue.popleft()
+        if len(parent) == levels:
+            continue
+        for _ in range(1 if not parent else fanout):
+            if emitted == count:
+                return
+            emitted += 1
+            path = parent + (f"B{emitted}",)
+            queue.append(path)
+            yield path
+    if emitted < count:
+        raise ValueError(f"{levels} levels with fanout {fanout} hold fewer than {count} boundaries; raise --fanout")
+
+
+def populate(template, out, count, fanout, hierarchy_type):
+    """Upload file with one row per boundary: its path in the level columns of the template"""
+    with XlsxReader(template) as reader:
+        headers = list(next(reader.iter_rows(BOUNDARY_SHEET if BOUNDARY_SHEET in reader.sheetnames else None)))
+    levels = sum(1 for h in headers if str(h or "").startswith(f"{hierarchy_type}_"))
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(BOUNDARY_SHEET)
+    ws.append(headers)
+    padding = [None] * (len(headers) - levels)
+    for i, path in enumerate(boundary_paths(count, levels, fanout)):
+        row = list(path) + [None] * (levels - len(path)) + padding
+        if len(headers) >= levels + 2:
+            row[-2:] = [round(-15.0 + i * 1e-6, 6), round(33.0 + i * 1e-6, 6)]
+        ws.append(row)
+    wb.save(out)
+
+
+def poll(client, token, endpoint, payload_file, set_criteria, done, interval, timeout):
+    """POST the search until done(data) returns a value; raise on failure or timeout"""
+    payload = load_payload("boundary_management", payload_file)
+    set_criteria(payload)
+    deadline = time.monotonic() + timeout
+    while True:
+        payload["RequestInfo"] = get_request_info(token)
+        payload["RequestInfo"]["userInfo"]["tenantId"] = tenantId
+        response = client.post(endpoint, payload)
+        assert response.status_code == 200, f"{endpoint.split('?')[0]} failed: {response.text[:300]}"
+        result = done(response.json())
+        if result:
+            return result
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{endpoint.split('?')[0]} not completed after {timeout:.0f} s")
+        time.sleep(interval)
+
+
+def run_size(client, token, count, args, work_dir):
+    """Run the workflow for one hierarchy of `count` boundaries; returns {phase: (seconds, rss_start, rss_peak)}"""
+    hierarchy_type = f"SCALE_{uuid.uuid4().hex[:8].upper()}"
+    template = os.path.join(work_dir, f"scaling_{count}_template.xlsx")
+    upload = os.path.join(work_dir, f"scaling_{count}_upload.xlsx")
+    results = {}
+    state = {}
+
+    def hierarchy_create():
+        payload = load_payload("boundary_hierarchy", "create_hierarchy.json")
+        payload["RequestInfo"] = get_request_info(token)
+        payload["BoundaryHierarchy"]["tenantId"] = tenantId
+        payload["BoundaryHierarchy"]["hierarchyType"] = hierarchy_type
+        response = client.post("/boundary-service/boundary-hierarchy-definition/_create", payload)
+        assert response.status_code == 202, f"Hierarchy creation failed: {response.text[:300]}"
+
+    def generate():
+        payload = load_payload("boundary_management", "generate_data.json")
+        payload["RequestInfo"] = get_request_info(token)
+        payload["RequestInfo"]["userInfo"]["tenantId"] = tenantId
+        response = client.post(f"/boundary-management/v1/_generate?tenantId={tenantId}&forceUpdate=true"
+                               f"&hierarchyType={hierarchy_type}", payload)
+        assert response.status_code == 200, f"Generate failed: {response.text[:300]}"
+
+        def completed(data):
+            resources = data.get("GeneratedResource") or [{}]
+            if resources[0].get("status") == "failed":
+                raise AssertionError(f"Generate failed: {resources[0]}")
+            return resources[0].get("fileStoreid") if resources[0].get("status") == "completed" else None
+
+        state["template"] = poll(client, token, f"/boundary-management/v1/_generate-search?tenantId={tenantId}"
+                                 f"&hierarchyType={hierarchy_type}", "generate_search.json", lambda p: None,
+                                 completed, args.poll_interval, args.timeout)
+
+    def template_download():
+        download_file(get_download_url(client, state["template"]), template)
+
+    def upload_file():
+        with open(upload, "rb") as f:
+            content = f.read()
+        response = client.upload("/filestore/v1/files", {"file": (os.path.basename(upload), content, XLSX_MIME)},
+                                 {"tenantId": tenantId, "module": "HCM-ADMIN-CONSOLE"})
+        assert response.status_code in (200, 201), f"Upload failed: {response.text[:300]}"
+        state["upload"] = response.json()["files"][0]["fileStoreId"]
+
+    def process():
+        payload = load_payload("boundary_management", "process_data.json")
+        payload["RequestInfo"] = get_request_info(token)
+        payload["RequestInfo"]["userInfo"]["tenantId"] = tenantId
+        payload["ResourceDetails"].update(tenantId=tenantId, fileStoreId=state["upload"], hierarchyType=hierarchy_type)
+        response = client.post("/boundary-management/v1/_process", payload)
+        assert response.status_code == 200, f"Process failed: {response.text[:300]}"
+        process_id = response.json()["ResourceDetails"]["id"]
+
+        def set_criteria(p):
+            p["SearchCriteria"]["id"] = [process_id]
+            p["SearchCriteria"]["tenantId"] = tenantId
+
+        def completed(data):
+            resources = data.get("ResourceDetails") or [{}]
+            if resources[0].get("status") == "failed":
+                raise AssertionError(f"Process failed: {resources[0]}")
+            return resources[0].get("status") == "completed"
+
+        poll(client, token, "/boundary-management/v1/_process-search", "process_search.json", set_criteria,
+             completed, args.poll_interval, args.timeout)
+
+    def relationship_search():
+        payload = load_payload("boundary_relationships", "search_relationships.json")
+        payload["RequestInfo"] = get_request_info(token)
+        payload["BoundaryRelationshipSearchCriteria"]["tenantId"] = tenantId
+        payload["BoundaryRelationshipSearchCriteria"]["hierarchyType"] = hierarchy_type
+        response = client.post_stream(f"/boundary-service/boundary-relationships/_search?tenantId={tenantId}"
+                                      f"&includeChildren=true&hierarchyType={hierarchy_type}", payload)
+        assert response.status_code == 200, f"Relationship search failed: {response.status_code}"
+        summary = TreeSummary()
+        for node in stream_boundary_nodes(response):
+            summary.add(node)
+        state["boundaries"] = summary.nodes
+
+    def localization_search():
+        codes = fetch_codes(client, token, f"hcm-boundary-{hierarchy_type.lower()}", locale,
+                            page_size=args.page_size)
+        state["messages"] = len(codes.codes)
+
+    steps = {"hierarchy_create": hierarchy_create, "generate": generate, "template_download": template_download,
+             "populate": lambda: populate(template, upload, count, args.fanout, hierarchy_type),
+             "upload": upload_file, "process": process, "relationship_search": relationship_search,
+             "localization_search": localization_search}
+    for phase in PHASES:
+        with RssSampler() as rss:
+            start = time.perf_counter()
+            steps[phase]()
+            elapsed = time.perf_counter() - start
+        results[phase] = (elapsed, rss.start, rss.peak)
+    for path in (template, upload):
+        if os.path.exists(path) and not args.keep_files:
+            os.remove(path)
+    return hierarchy_type, results, state
+
+
+def exponent(rows, phase, size):
+    """Local scaling exponent of `phase` from the previous size to `size`: 1 is linear, 2 quadratic"""
+    sizes = sorted(rows)
+    i = sizes.index(size)
+    if i == 0:
+        return None
+    previous = sizes[i - 1]
+    t0, t1 = rows[previous][phase][0], rows[size][phase][0]
+    if t0 <= 0 or t1 <= 0:
+        return None
+    return math.log(t1 / t0) / math.log(size / previous)
+
+
+def plot(rows, path):
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib is not installed; skipping the plot (pip install matplotlib)")
+        return
+    sizes = sorted(rows)
+    fig, (latency, memory) = plt.subplots(1, 2, figsize=(14, 6))
+    for phase in PHASES:
+        latency.plot(sizes, [rows[s][phase][0] for s in sizes], marker="o", label=phase)
+    latency.set(xscale="log", yscale="log", xlabel="boundaries", ylabel="seconds", title="Latency per phase")
+    latency.legend(fontsize="small")
+    memory.plot(sizes, [max(r[2] for r in rows[s].values()) / 2 ** 20 for s in sizes], marker="o", label="peak RSS")
+    memory.set(xscale="log", xlabel="boundaries", ylabel="MiB", title="Client memory")
+    memory.legend()
+    fig.tight_layout()
+    fig.savefig(path)
+    print(f"Plot written to {path}")
+
+
+def start_stub():
+    """Start utils.stub_server on the port of BASE_URL (which must point at this host)"""
+    url = urlparse(BASE_URL)
+    if url.hostname not in ("127.0.0.1", "localhost"):
+        raise SystemExit(f"--stub needs BASE_URL on this host (e.g. PROFILE=local-stub), not {BASE_URL}")
+    stub = subprocess.Popen([sys.executable, "-m", "utils.stub_server", "--port", str(url.port or 80)],
+                            stdout=subprocess.PIPE, text=True)
+    print(stub.stdout.readline().strip())
+    return stub
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and client memory of the boundary workflow against hierarchy size")
+    parser.add_argument("--sizes", default="1000,10000,100000,500000", help="Comma-separated boundary counts")
+    parser.add_argument("--fanout", type=int, default=10, help="Children per boundary in the generated hierarchy")
+    parser.add_argument("--page-size", type=int, default=5000, help="Localization messages per search page")
+    parser.add_argument("--poll-interval", type=float, default=2, help="Seconds between generate/process polls")
+    parser.add_argument("--timeout", type=float, default=1800, help="Seconds to wait for generate/process per size")
+    parser.add_argument("--superlinear", type=float, default=1.2,
+                        help="Report phases whose scaling exponent between two sizes exceeds this")
+    parser.add_argument("--stub", action="store_true", help="Start utils/stub_server.py on BASE_URL's port for the run")
+    parser.add_argument("--keep-files", action="store_true", help="Keep the downloaded templates and upload files")
+    parser.add_argument("--plot", action="store_true", help="Also plot latency and memory against size (needs matplotlib)")
+    parser.add_argument("--csv", default=os.path.join(output_dir, "benchmarks", "scaling.csv"))
+    args = parser.parse_args()
+    if args.fanout < 2 or args.page_size < 1:
+        parser.error("--fanout must be at least 2 and --page-size at least 1")
+
+    work_dir = os.path.join(output_dir, "benchmarks")
+    os.makedirs(work_dir, exist_ok=True)
+    stub = start_stub() if args.stub else None
+    try:
+        token = get_auth_token("user")
+        client = APIClient(token=token)
+        rows = {}
+        records = []
+        print(f"{'SIZE':>8} " + " ".join(f"{p[:12]:>12}" for p in PHASES) + f" {'PEAK MiB':>9} {'OK':>3}")
+        for size in [int(s) for s in args.sizes.split(",")]:
+            hierarchy_type, results, state = run_size(client, token, size, args, work_dir)
+            rows[size] = results
+            ok = state.get("boundaries") == size and state.get("messages", size) >= size
+            peak = max(r[2] for r in results.values())
+            print(f"{size:>8} " + " ".join(f"{results[p][0]:>12.2f}" for p in PHASES)
+                  + f" {peak / 2 ** 20:>9.0f} {'yes' if ok else 'NO':>3}")
+            for phase in PHASES:
+                seconds, rss_start, rss_peak = results[phase]
+                slope = exponent(rows, phase, size)
+                records.append({"size": size, "hierarchy_type": hierarchy_type, "phase": phase,
+                                "seconds": round(seconds, 4), "rss_start_mib": round(rss_start / 2 ** 20, 1),
+                                "rss_peak_mib": round(rss_peak / 2 ** 20, 1),
+                                "exponent": round(slope, 2) if slope is not None else "",
+                                "boundaries": state.get("boundaries"), "ok": ok})
+    finally:
+        if stub is not None:
+            stub.terminate()
+            stub.wait()
+
+    # Phases that take well under a second are dominated by noise and fixed costs
+    superlinear = [r for r in records if r["exponent"] != "" and r["exponent"] > args.superlinear
+                   and r["seconds"] >= 1]
+    if superlinear:
+        print("\nSuperlinear phases (time grows faster than size):")
+        for r in superlinear:
+            print(f"  {r['phase']:<20} up to {r['size']:>8}: exponent {r['exponent']:.2f}")
+
+    os.makedirs(os.path.dirname(args.csv) or ".", exist_ok=True)
+    with open(args.csv, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(records[0]))
+        writer.writeheader()
+        writer.writerows(records)
+    print(f"\nResults written to {args.csv}")
+    if args.plot:
+        plot(rows, os.path.splitext(args.csv)[0] + ".png")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import os
+import time
+import tracemalloc
+
+from openpyxl import Workbook, load_workbook
+
+from utils.config import output_dir
+from utils.template import BOUNDARY_SHEET
+from utils.xlsx_reader import XlsxReader
+
+
+def build_workbook(path, rows, columns=12):
+    """Write a synthetic boundary-like sheet: repeated strings (shared), codes and coordinates"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(BOUNDARY_SHEET)
+    ws.append([f"LEVEL_{c}" for c in range(columns - 2)] + ["Latitude", "Longitude"])
+    for r in range(rows):
+        ws.append([f"Boundary {c}-{r // (10 ** (columns - 2 - c)) if c < columns - 2 else r}"
+                   for c in range(columns - 2)] + [round(-15.0 + r * 1e-4, 6), 33 + r % 100])
+    wb.save(path)
+    return path
+
+
+def read_openpyxl(path, sheet):
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet in wb.sheetnames else wb[wb.sheetnames[0]]
+        return list(ws.iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+
+def read_fast(path, sheet, workers=0):
+    with XlsxReader(path) as reader:
+        sheet = sheet if sheet in reader.sheetnames else None
+        return list(reader.iter_rows(sheet, workers=workers))
+
+
+def measure(name, fn, repeat):
+    """Best wall time over `repeat` runs, then one traced run for peak memory (tracemalloc slows parsing a lot)"""
+    best = None
+    rows = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    del rows
+    tracemalloc.start()
+    rows = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name:<28} {best:>8.3f} s  {len(rows) / best:>12,.0f} rows/s  peak {peak / 2 ** 20:>8.1f} MiB")
+    return best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare openpyxl read-only mode with utils.xlsx_reader")
+    parser.add_argument("file", nargs="?", help="xlsx to read (default: generate a synthetic boundary sheet)")
+    parser.add_argument("--rows", type=int, default=50000, help="Rows in the synthetic sheet")
+    parser.add_argument("--sheet", default=BOUNDARY_SHEET)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Process pool size for the parallel run")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = args.file
+    if not path:
+        os.makedirs(output_dir, exist_ok=True)
+        path = build_workbook(os.path.join(output_dir, f"bench_{args.rows}.xlsx"), args.rows)
+    print(f"{path} ({os.path.getsize(path) / 2 ** 20:.1f} MiB)\n")
+
+    # Peak memory is the list of rows plus parser state; tracemalloc only sees the parent process
+    base, expected = measure("openpyxl read_only", lambda: read_openpyxl(path, args.sheet), args.repeat)
+    serial, rows = measure("xlsx_reader", lambda: read_fast(path, args.sheet), args.repeat)
+    assert rows == expected, "xlsx_reader rows differ from openpyxl"
+    if args.workers > 1:
+        parallel, rows = measure(f"xlsx_reader {args.workers} workers",
+                                 lambda: read_fast(path, args.sheet, args.workers), args.repeat)
+        assert rows == expected, "parallel xlsx_reader rows differ from openpyxl"
+        print(f"\nSpeedup: serial {base / serial:.1f}x, parallel {base / parallel:.1f}x")
+    else:
+        print(f"\nSpeedup: serial {base / serial:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
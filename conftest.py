@@ -0,0 +1 @@
+pytest_plugins = ["utils.profiling", "utils.slo", "utils.run_deadline", "utils.trace_tests"]
@@ -0,0 +1,46 @@
+import argparse
+import time
+
+from utils.config import pool_size
+from utils.pool import POOL
+
+
+def print_status():
+    entries = POOL.entries()
+    print(f"Warm pool {POOL.path}: {len(entries)} hierarchy(ies)")
+    for entry in entries:
+        age = (time.time() - entry["created"]) / 60
+        variables = entry["variables"]
+        print(f"  {variables.get('hierarchyType', '?'):<20} template {variables.get('generatedFileStoreId', '-')}  "
+              f"{age:6.0f} min old")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the warm pool of pre-provisioned hierarchies")
+    parser.add_argument("command", choices=["fill", "watch", "status", "clear"],
+                        help="fill: provision up to --size and exit; watch: keep topping up until interrupted")
+    parser.add_argument("--size", type=int, default=pool_size, help="Target number of ready hierarchies")
+    parser.add_argument("--workers", type=int, default=2, help="Hierarchies provisioned concurrently")
+    parser.add_argument("--interval", type=float, default=10, help="Seconds between top-ups in watch mode")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        print_status()
+    elif args.command == "clear":
+        print(f"Removed {POOL.clear()} hierarchy(ies) from the pool (the hierarchies themselves are not deleted)")
+    elif args.command == "fill":
+        start = time.perf_counter()
+        added = POOL.fill(args.size, args.workers)
+        print(f"Provisioned {added} hierarchy(ies) in {time.perf_counter() - start:.1f} s")
+        print_status()
+        raise SystemExit(0 if len(POOL.entries()) >= args.size else 1)
+    else:
+        print(f"Keeping {args.size} hierarchy(ies) ready, checking every {args.interval:.0f} s (Ctrl+C to stop)")
+        try:
+            POOL.keep_filled(args.size, args.workers, args.interval)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import time
+
+from utils.api_client import APIClient
+from utils.auth import get_auth_token
+from utils.config import tenantId, locale, locale_french, locale_portuguese, output_dir
+from utils.localization_coverage import analyze, upsert_payloads, PAGE_SIZE
+from utils.metrics import rss_bytes
+from utils.search_helpers import extract_id_from_file
+
+
+def print_report(report, show):
+    print(f"\nCoverage of {report.module} against {report.reference}")
+    print(f"{'LOCALE':<10} {'MESSAGES':>9} {'CODES':>9} {'PAGES':>6} {'MISSING':>9} {'EXTRA':>9} {'DUPLICATES':>11}")
+    for r in report.rows():
+        print(f"{r['locale']:<10} {r['messages']:>9} {r['codes']:>9} {r['pages']:>6} {r['missing']:>9} "
+              f"{r['extra']:>9} {r['duplicates']:>11}")
+    for loc, codes in report.locales.items():
+        for label, values in (("missing", report.missing(loc)), ("extra", report.extra(loc)),
+                              ("duplicate", codes.duplicates)):
+            if values and show:
+                shown = sorted(values)[:show]
+                more = f" ... and {len(values) - show} more" if len(values) > show else ""
+                print(f"  {loc} {label}: {', '.join(shown)}{more}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the localization codes of a boundary module across locales")
+    parser.add_argument("--hierarchy-type", help="Hierarchy whose hcm-boundary-<type> module is checked (default: ids.txt)")
+    parser.add_argument("--module", help="Localization module to check instead of the hierarchy's")
+    parser.add_argument("--reference", default=locale, help="Locale every other locale is compared against")
+    parser.add_argument("--locales", default=f"{locale_french},{locale_portuguese}",
+                        help="Comma-separated locales to check")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="Messages requested per search page")
+    parser.add_argument("--show", type=int, default=10, help="Codes listed per locale and kind (0 = counts only)")
+    parser.add_argument("--emit-upsert", metavar="DIR", nargs="?", const=os.path.join(output_dir, "localization"),
+                        help="Write upsert payloads filling each locale's missing codes with the reference text "
+                             "(default directory <OUTPUT_DIR>/localization)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Messages per emitted upsert payload")
+    args = parser.parse_args()
+    if args.page_size < 1 or args.batch_size < 1:
+        parser.error("--page-size and --batch-size must be at least 1")
+
+    module = args.module
+    if not module:
+        hierarchy_type = args.hierarchy_type or extract_id_from_file("Hierarchy Type:")
+        if not hierarchy_type:
+            parser.error("--hierarchy-type or --module is required when ids.txt has no Hierarchy Type")
+        module = f"hcm-boundary-{hierarchy_type.lower()}"
+
+    token = get_auth_token("user")
+    client = APIClient(token=token)
+    start = time.perf_counter()
+    report = analyze(client, token, module, [loc.strip() for loc in args.locales.split(",") if loc.strip()],
+                     args.reference, tenantId, args.page_size, keep_messages=args.emit_upsert is not None)
+    elapsed = time.perf_counter() - start
+    print_report(report, args.show)
+    print(f"\nAnalyzed in {elapsed:.1f} s, client RSS {rss_bytes() / 2 ** 20:.0f} MiB")
+
+    if args.emit_upsert is not None:
+        os.makedirs(args.emit_upsert, exist_ok=True)
+        for loc in report.locales:
+            if loc == report.reference:
+                continue
+            for part, payload in enumerate(upsert_payloads(report, loc, tenantId, args.batch_size), start=1):
+                path = os.path.join(args.emit_upsert, f"upsert_{module}_{loc}_{part}.json")
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(payload, f, ensure_ascii=False, indent=1)
+                print(f"Upsert payload for {len(payload['messages'])} {loc} message(s) written to {path}")
+
+    raise SystemExit(0 if report.complete else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,33 @@
 from openpyxl import load_workbook
-import requests
+import os
 from utils.api_client import APIClient
 from utils.auth import get_auth_token
-from utils.config import tenantId
+from utils.config import ids_file, template_file
+from utils.filestore import ARTIFACT_CACHE
 
 def prepare_template():
     """Download template and copy data from sample file"""
 
-    # Step 1: Get download URL from API
+    # Step 1: Read the generated template's fileStoreId
     token = get_auth_token('user')
     client = APIClient(token=token)
 
-    with open('output/ids.txt', 'r') as f:
+    with open(ids_file, 'r') as f:
         for line in f:
             if line.startswith('Generated FileStore ID:'):
                 file_store_id = line.split(':')[1].strip()
                 break
 
-    url = f"/filestore/v1/files/url?tenantId={tenantId}&fileStoreIds={file_store_id}"
-    response = client.get(url)
+    # Step 2: Download the template from S3 (served from the artifact cache on repeat runs)
+    print("\nFetching template...")
+    ARTIFACT_CACHE.fetch(client, file_store_id, template_file)
 
-    download_url = response.json()['fileStoreIds'][0]['url']
-    print(f"Download URL obtained: {download_url[:80]}...")
-
-    # Step 2: Download the template from S3
-    print("\nDownloading template from S3...")
-    template_response = requests.get(download_url)
-
-    with open('output/template_downloaded.xlsx', 'wb') as f:
-        f.write(template_response.content)
-
-    print(f"Template downloaded: {len(template_response.content)} bytes")
+    print(f"Template downloaded: {os.path.getsize(template_file)} bytes "
+          f"(cache hits: {ARTIFACT_CACHE.hits}, misses: {ARTIFACT_CACHE.misses})")
 
     # Step 3: Load both files
     print("\nLoading files...")
-    template_wb = load_workbook('output/template_downloaded.xlsx')
+    template_wb = load_workbook(template_file)
     sample_wb = load_workbook('utils/sample_boundary.xlsx', data_only=True, read_only=True)
 
     template_ws = template_wb['Boundary Data']
@@ -65,13 +58,13 @@ def prepare_template():
 
     # Step 5: Save the template
     print("\nSaving template with copied data...")
-    template_wb.save('output/template_downloaded.xlsx')
+    template_wb.save(template_file)
 
     print("✓ Template prepared successfully")
 
     # Verify
     print("\nVerifying template content:")
-    verify_wb = load_workbook('output/template_downloaded.xlsx')
+    verify_wb = load_workbook(template_file)
     verify_ws = verify_wb['Boundary Data']
 
     print("\nHeaders (Row 1):")
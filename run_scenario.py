@@ -0,0 +1,209 @@
+import argparse
+import json
+import os
+import secrets
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.config import output_dir, ids_file, distributed_token
+from utils.api_client import APIClient, CONTRACTS
+from utils.distributed import Coordinator, Worker
+from utils.metrics import RECORDER
+from utils.pool import POOL
+from utils.prometheus import start_metrics_server
+from utils.scenario import ScenarioRunner, TokenProvider, STEP_RECORDER, load_scenario, write_ids
+
+
+def parse_vars(pairs):
+    variables = {}
+    for pair in pairs or []:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise ValueError(f"Expected key=value, got {pair!r}")
+        variables[key] = value
+    return variables
+
+
+def print_table(title, rows):
+    print(f"\n{title}")
+    print(f"{'NAME':<70} {'COUNT':>6} {'ERR':>5} {'P50 ms':>9} {'P95 ms':>9} {'P99 ms':>9} {'CONTRACT':>10}")
+    for r in rows:
+        contract = f"{r['contract_violations']}/{r['contract_checked']}" if r["contract_checked"] else "-"
+        print(f"{r['endpoint'][:70]:<70} {r['count']:>6} {r['errors']:>5} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} "
+              f"{r['p99_ms']:>9.1f} {contract:>10}")
+
+
+def print_transfer(rows):
+    print("\nTransfer (KiB)")
+    print(f"{'ENDPOINT':<70} {'SENT RAW':>9} {'SENT WIRE':>9} {'RECV WIRE':>9} {'RECV JSON':>9} {'SAVED':>6}")
+    for r in rows:
+        raw = r["sent_raw"] + r["received_decoded"]
+        wire = r["sent_wire"] + r["received_wire"]
+        saved = f"{(1 - wire / raw) * 100:.0f}%" if raw else "-"
+        print(f"{r['endpoint'][:70]:<70} {r['sent_raw'] / 1024:>9.1f} {r['sent_wire'] / 1024:>9.1f} "
+              f"{r['received_wire'] / 1024:>9.1f} {r['received_decoded'] / 1024:>9.1f} {saved:>6}")
+
+
+def print_phases(rows):
+    """Mean time per HTTP phase; DNS/CONNECT/TLS are per new connection, NEW/REUSED counts connections"""
+    print("\nHTTP phases (mean ms)")
+    print(f"{'ENDPOINT':<70} {'DNS':>7} {'CONNECT':>7} {'TLS':>7} {'SEND':>7} {'TTFB':>8} {'TTFB95':>8} "
+          f"{'XFER':>7} {'NEW/REUSED':>11}")
+    for r in rows:
+        # "-" is a phase that was never measured, not one that took no time
+        ms = {k: "-" if r[k] is None else f"{r[k]:.1f}" for k in
+              ("dns_ms", "connect_ms", "tls_ms", "send_ms", "ttfb_ms", "ttfb_p95_ms", "transfer_ms")}
+        connections = f"{r['connections_new']}/{r['connections_reused']}"
+        print(f"{r['endpoint'][:70]:<70} {ms['dns_ms']:>7} {ms['connect_ms']:>7} {ms['tls_ms']:>7} "
+              f"{ms['send_ms']:>7} {ms['ttfb_ms']:>8} {ms['ttfb_p95_ms']:>8} {ms['transfer_ms']:>7} "
+              f"{connections:>11}")
+
+
+def run_local(args, scenario, variables, total):
+    tokens = TokenProvider()
+    runner = ScenarioRunner(scenario, tokens)
+    pool_misses = []
+
+    def run_once(client):
+        if not args.pool:
+            return runner.run(variables)
+        # Start from a pre-provisioned hierarchy; steps marked skip_if_set "provisioned" are skipped
+        claimed = POOL.claim(client)
+        if claimed is None:
+            pool_misses.append(1)
+            return runner.run(variables)
+        return runner.run({**variables, **claimed, "provisioned": True})
+
+    def virtual_user(_):
+        client = APIClient(token=tokens.get()) if args.pool else None
+        return [run_once(client) for _ in range(args.iterations)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        results = [r for user_results in pool.map(virtual_user, range(args.users)) for r in user_results]
+    elapsed = time.perf_counter() - start
+    if args.pool:
+        print(f"Warm pool: {total - len(pool_misses)}/{total} run(s) started from a pre-provisioned hierarchy")
+
+    if total == 1:
+        for step in results[0].steps:
+            status = "PASS" if step.ok else "FAIL"
+            print(f"  {status} {step.name:<35} {step.duration:8.2f} s  {step.error or ''}")
+    else:
+        for r in results:
+            if not r.ok:
+                failed = next(s for s in r.steps if not s.ok)
+                print(f"  FAIL {failed.name}: {failed.error[:200]}")
+    return results, elapsed, STEP_RECORDER.summary(), RECORDER.summary()
+
+
+def run_distributed(args, scenario, variables):
+    # Workers started here are handed a one-off token; remote workers need DISTRIBUTED_TOKEN set on both sides
+    token = distributed_token or (secrets.token_urlsafe(24) if args.local_workers else None)
+    coordinator = Coordinator(args.coordinator, args.workers, scenario, variables, args.users, args.iterations,
+                              rate=args.rate, interval=args.interval, token=token)
+    port = coordinator.listen()
+    if args.metrics_port is not None:
+        # Serve the merged view of every worker, not this process's own (idle) recorders
+        start_metrics_server(args.metrics_port, endpoints=coordinator.endpoints, steps=coordinator.steps)
+    procs = []
+    if args.local_workers:
+        # Same-host workers inherit this process's environment (PROFILE, OUTPUT_DIR, ...)
+        host = "127.0.0.1" if coordinator.host in ("", "0.0.0.0") else coordinator.host
+        env = dict(os.environ, DISTRIBUTED_TOKEN=token)
+        procs = [subprocess.Popen([sys.executable, os.path.abspath(__file__), "--worker", f"{host}:{port}"], env=env)
+                 for _ in range(args.workers)]
+    try:
+        coordinator.run()
+    finally:
+        for proc in procs:
+            proc.wait()
+    for failure in coordinator.failures[:20]:
+        print(f"  FAIL {failure}")
+    if coordinator.lost:
+        print(f"  {coordinator.lost} worker(s) disconnected before finishing")
+    return coordinator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a declarative workflow scenario once or as a concurrent load")
+    parser.add_argument("scenario", nargs="?", help="Scenario name in scenarios/ or path to a scenario JSON file")
+    parser.add_argument("--users", type=int, default=1, help="Concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=1, help="Scenario runs per virtual user")
+    parser.add_argument("--var", action="append", help="Override a scenario variable (key=value); repeatable")
+    parser.add_argument("--write-ids", action="store_true",
+                        help="Write extracted IDs to ids.txt so the pytest suite can continue from them")
+    parser.add_argument("--report", help="Write a JSON report to this path")
+    parser.add_argument("--deadline", type=float,
+                        help="Time budget in seconds for each scenario run; requests and polls get the remaining budget")
+    parser.add_argument("--pool", action="store_true",
+                        help="Claim pre-provisioned hierarchies from the warm pool (see hierarchy_pool.py); local runs only")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Expose live Prometheus metrics on http://127.0.0.1:PORT/metrics during the run")
+    distributed = parser.add_argument_group("distributed load")
+    distributed.add_argument("--coordinator", metavar="HOST:PORT",
+                             help="Coordinate --workers worker processes listening on HOST:PORT (port 0: any free port)")
+    distributed.add_argument("--workers", type=int, default=0, help="Workers the coordinator waits for")
+    distributed.add_argument("--local-workers", action="store_true", help="Start the workers on this host")
+    distributed.add_argument("--rate", type=float, help="Target scenario runs/s across all workers (default: closed loop)")
+    distributed.add_argument("--interval", type=float, default=5, help="Seconds between live reports")
+    distributed.add_argument("--worker", metavar="HOST:PORT", help="Run as a worker of the coordinator at HOST:PORT")
+    args = parser.parse_args()
+
+    if (args.worker or args.coordinator and not args.local_workers) and not distributed_token:
+        parser.error("set DISTRIBUTED_TOKEN to a secret shared by the coordinator and its workers")
+    if args.worker:
+        Worker(args.worker).run()
+        return
+    if not args.scenario:
+        parser.error("scenario is required unless running as --worker")
+    if args.coordinator and args.workers < 1:
+        parser.error("--coordinator needs --workers N")
+    if args.coordinator and args.pool:
+        parser.error("--pool is only supported for local runs")
+
+    scenario = load_scenario(args.scenario)
+    if args.deadline:
+        # Carried in the scenario so distributed workers apply it too
+        scenario["deadline_s"] = args.deadline
+    variables = parse_vars(args.var)
+    total = args.users * args.iterations
+
+    if args.coordinator:
+        print(f"Scenario '{scenario.get('name')}': {args.users} user(s) x {args.iterations} iteration(s) "
+              f"over {args.workers} worker(s)")
+        coordinator = run_distributed(args, scenario, variables)
+        results, elapsed, passed, completed = None, coordinator.elapsed, coordinator.passed, coordinator.runs
+        step_rows, endpoint_rows = coordinator.steps.summary(), coordinator.endpoints.summary()
+    else:
+        print(f"Scenario '{scenario.get('name')}': {args.users} user(s) x {args.iterations} iteration(s)")
+        if args.metrics_port is not None:
+            start_metrics_server(args.metrics_port)
+        results, elapsed, step_rows, endpoint_rows = run_local(args, scenario, variables, total)
+        passed, completed = sum(1 for r in results if r.ok), len(results)
+
+    print_table("Steps", step_rows)
+    print_table("Endpoints", endpoint_rows)
+    print_transfer(endpoint_rows)
+    print_phases(endpoint_rows)
+    for path, error in sorted(CONTRACTS.last_violation.items()):
+        print(f"  Contract violation {path}: {error}")
+    print(f"\n{passed}/{total} scenario runs passed in {elapsed:.1f} s ({completed / elapsed:.2f} runs/s)")
+
+    if args.write_ids and results:
+        write_ids(scenario, results[-1].variables, ids_file)
+        print(f"IDs written to {ids_file}")
+
+    if args.report:
+        os.makedirs(os.path.dirname(args.report) or output_dir, exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"scenario": scenario.get("name"), "runs": total, "passed": passed, "elapsed_s": elapsed,
+                       "steps": step_rows, "endpoints": endpoint_rows}, f, indent=2)
+
+    raise SystemExit(0 if passed == total else 1)
+
+
+if __name__ == "__main__":
+    main()
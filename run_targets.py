@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+TARGETS_ROOT = os.path.join("output", "targets")
+
+
+def load_targets(path):
+    """Load the list of (environment profile, tenant, locale-set) targets"""
+    with open(path, "r", encoding="utf-8") as f:
+        targets = json.load(f)
+
+    names = [t["name"] for t in targets]
+    if len(names) != len(set(names)):
+        raise ValueError(f"Duplicate target names in {path}")
+    return targets
+
+
+def write_target_env(target, target_dir):
+    """Resolve a target into its own env file so each worker has isolated config and state"""
+    lines = []
+    profile = target.get("profile")
+    if profile:
+        with open(os.path.join("profiles", f"{profile}.env"), "r", encoding="utf-8") as f:
+            lines.extend(line.rstrip("\n") for line in f)
+
+    overrides = {"OUTPUT_DIR": target_dir}
+    if target.get("tenant"):
+        overrides["TENANTID"] = target["tenant"]
+    overrides.update(target.get("locales", {}))
+    overrides.update(target.get("env", {}))
+    lines.extend(f"{key}={value}" for key, value in overrides.items())
+
+    env_file = os.path.join(target_dir, "target.env")
+    with open(env_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return env_file
+
+
+def parse_junit(path):
+    """Extract per-test outcome and duration from a pytest junit xml file"""
+    tests = []
+    if not os.path.exists(path):
+        return tests
+
+    for case in ET.parse(path).getroot().iter("testcase"):
+        outcome = "passed"
+        for child in case:
+            if child.tag in ("failure", "error"):
+                outcome = "failed"
+            elif child.tag == "skipped":
+                outcome = "skipped"
+        tests.append({
+            "name": case.get("name"),
+            "outcome": outcome,
+            "duration": round(float(case.get("time", 0)), 3)
+        })
+    return tests
+
+
+def run_target(target, pytest_args):
+    """Run the workflow for one target in a separate pytest process"""
+    target_dir = os.path.join(TARGETS_ROOT, target["name"])
+    os.makedirs(target_dir, exist_ok=True)
+
+    env = os.environ.copy()
+    env["PROFILE"] = os.path.abspath(write_target_env(target, target_dir))
+
+    junit_file = os.path.join(target_dir, "junit.xml")
+    cmd = [sys.executable, "-m", "pytest", "tests/", "-q", "-p", "no:cacheprovider",
+           f"--junitxml={junit_file}"] + pytest_args
+
+    start = time.perf_counter()
+    with open(os.path.join(target_dir, "pytest.log"), "w", encoding="utf-8") as log:
+        result = subprocess.run(cmd, env=env, stdout=log, stderr=subprocess.STDOUT)
+    elapsed = time.perf_counter() - start
+
+    tests = parse_junit(junit_file)
+    return {
+        "name": target["name"],
+        "profile": target.get("profile"),
+        "tenant": target.get("tenant"),
+        "locales": target.get("locales", {}),
+        "exit_code": result.returncode,
+        "status": "passed" if result.returncode == 0 else "failed",
+        "duration": round(elapsed, 3),
+        "passed": sum(1 for t in tests if t["outcome"] == "passed"),
+        "failed": sum(1 for t in tests if t["outcome"] == "failed"),
+        "skipped": sum(1 for t in tests if t["outcome"] == "skipped"),
+        "tests": tests
+    }
+
+
+def print_report(results):
+    print("\n" + "=" * 100)
+    print(f"{'TARGET':<20} {'PROFILE':<16} {'TENANT':<8} {'STATUS':<8} {'PASS':>5} {'FAIL':>5} {'SKIP':>5} {'TIME (s)':>10}")
+    print("-" * 100)
+    for r in results:
+        print(f"{r['name']:<20} {str(r['profile']):<16} {str(r['tenant']):<8} {r['status']:<8} "
+              f"{r['passed']:>5} {r['failed']:>5} {r['skipped']:>5} {r['duration']:>10.2f}")
+    print("=" * 100)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the boundary workflow across multiple environments/tenants in parallel")
+    parser.add_argument("--targets", default="data/targets.json", help="JSON file listing the targets to run")
+    parser.add_argument("--only", nargs="*", help="Run only these target names")
+    parser.add_argument("--workers", type=int, default=4, help="Maximum number of targets run at once")
+    parser.add_argument("pytest_args", nargs=argparse.REMAINDER, help="Extra arguments passed to pytest (after --)")
+    args = parser.parse_args()
+
+    targets = load_targets(args.targets)
+    if args.only:
+        targets = [t for t in targets if t["name"] in args.only]
+    pytest_args = [a for a in args.pytest_args if a != "--"]
+
+    print(f"Running {len(targets)} target(s) with {args.workers} worker(s)...")
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(lambda t: run_target(t, pytest_args), targets))
+
+    print_report(results)
+
+    os.makedirs(TARGETS_ROOT, exist_ok=True)
+    report_file = os.path.join(TARGETS_ROOT, "report.json")
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Merged report written to {report_file}")
+
+    sys.exit(0 if all(r["status"] == "passed" for r in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,10 @@
-from openpyxl import load_workbook
+from utils.xlsx_reader import XlsxReader
 
 def show_excel_content(file_path):
     """Display all sheets in an Excel file"""
     try:
-        # Load workbook without styles to avoid formatting errors
-        wb = load_workbook(file_path, data_only=True, read_only=True)
+        # Stream rows straight from the sheet XML; styles are never read
+        wb = XlsxReader(file_path)
 
         print(f"Excel file: {file_path}")
         print(f"Number of sheets: {len(wb.sheetnames)}")
@@ -17,16 +17,13 @@ def show_excel_content(file_path):
             print(f"SHEET: {sheet_name}")
             print(f"{'=' * 100}\n")
 
-            ws = wb[sheet_name]
-
             # Get dimensions
-            max_row = ws.max_row
-            max_col = ws.max_column
+            max_row, max_col = wb.dimensions(sheet_name) or (None, None)
 
             print(f"Rows: {max_row}, Columns: {max_col}\n")
 
             # Display the data
-            for row_idx, row in enumerate(ws.iter_rows(values_only=True), 1):
+            for row_idx, row in enumerate(wb.iter_rows(sheet_name), 1):
                 if row_idx == 1:
                     # Header row
                     print("Headers:", " | ".join([str(cell) if cell is not None else "" for cell in row]))
@@ -1,9 +1,9 @@
-from openpyxl import load_workbook
+from utils.xlsx_reader import XlsxReader
 
 def show_excel_summary(file_path):
     """Display summary of Excel file"""
     try:
-        wb = load_workbook(file_path, data_only=True, read_only=True)
+        wb = XlsxReader(file_path)
 
         print(f"Excel file: {file_path}")
         print(f"Number of sheets: {len(wb.sheetnames)}")
@@ -14,20 +14,19 @@ def show_excel_summary(file_path):
             print(f"\nSHEET: {sheet_name}")
             print("=" * 120)
 
-            ws = wb[sheet_name]
-
             # Count non-empty rows
             non_empty_rows = 0
-            for row in ws.iter_rows(values_only=True):
+            for row in wb.iter_rows(sheet_name):
                 if any(cell for cell in row):
                     non_empty_rows += 1
 
-            print(f"\nTotal Rows: {ws.max_row}, Non-empty Rows: {non_empty_rows}, Columns: {ws.max_column}\n")
+            max_row, max_col = wb.dimensions(sheet_name) or (None, None)
+            print(f"\nTotal Rows: {max_row}, Non-empty Rows: {non_empty_rows}, Columns: {max_col}\n")
 
             # Show first 10 non-empty rows
             print("First 10 non-empty data rows:\n")
             count = 0
-            for row_idx, row in enumerate(ws.iter_rows(values_only=True), 1):
+            for row_idx, row in enumerate(wb.iter_rows(sheet_name), 1):
                 # Check if row has any non-empty cell
                 if any(cell for cell in row):
                     if row_idx == 1:
@@ -3,7 +3,7 @@ from utils.api_client import APIClient
 from utils.auth import get_auth_token
 from utils.data_loader import load_payload
 from utils.request_info import get_request_info
-from utils.config import tenantId
+from utils.config import tenantId, ids_file
 
 def show_test15_response():
     """Show full response from boundary relationship search"""
@@ -11,7 +11,7 @@ def show_test15_response():
     client = APIClient(token=token)
 
     # Read hierarchy type
-    with open("output/ids.txt", "r") as f:
+    with open(ids_file, "r") as f:
         for line in f:
             if line.startswith("Hierarchy Type:"):
                 hierarchy_type = line.split(":")[1].strip()
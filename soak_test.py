@@ -0,0 +1,261 @@
+import argparse
+import csv
+import math
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.api_client import APIClient
+from utils.auth import get_auth_token
+from utils.config import tenantId, locale, output_dir, ids_file
+from utils.data_loader import load_payload
+from utils.metrics import RECORDER, rss_bytes
+from utils.prometheus import start_metrics_server
+from utils.request_info import get_request_info
+from utils.scenario import ScenarioRunner, TokenProvider, load_scenario
+from utils.search_helpers import extract_id_from_file
+
+SOAK_DIR = os.path.join(output_dir, "soak")
+
+
+class Session:
+    """Shared token/client for all iterations, refreshed periodically on long runs"""
+
+    def __init__(self, refresh_interval):
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        self.token = get_auth_token("user")
+        self.client = APIClient(token=self.token)
+        self.refreshed_at = time.monotonic()
+
+    def get(self):
+        with self.lock:
+            if time.monotonic() - self.refreshed_at > self.refresh_interval:
+                self.refresh()
+            return self.token, self.client
+
+
+def hierarchy_create(token, client, hierarchy_type):
+    payload = load_payload("boundary_hierarchy", "create_hierarchy.json")
+    payload["RequestInfo"] = get_request_info(token)
+    payload["BoundaryHierarchy"]["tenantId"] = tenantId
+    payload["BoundaryHierarchy"]["hierarchyType"] = f"SOAK_{uuid.uuid4().hex[:8].upper()}"
+    response = client.post("/boundary-service/boundary-hierarchy-definition/_create", payload)
+    assert response.status_code == 202, f"Boundary hierarchy creation failed: {response.text}"
+
+
+def hierarchy_search(token, client, hierarchy_type):
+    payload = load_payload("boundary_hierarchy", "search_hierarchy.json")
+    payload["RequestInfo"] = get_request_info(token)
+    payload["BoundaryTypeHierarchySearchCriteria"]["tenantId"] = tenantId
+    payload["BoundaryTypeHierarchySearchCriteria"]["hierarchyType"] = hierarchy_type
+    response = client.post("/boundary-service/boundary-hierarchy-definition/_search?limit=10&offset=0", payload)
+    assert response.status_code == 200, f"Boundary hierarchy search failed: {response.text}"
+
+
+def relationship_search(token, client, hierarchy_type):
+    payload = load_payload("boundary_relationships", "search_relationships.json")
+    payload["RequestInfo"] = get_request_info(token)
+    payload["BoundaryRelationshipSearchCriteria"]["tenantId"] = tenantId
+    payload["BoundaryRelationshipSearchCriteria"]["hierarchyType"] = hierarchy_type
+    url = f"/boundary-service/boundary-relationships/_search?tenantId={tenantId}&includeChildren=true&hierarchyType={hierarchy_type}"
+    response = client.post(url, payload)
+    assert response.status_code == 200, f"Boundary relationship search failed: {response.text}"
+
+
+def localization_search(token, client, hierarchy_type):
+    payload = load_payload("localization", "search_localization.json")
+    payload["RequestInfo"] = get_request_info(token)
+    url = f"/localization/messages/v1/_search?tenantId={tenantId}&locale={locale}&module=hcm-boundary-{hierarchy_type.lower()}"
+    response = client.post(url, payload)
+    assert response.status_code == 200, f"Localization search failed: {response.text}"
+
+
+STEPS = {
+    "hierarchy_create": hierarchy_create,
+    "hierarchy_search": hierarchy_search,
+    "relationship_search": relationship_search,
+    "localization_search": localization_search,
+}
+DEFAULT_STEPS = ["hierarchy_search", "relationship_search", "localization_search"]
+
+
+def mann_kendall(series):
+    """Mann-Kendall trend test. Returns (z, two-sided p-value); z > 0 means an upward trend."""
+    n = len(series)
+    if n < 4:
+        return 0.0, 1.0
+    s = sum((series[j] > series[i]) - (series[j] < series[i]) for i in range(n - 1) for j in range(i + 1, n))
+    var = n * (n - 1) * (2 * n + 5) / 18.0
+    if s == 0 or var == 0:
+        return 0.0, 1.0
+    z = (s - 1) / math.sqrt(var) if s > 0 else (s + 1) / math.sqrt(var)
+    return z, math.erfc(abs(z) / math.sqrt(2))
+
+
+def relative_change(points, intervals):
+    """Mean of the values in the last quarter of the run relative to the first quarter.
+    `points` are (interval index, value) pairs; an endpoint may be missing from some intervals."""
+    quarter = max(1, intervals // 4)
+    first = [v for i, v in points if i < quarter]
+    last = [v for i, v in points if i >= intervals - quarter]
+    if not first or not last:
+        return 0.0
+    first, last = sum(first) / len(first), sum(last) / len(last)
+    return (last - first) / first if first else 0.0
+
+
+def detect_drift(intervals, alpha, min_change):
+    """Flag endpoints whose p95 latency or error rate trends upward, and client RSS growth"""
+    findings = []
+    by_endpoint = {}  # endpoint -> [(interval index, row)] for the intervals it had requests in
+    for index, snap in enumerate(intervals):
+        for row in snap["endpoints"]:
+            by_endpoint.setdefault(row["endpoint"], []).append((index, row))
+
+    checks = [(endpoint, metric, [(i, r[metric]) for i, r in rows])
+              for endpoint, rows in by_endpoint.items() for metric in ("p95_ms", "error_rate")]
+    checks.append(("client", "rss_mb", [(i, snap["rss_mb"]) for i, snap in enumerate(intervals)]))
+
+    for name, metric, points in checks:
+        series = [v for _, v in points]
+        z, p = mann_kendall(series)
+        change = relative_change(points, len(intervals))
+        growing = z > 0 and p < alpha
+        if metric == "error_rate":
+            growing = growing and series[-1] > series[0]
+        elif growing:
+            growing = change >= min_change
+        if growing:
+            findings.append({"name": name, "metric": metric, "z": z, "p": p, "change": change})
+    return findings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loop boundary/localization calls at a fixed rate and watch for drift")
+    parser.add_argument("--steps", nargs="+", default=DEFAULT_STEPS, choices=sorted(STEPS),
+                        help="Steps run in order on every iteration")
+    parser.add_argument("--scenario", help="Loop a declarative scenario (e.g. boundary_onboarding) instead of --steps")
+    parser.add_argument("--hierarchy-type", help="Hierarchy to search (default: Hierarchy Type from ids.txt)")
+    parser.add_argument("--rate", type=float, default=1.0, help="Iterations started per second")
+    parser.add_argument("--duration", type=float, default=3600, help="Total run time in seconds")
+    parser.add_argument("--interval", type=float, default=60, help="Seconds between metric snapshots")
+    parser.add_argument("--concurrency", type=int, default=8, help="Max iterations in flight")
+    parser.add_argument("--token-refresh", type=float, default=1800, help="Seconds between token refreshes")
+    parser.add_argument("--alpha", type=float, default=0.01, help="Significance level for drift detection")
+    parser.add_argument("--min-change", type=float, default=0.2,
+                        help="Minimum relative growth (last vs first quarter) to flag latency/RSS drift")
+    parser.add_argument("--output", help="Time series CSV path (default: output/soak/soak_<timestamp>.csv)")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Expose live Prometheus metrics on http://127.0.0.1:PORT/metrics during the run")
+    args = parser.parse_args()
+
+    hierarchy_type = args.hierarchy_type
+    if not hierarchy_type and os.path.exists(ids_file):
+        hierarchy_type = extract_id_from_file("Hierarchy Type")
+    if not hierarchy_type and not args.scenario and any(step != "hierarchy_create" for step in args.steps):
+        parser.error("No hierarchy type given and none found in ids.txt")
+
+    if args.metrics_port is not None:
+        start_metrics_server(args.metrics_port)
+    os.makedirs(SOAK_DIR, exist_ok=True)
+    output = args.output or os.path.join(SOAK_DIR, f"soak_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+    session = Session(args.token_refresh)
+    failures = {"count": 0}
+    failures_lock = threading.Lock()
+
+    scenario_runner = ScenarioRunner(load_scenario(args.scenario), TokenProvider()) if args.scenario else None
+    scenario_vars = {"hierarchyType": hierarchy_type} if hierarchy_type else {}
+
+    def iteration():
+        if scenario_runner:
+            result = scenario_runner.run(scenario_vars)
+            if not result.ok:
+                failed = next(step for step in result.steps if not step.ok)
+                with failures_lock:
+                    failures["count"] += 1
+                print(f"  {failed.name} failed: {failed.error[:200]}")
+            return
+        token, client = session.get()
+        for step in args.steps:
+            try:
+                STEPS[step](token, client, hierarchy_type)
+            except Exception as e:
+                with failures_lock:
+                    failures["count"] += 1
+                print(f"  {step} failed: {str(e)[:200]}")
+                return
+
+    intervals = []
+    RECORDER.snapshot(reset=True)
+    print(f"Soak: {'scenario=' + args.scenario if args.scenario else f'steps={args.steps}'} rate={args.rate}/s duration={args.duration}s interval={args.interval}s")
+    print(f"Time series: {output}")
+
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["timestamp", "elapsed_s", "endpoint", "count", "errors", "error_rate",
+                         "p50_ms", "p95_ms", "p99_ms", "max_ms", "contract_violations", "rss_mb", "skipped"])
+        start = time.monotonic()
+        next_snapshot = start + args.interval
+        in_flight = []
+        started = skipped = 0
+
+        def snapshot():
+            rows = RECORDER.summary(reset=True)
+            snap = {"elapsed": time.monotonic() - start, "endpoints": rows, "rss_mb": rss_bytes() / 1048576}
+            intervals.append(snap)
+            stamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+            for row in rows or [{"endpoint": "-", "count": 0, "errors": 0, "error_rate": 0,
+                                 "p50_ms": 0, "p95_ms": 0, "p99_ms": 0, "max_ms": 0, "contract_violations": 0}]:
+                writer.writerow([stamp, round(snap["elapsed"], 1), row["endpoint"], row["count"], row["errors"],
+                                 round(row["error_rate"], 4), round(row["p50_ms"], 1), round(row["p95_ms"], 1),
+                                 round(row["p99_ms"], 1), round(row["max_ms"], 1), row["contract_violations"],
+                                 round(snap["rss_mb"], 1), skipped])
+            f.flush()
+            worst = max((r["p95_ms"] for r in rows), default=0)
+            print(f"[{stamp}] +{snap['elapsed']:.0f}s requests={sum(r['count'] for r in rows)} "
+                  f"errors={sum(r['errors'] for r in rows)} worst_p95={worst:.0f}ms rss={snap['rss_mb']:.1f}MB skipped={skipped}")
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            while time.monotonic() - start < args.duration:
+                # Open-loop schedule: iteration i starts at start + i / rate regardless of latency
+                due = start + started / args.rate
+                now = time.monotonic()
+                if due > now:
+                    time.sleep(min(due - now, max(0.0, next_snapshot - now)))
+                if time.monotonic() >= due:
+                    in_flight = [fut for fut in in_flight if not fut.done()]
+                    if len(in_flight) >= args.concurrency:
+                        skipped += 1  # client saturated; record it instead of silently lowering the rate
+                    else:
+                        in_flight.append(pool.submit(iteration))
+                    started += 1
+
+                if time.monotonic() >= next_snapshot:
+                    snapshot()
+                    skipped = 0
+                    next_snapshot += args.interval
+        # The last, partial interval, including iterations still in flight when the duration ran out
+        if RECORDER.endpoints or skipped:
+            snapshot()
+
+    findings = detect_drift(intervals, args.alpha, args.min_change)
+    print("\n" + "=" * 80)
+    print(f"SOAK COMPLETE: {len(intervals)} intervals, {failures['count']} failed iterations")
+    if findings:
+        print("DRIFT DETECTED:")
+        for d in findings:
+            print(f"  {d['name']} {d['metric']}: +{d['change'] * 100:.0f}% (Mann-Kendall z={d['z']:.2f}, p={d['p']:.4f})")
+    else:
+        print("No significant latency, error-rate or memory drift detected")
+    print("=" * 80)
+    raise SystemExit(1 if findings else 0)
+
+
+if __name__ == "__main__":
+    main()
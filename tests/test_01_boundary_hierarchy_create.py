@@ -2,14 +2,35 @@ from utils.api_client import APIClient
 from utils.auth import get_auth_token
 from utils.data_loader import load_payload
 from utils.request_info import get_request_info
-from utils.config import tenantId
+from utils.config import tenantId, ids_file, hierarchy_pool
+from utils.logger import get_logger, log_response
+from utils.pool import claim_for_test
+from utils.search_helpers import extract_id_from_file
 import pytest
 import uuid
-import json
-import logging
 
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
+
+
+def assert_claimed_hierarchy(client, token, claimed):
+    """The pool's hierarchy exists and is the one recorded in ids.txt for the following tests"""
+    hierarchy_type = claimed["hierarchyType"]
+    assert extract_id_from_file("Hierarchy Type") == hierarchy_type
+    assert claimed.get("generatedFileStoreId"), f"Pool entry {hierarchy_type} has no generated template"
+
+    payload = load_payload("boundary_hierarchy", "search_hierarchy.json")
+    payload["RequestInfo"] = get_request_info(token)
+    payload["BoundaryTypeHierarchySearchCriteria"]["tenantId"] = tenantId
+    payload["BoundaryTypeHierarchySearchCriteria"]["hierarchyType"] = hierarchy_type
+    response = client.post("/boundary-service/boundary-hierarchy-definition/_search?limit=10&offset=0", payload)
+    assert response.status_code == 200, f"Boundary hierarchy search failed: {response.text}"
+    found = [h.get("hierarchyType") for h in response.json().get("BoundaryHierarchy", [])]
+    assert hierarchy_type in found, f"Claimed hierarchy {hierarchy_type} not found"
+
+    log_response(logger, "TEST 01 - BOUNDARY HIERARCHY CLAIMED FROM POOL", response, hierarchy_type=hierarchy_type,
+                 pool_entry=claimed)
+    print(f"Using pre-provisioned hierarchy {hierarchy_type} from the warm pool: "
+          + ", ".join(f"{name}={value}" for name, value in claimed.items()))
 
 
 @pytest.mark.order(1)
@@ -18,6 +39,14 @@ def test_boundary_hierarchy_create():
     token = get_auth_token("user")
     client = APIClient(token=token)
 
+    # Warm pool: start from a hierarchy that already has localization and a generated template
+    if hierarchy_pool:
+        claimed = claim_for_test(client, ids_file)
+        if claimed:
+            assert_claimed_hierarchy(client, token, claimed)
+            return
+        print("Warm pool is empty, creating a hierarchy")
+
     # Generate unique hierarchy type
     hierarchy_type = f"TEST_{uuid.uuid4().hex[:8].upper()}"
 
@@ -36,16 +65,11 @@ def test_boundary_hierarchy_create():
     assert "BoundaryHierarchy" in data
     assert data["BoundaryHierarchy"][0]["hierarchyType"] == hierarchy_type
 
-    # Log response details
-    logger.info("="*80)
-    logger.info("TEST 01 - BOUNDARY HIERARCHY CREATE - RESPONSE")
-    logger.info("="*80)
-    logger.info(f"Status Code: {response.status_code}")
-    logger.info(f"Response Data:\n{json.dumps(data, indent=2)}")
-    logger.info("="*80)
+    # Log response details (written to logs/api.jsonl by a background thread)
+    log_response(logger, "TEST 01 - BOUNDARY HIERARCHY CREATE - RESPONSE", response, hierarchy_type=hierarchy_type)
 
     print(f"Boundary hierarchy created successfully: {hierarchy_type}")
 
     # Save hierarchy type for other tests
-    with open("output/ids.txt", "w") as f:
+    with open(ids_file, "w") as f:
         f.write(f"Hierarchy Type: {hierarchy_type}\n")
@@ -2,18 +2,19 @@ from utils.api_client import APIClient
 from utils.auth import get_auth_token
 from utils.data_loader import load_payload
 from utils.request_info import get_request_info
-from utils.config import tenantId
+from utils.config import tenantId, ids_file
 import pytest
 
 
 @pytest.mark.order(2)
+@pytest.mark.slo("/boundary-service/boundary-hierarchy-definition/_search", p95_ms=300)
 def test_boundary_hierarchy_search():
     """Test searching for boundary hierarchy"""
     token = get_auth_token("user")
     client = APIClient(token=token)
 
     # Read hierarchy type from previous test
-    with open("output/ids.txt", "r") as f:
+    with open(ids_file, "r") as f:
         for line in f:
             if line.startswith("Hierarchy Type:"):
                 hierarchy_type = line.split(":")[1].strip()
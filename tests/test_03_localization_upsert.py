@@ -2,7 +2,7 @@ from utils.api_client import APIClient
 from utils.auth import get_auth_token
 from utils.data_loader import load_payload
 from utils.request_info import get_request_info
-from utils.config import tenantId, locale
+from utils.config import tenantId, locale, ids_file
 import pytest
 
 
@@ -13,11 +13,16 @@ def test_localization_upsert():
     client = APIClient(token=token)
 
     # Read hierarchy type
-    with open("output/ids.txt", "r") as f:
+    provisioned = False
+    with open(ids_file, "r") as f:
         for line in f:
             if line.startswith("Hierarchy Type:"):
                 hierarchy_type = line.split(":")[1].strip()
-                break
+            elif line.startswith("Provisioned:"):
+                provisioned = True
+
+    if provisioned:
+        pytest.skip(f"Localization of {hierarchy_type} was upserted when the warm pool provisioned it")
 
     hierarchy_type_lower = hierarchy_type.lower()
 
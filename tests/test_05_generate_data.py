@@ -2,7 +2,8 @@ from utils.api_client import APIClient
 from utils.auth import get_auth_token
 from utils.data_loader import load_payload
 from utils.request_info import get_request_info
-from utils.config import tenantId
+from utils.config import tenantId, ids_file
+from utils.generate_cache import GENERATE_CACHE, definition_key
 import pytest
 
 
@@ -13,11 +14,30 @@ def test_generate_data():
     client = APIClient(token=token)
 
     # Read hierarchy type
-    with open("output/ids.txt", "r") as f:
+    provisioned = False
+    with open(ids_file, "r") as f:
         for line in f:
             if line.startswith("Hierarchy Type:"):
                 hierarchy_type = line.split(":")[1].strip()
-                break
+            elif line.startswith("Provisioned:"):
+                provisioned = True
+
+    if provisioned:
+        pytest.skip(f"Template of {hierarchy_type} was generated when the warm pool provisioned it")
+
+    # Incremental mode: reuse the template of an identical definition instead of regenerating
+    cache_lines = {}
+    if GENERATE_CACHE.enabled:
+        key = definition_key(client, token, hierarchy_type)
+        cached = GENERATE_CACHE.lookup(client, key)
+        if cached:
+            print(f"Definition unchanged (key {key[:12]}), reusing generated template {cached['fileStoreId']} "
+                  f"from {cached['hierarchyType']}")
+            _update_ids({"Generate ID:": "cached", "Generated FileStore ID:": cached["fileStoreId"],
+                         "Generate Cache:": "hit"})
+            return
+        # Test 06 stores the key with the resulting fileStoreId once generation completes
+        cache_lines = {"Generate Cache:": f"miss {key}"}
 
     # Load and prepare payload
     payload = load_payload("boundary_management", "generate_data.json")
@@ -43,15 +63,22 @@ def test_generate_data():
     print(f"Boundary data generation triggered: {generate_id}")
 
     # Update generate ID (overwrite existing)
-    with open("output/ids.txt", "r") as f:
+    _update_ids({"Generate ID:": generate_id, **cache_lines})
+
+
+def _update_ids(values):
+    """Overwrite the given "Label:" lines of ids.txt, appending the ones not present yet"""
+    with open(ids_file, "r") as f:
         lines = f.readlines()
 
-    with open("output/ids.txt", "w") as f:
+    # A cache result from a previous run must not leak into this one
+    if "Generate Cache:" not in values:
+        lines = [line for line in lines if not line.startswith("Generate Cache:")]
+
+    with open(ids_file, "w") as f:
         for line in lines:
-            if line.startswith("Generate ID:"):
-                f.write(f"Generate ID: {generate_id}\n")
-            else:
-                f.write(line)
-        # Add Generate ID if not found
-        if not any(line.startswith("Generate ID:") for line in lines):
-            f.write(f"Generate ID: {generate_id}\n")
+            label = next((label for label in values if line.startswith(label)), None)
+            f.write(f"{label} {values[label]}\n" if label else line)
+        for label, value in values.items():
+            if not any(line.startswith(label) for line in lines):
+                f.write(f"{label} {value}\n")
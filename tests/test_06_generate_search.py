@@ -2,23 +2,34 @@ from utils.api_client import APIClient
 from utils.auth import get_auth_token
 from utils.data_loader import load_payload
 from utils.request_info import get_request_info
-from utils.config import tenantId
+from utils.config import tenantId, ids_file
+from utils.generate_cache import GENERATE_CACHE
+from utils import deadline
 import pytest
-import time
 
 
 @pytest.mark.order(6)
+@pytest.mark.slo(duration_s=60)
 def test_generate_search():
     """Test searching for generated boundary data with polling"""
     token = get_auth_token("user")
     client = APIClient(token=token)
 
-    # Read hierarchy type
-    with open("output/ids.txt", "r") as f:
+    # Read hierarchy type and the incremental-mode outcome of test 05
+    cache_state = ""
+    with open(ids_file, "r") as f:
         for line in f:
             if line.startswith("Hierarchy Type:"):
                 hierarchy_type = line.split(":")[1].strip()
-                break
+            elif line.startswith("Generate Cache:"):
+                cache_state = line.split(":", 1)[1].strip()
+            elif line.startswith("Provisioned:"):
+                cache_state = "provisioned"
+
+    if cache_state == "provisioned":
+        pytest.skip(f"Template of {hierarchy_type} was generated when the warm pool provisioned it")
+    if cache_state == "hit":
+        pytest.skip("Generation skipped: template reused from the incremental generate cache")
 
     # Load and prepare payload
     payload = load_payload("boundary_management", "generate_search.json")
@@ -53,15 +64,16 @@ def test_generate_search():
                 pytest.fail(f"File generation failed with status: {status}")
 
         if attempt < max_attempts - 1:
-            time.sleep(wait_time)
+            # Never sleeps past the run deadline (--deadline); the next poll then fails with its report
+            deadline.sleep(wait_time)
     else:
         pytest.fail(f"File generation did not complete within {max_attempts * wait_time} seconds")
 
     # Save the file store ID
-    with open("output/ids.txt", "r") as f:
+    with open(ids_file, "r") as f:
         lines = f.readlines()
 
-    with open("output/ids.txt", "w") as f:
+    with open(ids_file, "w") as f:
         for line in lines:
             if line.startswith("Generated FileStore ID:"):
                 f.write(f"Generated FileStore ID: {file_store_id}\n")
@@ -70,3 +82,7 @@ def test_generate_search():
         # Add if not found
         if not any(line.startswith("Generated FileStore ID:") for line in lines):
             f.write(f"Generated FileStore ID: {file_store_id}\n")
+
+    # Remember the template for this definition so the next incremental run can skip generation
+    if cache_state.startswith("miss "):
+        GENERATE_CACHE.store(cache_state.split(" ", 1)[1], file_store_id, hierarchy_type)
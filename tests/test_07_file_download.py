@@ -1,6 +1,6 @@
 from utils.api_client import APIClient
 from utils.auth import get_auth_token
-from utils.config import tenantId
+from utils.config import tenantId, ids_file
 import pytest
 
 
@@ -12,7 +12,7 @@ def test_file_download():
 
     # Read file store ID
     file_store_id = None
-    with open("output/ids.txt", "r") as f:
+    with open(ids_file, "r") as f:
         for line in f:
             if line.startswith("Generated FileStore ID:"):
                 file_store_id = line.split(":")[1].strip()
@@ -1,11 +1,13 @@
 from utils.api_client import APIClient
 from utils.auth import get_auth_token
-from utils.config import tenantId, BASE_URL
+from utils.config import tenantId, BASE_URL, ids_file, template_file, upload_file
+from utils.template import populate_template
+from utils.filestore import ARTIFACT_CACHE
+from utils.deadline import request_timeout
 import pytest
 import requests
 import os
 import time
-from openpyxl import load_workbook
 
 
 def prepare_template_for_upload(token):
@@ -16,7 +18,7 @@ def prepare_template_for_upload(token):
 
     # Read Generated FileStore ID from ids.txt
     file_store_id = None
-    with open('output/ids.txt', 'r') as f:
+    with open(ids_file, 'r') as f:
         for line in f:
             if line.startswith('Generated FileStore ID:'):
                 file_store_id = line.split(':')[1].strip()
@@ -25,49 +27,13 @@ def prepare_template_for_upload(token):
     if not file_store_id:
         raise Exception("Generated FileStore ID not found in output/ids.txt")
 
-    # Get download URL from API
-    url = f"/filestore/v1/files/url?tenantId={tenantId}&fileStoreIds={file_store_id}"
-    response = client.get(url)
+    # Download template from S3, or reuse the cached copy of this fileStoreId
+    print(f"  Fetching template {file_store_id}...")
+    ARTIFACT_CACHE.fetch(client, file_store_id, template_file)
 
-    if response.status_code != 200:
-        raise Exception(f"Failed to get download URL: {response.text}")
-
-    download_url = response.json()['fileStoreIds'][0]['url']
-
-    # Download template from S3
-    print(f"  Downloading template from S3...")
-    template_response = requests.get(download_url)
-
-    with open('output/template_downloaded.xlsx', 'wb') as f:
-        f.write(template_response.content)
-
-    # Load both files
-    template_wb = load_workbook('output/template_downloaded.xlsx')
-    sample_wb = load_workbook('utils/sample_boundary.xlsx', data_only=True, read_only=True)
-
-    template_ws = template_wb['Boundary Data']
-    sample_ws = sample_wb['Boundary Data']
-
-    # Copy data from sample (rows 2 onwards only, skip headers)
-    # This preserves the downloaded template's headers in row 1
-    data_rows = []
-    for row in sample_ws.iter_rows(min_row=2, values_only=True):
-        if any(cell for cell in row):
-            data_rows.append(row)
-
-    print(f"  Copying {len(data_rows)} data rows from sample to template...")
-
-    # Write data to template starting from row 2 (row 1 headers are preserved)
-    for row_idx, row_data in enumerate(data_rows, start=2):
-        for col_idx, value in enumerate(row_data, start=1):
-            template_ws.cell(row=row_idx, column=col_idx, value=value)
-
-    # Close sample workbook (read-only)
-    sample_wb.close()
-
-    # Save the populated template
-    template_wb.save('output/sample_boundary.xlsx')
-    template_wb.close()  # Explicitly close to ensure file is fully written
+    # Copy data rows from the reference sample into the template (headers preserved)
+    row_count = populate_template(template_file, upload_file)
+    print(f"  Copied {row_count} data rows from sample to template...")
 
     # Small delay to ensure file is fully flushed to disk
     time.sleep(0.5)
@@ -79,7 +45,7 @@ def test_file_upload():
     """Test uploading a file"""
     token = get_auth_token("user")
 
-    sample_file = "output/sample_boundary.xlsx"
+    sample_file = upload_file
 
     # Always prepare template to ensure it matches the current hierarchy
     print("\nPreparing template for upload...")
@@ -109,7 +75,8 @@ def test_file_upload():
         files=files,
         data=data,
         headers=headers,
-        verify=False
+        verify=False,
+        timeout=request_timeout("/filestore/v1/files")
     )
 
     files['file'][1].close()
@@ -125,10 +92,10 @@ def test_file_upload():
     print(f"File uploaded successfully: {file_store_id}")
 
     # Update file store ID (overwrite existing)
-    with open("output/ids.txt", "r") as f:
+    with open(ids_file, "r") as f:
         lines = f.readlines()
 
-    with open("output/ids.txt", "w") as f:
+    with open(ids_file, "w") as f:
         for line in lines:
             if line.startswith("Uploaded FileStore ID:"):
                 f.write(f"Uploaded FileStore ID: {file_store_id}\n")
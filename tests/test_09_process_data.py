@@ -2,7 +2,7 @@ from utils.api_client import APIClient
 from utils.auth import get_auth_token
 from utils.data_loader import load_payload
 from utils.request_info import get_request_info
-from utils.config import tenantId
+from utils.config import tenantId, ids_file
 import pytest
 
 
@@ -16,7 +16,7 @@ def test_process_data():
     hierarchy_type = None
     file_store_id = None
 
-    with open("output/ids.txt", "r") as f:
+    with open(ids_file, "r") as f:
         for line in f:
             if line.startswith("Hierarchy Type:"):
                 hierarchy_type = line.split(":")[1].strip()
@@ -52,10 +52,10 @@ def test_process_data():
     print(f"Boundary data processing triggered: {process_id}")
 
     # Update process ID (overwrite existing)
-    with open("output/ids.txt", "r") as f:
+    with open(ids_file, "r") as f:
         lines = f.readlines()
 
-    with open("output/ids.txt", "w") as f:
+    with open(ids_file, "w") as f:
         for line in lines:
             if line.startswith("Process ID:"):
                 f.write(f"Process ID: {process_id}\n")
@@ -2,7 +2,7 @@ from utils.api_client import APIClient
 from utils.auth import get_auth_token
 from utils.data_loader import load_payload
 from utils.request_info import get_request_info
-from utils.config import tenantId
+from utils.config import tenantId, ids_file
 import pytest
 
 
@@ -14,7 +14,7 @@ def test_process_search():
 
     # Read process ID
     process_id = None
-    with open("output/ids.txt", "r") as f:
+    with open(ids_file, "r") as f:
         for line in f:
             if line.startswith("Process ID:"):
                 process_id = line.split(":")[1].strip()
@@ -46,5 +46,5 @@ def test_process_search():
 
     if processed_filestore_id:
         print(f"Processed file store ID: {processed_filestore_id}")
-        with open("output/ids.txt", "a") as f:
+        with open(ids_file, "a") as f:
             f.write(f"Processed FileStore ID: {processed_filestore_id}\n")
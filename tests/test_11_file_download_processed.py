@@ -1,35 +1,37 @@
+import os
 from utils.api_client import APIClient
 from utils.auth import get_auth_token
-from utils.config import tenantId
+from utils.config import ids_file, output_dir
+from utils.filestore import ARTIFACT_CACHE
+from utils.processed_file import verify_processed_file
 import pytest
 
 
 @pytest.mark.order(11)
 def test_file_download_processed():
-    """Test downloading processed file"""
+    """Test downloading the processed file and verifying every row was accepted"""
     token = get_auth_token("user")
     client = APIClient(token=token)
 
-    # Read processed file store ID
+    # Read processed file store ID and hierarchy type
     file_store_id = None
-    with open("output/ids.txt", "r") as f:
+    hierarchy_type = None
+    with open(ids_file, "r") as f:
         for line in f:
             if line.startswith("Processed FileStore ID:"):
                 file_store_id = line.split(":")[1].strip()
-                break
+            elif line.startswith("Hierarchy Type:"):
+                hierarchy_type = line.split(":")[1].strip()
 
     if not file_store_id:
         pytest.skip("No processed file store ID found")
 
-    # Make API call
-    url = f"/filestore/v1/files/url?tenantId={tenantId}&fileStoreIds={file_store_id}"
-    response = client.get(url)
+    # Stream the file to disk (or reuse the cached copy) and verify the per-row status/error
+    # columns without loading it into memory
+    path = ARTIFACT_CACHE.fetch(client, file_store_id, os.path.join(output_dir, f"processed_{file_store_id}.xlsx"))
+    print(f"Processed file downloaded: {path}")
+    report = verify_processed_file(path, hierarchy_type=hierarchy_type)
+    print(report.summary())
 
-    assert response.status_code == 200, f"Processed file download URL retrieval failed: {response.text}"
-
-    data = response.json()
-    assert "fileStoreIds" in data
-    assert len(data["fileStoreIds"]) > 0
-
-    download_url = data["fileStoreIds"][0]["url"]
-    print(f"Processed file download URL retrieved: {download_url[:100]}...")
+    assert report.rows > 0, "Processed file has no data rows"
+    assert report.ok, f"Processed file has failed rows:\n{report.summary()}"
@@ -2,7 +2,7 @@ from utils.api_client import APIClient
 from utils.auth import get_auth_token
 from utils.data_loader import load_payload
 from utils.request_info import get_request_info
-from utils.config import tenantId, locale_french
+from utils.config import tenantId, locale_french, ids_file
 import pytest
 
 
@@ -13,7 +13,7 @@ def test_localization_search_french():
     client = APIClient(token=token)
 
     # Read hierarchy type
-    with open("output/ids.txt", "r") as f:
+    with open(ids_file, "r") as f:
         for line in f:
             if line.startswith("Hierarchy Type:"):
                 hierarchy_type = line.split(":")[1].strip()
@@ -2,13 +2,12 @@ from utils.api_client import APIClient
 from utils.auth import get_auth_token
 from utils.data_loader import load_payload
 from utils.request_info import get_request_info
-from utils.config import tenantId
+from utils.config import tenantId, ids_file
+from utils.boundary_stream import stream_boundary_nodes, TreeSummary
+from utils.logger import get_logger, log_event
 import pytest
-import json
-import logging
 
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 
 @pytest.mark.order(15)
@@ -18,7 +17,7 @@ def test_boundary_relationship_search():
     client = APIClient(token=token)
 
     # Read hierarchy type
-    with open("output/ids.txt", "r") as f:
+    with open(ids_file, "r") as f:
         for line in f:
             if line.startswith("Hierarchy Type:"):
                 hierarchy_type = line.split(":")[1].strip()
@@ -32,23 +31,24 @@ def test_boundary_relationship_search():
 
     # Make API call with includeChildren=true
     url = f"/boundary-service/boundary-relationships/_search?tenantId={tenantId}&includeChildren=true&hierarchyType={hierarchy_type}"
-    response = client.post(url, payload)
+    response = client.post_stream(url, payload)
 
     assert response.status_code == 200, f"Boundary relationship search failed: {response.text}"
 
-    data = response.json()
-    assert "TenantBoundary" in data
-
-    # Log response details
-    logger.info("="*80)
-    logger.info("TEST 15 - BOUNDARY RELATIONSHIP SEARCH - RESPONSE")
-    logger.info("="*80)
-    logger.info(f"Status Code: {response.status_code}")
-    logger.info(f"Response Data:\n{json.dumps(data, indent=2)}")
-    logger.info("="*80)
-
-    if data["TenantBoundary"] and len(data["TenantBoundary"]) > 0:
-        boundary_count = len(data["TenantBoundary"][0].get("boundary", []))
-        print(f"Boundary relationships found: {boundary_count} boundaries")
+    # Walk the tree node by node instead of materializing (and re-dumping) the whole response
+    summary = TreeSummary()
+    for node in stream_boundary_nodes(response, top_keys=summary.top_keys):
+        assert node.hierarchy_type in (None, hierarchy_type), f"Unexpected hierarchy type {node.hierarchy_type}"
+        summary.add(node)
+    assert "TenantBoundary" in summary.top_keys
+
+    # Log response details (written to logs/api.jsonl by a background thread)
+    log_event(logger, "TEST 15 - BOUNDARY RELATIONSHIP SEARCH - RESPONSE", status=response.status_code,
+              hierarchy_type=hierarchy_type, nodes=summary.nodes, depth=summary.max_depth + 1,
+              by_type=summary.by_type, roots=summary.roots[:10])
+
+    assert not summary.problems, "Malformed boundary nodes:\n" + "\n".join(summary.problems)
+    if summary.nodes:
+        print(f"Boundary relationships found: {len(summary.roots)} root boundaries, {summary.nodes} in total")
     else:
         print("No boundary relationships found yet")
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from utils.boundary_stream import StreamParseError, TreeSummary, iter_boundary_nodes, iter_json_events
+
+TREE = {
+    "ResponseInfo": {"status": "successful"},
+    "TenantBoundary": [{
+        "tenantId": "mz",
+        "hierarchyType": "H",
+        "boundary": [{
+            "id": "1", "code": "H_1", "boundaryType": "Country",
+            "children": [
+                {"id": "2", "code": "H_2", "boundaryType": "Province", "children": []},
+                {"id": "3", "code": "H_3", "boundaryType": "Province",
+                 "children": [{"id": "4", "code": "H_4", "boundaryType": "District", "children": []}]},
+            ],
+        }],
+    }],
+}
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_events_survive_any_chunk_boundary():
+    body = json.dumps({"a": [1, -2.5e3, True, None, "é\\\"x"], "b": {}}, ensure_ascii=False).encode("utf-8")
+    expected = list(iter_json_events([body]))
+    for size in (1, 2, 3, 7):
+        assert list(iter_json_events(chunked(body, size))) == expected
+    assert ("value", -2500.0) in expected
+    assert ("value", 'é\\"x') in expected
+
+
+def test_nodes_come_out_children_first_with_parent_and_depth():
+    body = json.dumps(TREE).encode("utf-8")
+    top_keys = set()
+    nodes = list(iter_boundary_nodes(chunked(body, 5), top_keys))
+    assert [n.code for n in nodes] == ["H_2", "H_4", "H_3", "H_1"]
+    by_code = {n.code: n for n in nodes}
+    assert by_code["H_4"].parent_code == "H_3" and by_code["H_4"].depth == 2
+    assert by_code["H_1"].parent_code is None and by_code["H_1"].depth == 0
+    assert all(n.hierarchy_type == "H" for n in nodes)
+    assert top_keys == {"ResponseInfo", "TenantBoundary"}
+
+
+def test_tree_summary_counts_levels_and_flags_orphans():
+    summary = TreeSummary()
+    for node in iter_boundary_nodes([json.dumps(TREE)]):
+        summary.add(node)
+    assert summary.nodes == 4 and summary.max_depth == 2 and summary.roots == ["H_1"]
+    assert summary.by_type == {"Province": 2, "District": 1, "Country": 1}
+    assert not summary.problems
+
+    # A child whose parent has no code
+    orphan = {"TenantBoundary": [{"boundary": [{"boundaryType": "Country",
+                                                "children": [{"code": "C", "boundaryType": "Province"}]}]}]}
+    summary = TreeSummary()
+    for node in iter_boundary_nodes([json.dumps(orphan)]):
+        summary.add(node)
+    assert summary.problems == ["C has no parent code", "node at depth 0 without code/boundaryType: "
+                                                        "{'boundaryType': 'Country'}"]
+
+
+def test_truncated_body_is_an_error():
+    with pytest.raises(StreamParseError):
+        list(iter_boundary_nodes([json.dumps(TREE)[:-3]]))
@@ -0,0 +1,45 @@
+import requests
+
+from utils.contracts import ContractChecker, Nullable, OneOf, compile_contract, validator_for
+
+
+def response(status, body):
+    r = requests.Response()
+    r.status_code = status
+    r._content = body.encode("utf-8")
+    return r
+
+
+def test_compiled_contract_reports_the_first_violation():
+    validate = compile_contract({"items": [{"id": str, "count?": int, "note": Nullable(str)}],
+                                 "detail": OneOf([str], str)})
+    assert validate({"items": [{"id": "a", "note": None}], "detail": "x"}) is None
+    assert validate({"items": [{"id": "a", "count": 2, "note": "n"}], "detail": ["x"]}) is None
+    assert validate({"items": [{"id": "a"}], "detail": "x"}) == "$.items[].note: missing"
+    assert validate({"items": [{"id": 1, "note": None}], "detail": "x"}) == "$.items[].id: expected str"
+    assert validate({"items": [{"id": "a", "count": "2", "note": None}], "detail": "x"}) \
+        == "$.items[].count: expected int"
+    assert validate({"items": {}, "detail": "x"}) == "$.items: expected array"
+    assert validate({"items": [], "detail": 3}) == "$.detail: matches none of the allowed shapes"
+    assert validate([]) == "$: expected object"
+
+
+def test_validator_for_matches_the_longest_path_suffix():
+    assert validator_for("/boundary-management/v1/_process-search?tenantId=mz") \
+        is not validator_for("/boundary-management/v1/_process")
+    assert validator_for("/filestore/v1/files/url?fileStoreIds=1")({"fileStoreIds": [{"id": "1", "url": "u"}]}) is None
+    assert validator_for("/user/oauth/token") is None
+
+
+def test_checker_skips_errors_and_reuses_the_parsed_body():
+    checker = ContractChecker(sample_rate=1)
+    endpoint = "/localization/messages/v1/_search?locale=en_MZ"
+    ok = response(200, '{"messages": [{"code": "A", "message": null}]}')
+    assert checker.check(endpoint, ok) is True
+    assert ok.json() == {"messages": [{"code": "A", "message": None}]}
+
+    assert checker.check(endpoint, response(200, '{"messages": [{"message": "x"}]}')) is False
+    assert checker.last_violation["/localization/messages/v1/_search"] == "$.messages[].code: missing"
+    assert checker.check(endpoint, response(200, "<html>")) is False
+    assert checker.check(endpoint, response(500, "{}")) is None
+    assert ContractChecker(sample_rate=0).check(endpoint, ok) is None
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+import requests
+
+from utils import api_client, deadline
+from utils.api_client import APIClient
+from utils.deadline import Deadline, DeadlineExceeded, Timeouts, can_wait, request_timeout
+from utils.rate_limiter import Budget, RateLimiter
+
+
+def test_timeouts_longest_prefix_wins():
+    timeouts = Timeouts.from_spec("/filestore/v1/files=5:300, /boundary-management/=120", default=(5, 60))
+    assert timeouts.for_endpoint("/filestore/v1/files?tenantId=mz") == (5, 300)
+    assert timeouts.for_endpoint("/boundary-management/v1/_process") == (5, 120)
+    assert timeouts.for_endpoint("/localization/messages/v1/_search") == (5, 60)
+
+
+def test_request_timeout_is_capped_to_the_remaining_budget(monkeypatch):
+    monkeypatch.setattr(deadline, "TIMEOUTS", Timeouts((5.0, 60.0)))
+    assert request_timeout("/x") == (5.0, 60.0)
+    with Deadline(2, name="run").step("search"):
+        connect, read = request_timeout("/x")
+        assert connect <= 2 and read <= 2
+        assert can_wait(1) and not can_wait(3)
+
+
+def test_exceeded_deadline_names_the_step_and_spent_time():
+    run = Deadline(0.05, name="run")
+    with run.step("generate_search"):
+        deadline.sleep(10)  # never sleeps past the deadline
+        with pytest.raises(DeadlineExceeded) as error:
+            request_timeout("/boundary-management/v1/_generate-search?id=1")
+    message = str(error.value)
+    assert "run deadline of 0.05 s exceeded at generate_search (/boundary-management/v1/_generate-search)" in message
+    assert "time spent: generate_search " in message
+    assert run.spent["generate_search"] < 1
+
+
+def test_rate_limit_waits_stop_at_the_deadline():
+    budget = Budget("/x", max_in_flight=1)
+    with budget.acquire():
+        with Deadline(0.1).step("s"):
+            start = time.monotonic()
+            with pytest.raises(DeadlineExceeded):
+                with budget.acquire():
+                    pass
+            assert time.monotonic() - start < 1
+    assert budget.stats()["in_flight"] == 0
+
+
+def test_timeout_is_computed_after_the_rate_limit_wait(monkeypatch):
+    timeouts = []
+
+    def fake_request(method, url, **kwargs):
+        timeouts.append(kwargs["timeout"])
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"{}"
+        response.request = requests.Request(method, url).prepare()
+        return response
+
+    monkeypatch.setattr(api_client.http_phases, "request", fake_request)
+    client = APIClient(token="t", rate_limiter=RateLimiter.from_spec("/unit-test/=2"))
+    with Deadline(2).step("s"):
+        client.get("/unit-test/a")
+        client.get("/unit-test/a")  # waits ~0.5 s for a token, one per request at 2 rps after the burst
+        client.get("/unit-test/a")
+    assert timeouts[-1][1] < 2 - 0.4
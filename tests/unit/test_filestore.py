@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from utils import filestore
+from utils.filestore import ArtifactCache
+
+FILES = {"small": b"s" * 1000, "other": b"o" * 1500, "copy": b"s" * 1000, "big": b"b" * 5000}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = FILES[self.path.strip("/")]
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+class UrlClient:
+    """/filestore/v1/files/url answered locally; counts the lookups"""
+
+    def __init__(self, base):
+        self.base = base
+        self.lookups = 0
+
+    def get(self, endpoint):
+        self.lookups += 1
+        ids = endpoint.split("fileStoreIds=")[1].split(",")
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(
+            {"fileStoreIds": [{"id": i, "url": f"{self.base}/{i}"} for i in ids]}).encode()
+        return response
+
+
+def test_hits_are_shared_between_processes_and_corrupt_blobs_refetched(server, tmp_path):
+    client = UrlClient(server)
+    first, second = ArtifactCache(str(tmp_path), 4000), ArtifactCache(str(tmp_path), 4000)
+    paths = first.fetch_many(client, ["small", "other", "copy"])
+    assert client.lookups == 1 and first.misses == 3
+    assert paths["small"] == paths["copy"]  # identical bytes stored once
+
+    # A second process (its own instance) sees what the first stored
+    dest = tmp_path / "out" / "small.xlsx"
+    assert second.fetch(client, "small", str(dest)) == str(dest) and dest.read_bytes() == FILES["small"]
+    assert (second.hits, second.misses, client.lookups) == (1, 0, 1)
+
+    with open(paths["other"], "r+b") as f:
+        f.write(b"x")
+    assert open(second.fetch(client, "other"), "rb").read() == FILES["other"]
+    assert second.misses == 1
+
+
+def test_eviction_does_not_pull_an_open_blob_from_under_a_copy(server, tmp_path):
+    client = UrlClient(server)
+    cache = ArtifactCache(str(tmp_path), 2000)
+    path, f = cache._fetch(client, ["small"], "mz")["small"]
+    ArtifactCache(str(tmp_path), 2000).fetch(client, "other")  # evicts "small" in another "process"
+    with f:
+        assert not os.path.exists(path) or os.name == "nt"
+        assert f.read() == FILES["small"]
+
+
+def test_oversized_artifacts_get_a_file_per_fetch_and_are_cleaned_up(server, tmp_path, monkeypatch):
+    client = UrlClient(server)
+    cache = ArtifactCache(str(tmp_path), 4000)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.fetch(client, "big"))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(results)) == 4 and all(open(p, "rb").read() == FILES["big"] for p in results)
+    dest = tmp_path / "big.xlsx"
+    cache.fetch(client, "big", str(dest))
+    assert dest.read_bytes() == FILES["big"]
+    assert sorted(os.listdir(cache.uncached_dir())) == sorted(os.path.basename(p) for p in results)
+
+    cache._cleanup()  # at exit
+    assert os.listdir(cache.uncached_dir()) == []
+
+    # Files left by a killed process are swept by the next process's first fetch
+    stale = os.path.join(cache.uncached_dir(), "left.part")
+    open(stale, "wb").close()
+    os.utime(stale, (0, 0))
+    monkeypatch.setattr(filestore, "UNCACHED_MAX_AGE_S", 60)
+    ArtifactCache(str(tmp_path), 4000).fetch(client, "small")
+    assert not os.path.exists(stale)
@@ -0,0 +1,81 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from utils import http_phases
+from utils.http_phases import PhaseTimer, new_session, timing
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = b"x" * 4096
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://localhost:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_unmeasured_phases_are_left_out():
+    timer = PhaseTimer()
+    timer.send = 0.001
+    assert timer.phases() == {"send": 0.001}
+    timer.finish()  # no headers yet: transfer stays unmeasured
+    assert timer.transfer is None
+
+
+def test_new_connection_then_reuse(server):
+    with new_session() as session:
+        with timing() as first:
+            assert session.get(server + "/a").status_code == 200
+            first.finish()
+        with timing() as second:
+            session.get(server + "/b")
+            second.finish()
+    assert first.new_connection and set(first.phases()) == {"dns", "connect", "send", "ttfb", "transfer"}
+    assert not second.new_connection and set(second.phases()) == {"send", "ttfb", "transfer"}
+    assert http_phases.current() is None
+
+
+def test_connect_falls_back_to_the_next_resolved_address(server, monkeypatch):
+    # A port nobody listens on
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    refused_port = closed.getsockname()[1]
+    closed.close()
+    real_getaddrinfo = socket.getaddrinfo
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        infos = real_getaddrinfo("127.0.0.1" if host == "localhost" else host, port, *args, **kwargs)
+        if host != "localhost":
+            return infos
+        # 127.0.0.2 first: the server only listens on 127.0.0.1, so it refuses the connection
+        return [(info[0], info[1], info[2], info[3], ("127.0.0.2", port)) for info in infos[:1]] + infos
+
+    monkeypatch.setattr(http_phases.socket, "getaddrinfo", getaddrinfo)
+    with new_session() as session, timing() as timer:
+        assert session.get(server + "/c").status_code == 200
+    assert timer.new_connection and timer.connect is not None
+
+    # Every address refused: the last error is raised as a connection error
+    with new_session() as session, timing():
+        with pytest.raises(requests.ConnectionError):
+            session.get(f"http://localhost:{refused_port}/d", timeout=2)
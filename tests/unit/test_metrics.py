@@ -0,0 +1,90 @@
+import bisect
+
+import pytest
+
+from utils.metrics import BUCKETS, EndpointStats, Histogram, MetricsRecorder, endpoint_key
+
+
+def histogram(*values):
+    h = Histogram()
+    for v in values:
+        h.observe(v)
+    return h
+
+
+def test_percentiles_are_within_one_bucket():
+    h = histogram(*[0.010] * 90, *[0.200] * 9, 1.5)
+    assert h.count == 100 and h.max == 1.5
+    assert 0.010 / 1.25 <= h.percentile(50) < 0.010 * 1.25
+    assert 0.200 / 1.25 <= h.percentile(95) < 0.200 * 1.25
+    assert h.percentile(100) == 1.5
+    assert h.mean() == pytest.approx((0.9 + 1.8 + 1.5) / 100)
+    assert histogram(1000.0).percentile(99) == 1000.0  # overflow bucket
+    assert Histogram().percentile(95) == 0.0
+
+
+def test_percentile_interpolates_within_the_bucket():
+    assert histogram(*[0.270] * 100).percentile(95) == 0.270  # never above max
+    # Just under a bucket bound (~0.3308 s) with one slow outlier: not reported as the bucket bound
+    bound = BUCKETS[bisect.bisect_left(BUCKETS, 0.330)]
+    assert 0.330 < bound and histogram(*[0.330] * 99, 2.0).percentile(95) <= 0.330
+    # Evenly spread 1..300 ms: true p95 ~0.286 s, the bucket bound would be ~0.331 s
+    spread = histogram(*[i / 1000 for i in range(1, 301)])
+    assert spread.percentile(95) == pytest.approx(0.286, rel=0.08)
+    assert spread.percentile(100) == 0.300
+
+
+def test_merge_equals_observing_everything_in_one_histogram():
+    a, b = histogram(0.01, 0.5), histogram(0.02, 3.0)
+    a.merge(b)
+    combined = histogram(0.01, 0.5, 0.02, 3.0)
+    assert (a.counts, a.count, a.sum, a.max) == (combined.counts, combined.count, combined.sum, combined.max)
+    restored = Histogram.from_dict(a.to_dict())
+    assert (restored.counts, restored.count, restored.max) == (a.counts, a.count, a.max)
+
+
+def test_subtract_bounds_the_interval_max_by_its_own_buckets():
+    before = histogram(30.0)
+    after = histogram(30.0, 0.1, 0.12)
+    delta = after.subtract(before)
+    assert delta.count == 2 and delta.sum == pytest.approx(0.22)
+    # Not the cumulative 30 s: within the highest bucket seen in the interval, and no more than the
+    # interval's sum allows (0.22 s minus the lower bound of the 0.1 s bucket)
+    bound = BUCKETS[bisect.bisect_left(BUCKETS, 0.1) - 1]
+    assert delta.max == pytest.approx(0.22 - bound)
+    assert 0.12 <= delta.max < BUCKETS[bisect.bisect_left(BUCKETS, 0.12)]
+    assert histogram(*[0.270] * 10).subtract(Histogram()).max == 0.270
+    assert after.subtract(after).max == 0.0
+
+
+def test_recorder_delta_and_interval_reset():
+    recorder = MetricsRecorder()
+    key = endpoint_key("post", "/localization/messages/v1/_search?locale=fr_MZ")
+    assert key == "POST /localization/messages/v1/_search"
+    recorder.record(key, 0.05)
+    recorder.record_phases(key, {"dns": 0.001, "ttfb": 0.04}, new_connection=True)
+    before = recorder.snapshot()
+
+    recorder.record(key, 0.07, ok=False, contract_ok=False)
+    recorder.record_phases(key, {"ttfb": 0.06}, new_connection=False)
+    recorder.record("GET /other", 0.01)
+    delta = recorder.delta(before)
+    assert delta[key].latency.count == 1 and delta[key].errors == 1 and delta[key].contract_violations == 1
+    assert delta[key].connections_new == 0 and delta[key].connections_reused == 1
+    assert delta[key].phases["dns"].count == 0 and delta[key].phases["ttfb"].count == 1
+    assert delta["GET /other"].latency.count == 1
+
+    rows = {r["endpoint"]: r for r in recorder.summary(reset=True)}
+    assert rows[key]["count"] == 2 and rows[key]["error_rate"] == 0.5
+    assert rows[key]["dns_ms"] == pytest.approx(1.0) and rows[key]["tls_ms"] is None
+    assert recorder.summary() == []
+    assert recorder.cumulative()[key].latency.count == 2
+
+
+def test_endpoint_stats_round_trip():
+    stats = EndpointStats()
+    stats.latency.observe(0.2)
+    stats.errors = 3
+    stats.phases["connect"].observe(0.003)
+    restored = EndpointStats.from_dict(stats.to_dict())
+    assert restored.errors == 3 and restored.latency.count == 1 and restored.phases["connect"].count == 1
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils.rate_limiter import Budget, RateLimiter, TokenBucket
+
+
+def test_from_spec_longest_prefix_wins():
+    limiter = RateLimiter.from_spec("/boundary-management/=2:4, /boundary-management/v1/_process=0:1,/localization/=20")
+    assert limiter.budget_for("/boundary-management/v1/_process?x=1").prefix == "/boundary-management/v1/_process"
+    assert limiter.budget_for("/boundary-management/v1/_generate").max_in_flight == 4
+    assert limiter.budget_for("/localization/messages/v1/_search").bucket.rate == 20
+    assert limiter.budget_for("/boundary-management/v1/_process").bucket is None
+    assert limiter.budget_for("/filestore/v1/files") is None
+
+
+def test_token_bucket_spends_the_burst_then_spaces_calls():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_max_in_flight_is_shared_by_sync_and_async_callers():
+    budget = Budget("/x", max_in_flight=2)
+    lock = threading.Lock()
+    active = {"now": 0, "peak": 0}
+
+    def enter():
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+
+    def leave():
+        with lock:
+            active["now"] -= 1
+
+    def sync_call():
+        with budget.acquire():
+            enter()
+            time.sleep(0.01)
+            leave()
+
+    async def async_call():
+        async with budget.acquire_async():
+            enter()
+            await asyncio.sleep(0.01)
+            leave()
+
+    async def main():
+        threads = [threading.Thread(target=lambda: [sync_call() for _ in range(5)]) for _ in range(2)]
+        for t in threads:
+            t.start()
+        await asyncio.gather(*(async_call() for _ in range(10)))
+        await asyncio.to_thread(lambda: [t.join() for t in threads])
+
+    asyncio.run(main())
+    assert active["peak"] == 2
+    stats = budget.stats()
+    assert stats["requests"] == 20 and stats["in_flight"] == 0
+
+
+def test_slot_is_released_when_the_caller_fails_or_is_cancelled():
+    budget = Budget("/x", max_in_flight=1)
+    with pytest.raises(RuntimeError):
+        with budget.acquire():
+            raise RuntimeError("request failed")
+    assert budget.slots.acquire(blocking=False)
+    budget.slots.release()
+
+    async def main():
+        async with budget.acquire_async():
+            waiter = asyncio.create_task(budget.acquire_async().__aenter__())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+        async with budget.acquire_async():
+            pass
+
+    asyncio.run(main())
+    assert budget.stats()["in_flight"] == 0 and not budget._waiters
+    assert budget.slots.acquire(blocking=False)
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from utils.resilience import (CircuitBreaker, CircuitOpenError, RetryPolicy, never_connected, parse_retry_after,
+                              policy_for, service_of, SEARCH_POLICY, CREATE_POLICY)
+
+
+def connection_error(reason):
+    """requests' wrapping of a urllib3 failure: ConnectionError(MaxRetryError(reason=...))"""
+    return requests.ConnectionError(MaxRetryError(None, "/x", reason))
+
+
+def test_policy_for_searches_and_creates():
+    assert policy_for("POST", "/boundary-service/boundary-hierarchy-definition/_search?limit=10") is SEARCH_POLICY
+    assert policy_for("GET", "/filestore/v1/files/url?fileStoreIds=1") is SEARCH_POLICY
+    assert policy_for("POST", "/boundary-management/v1/_process-search") is SEARCH_POLICY
+    assert policy_for("POST", "/boundary-service/boundary-hierarchy-definition/_create") is CREATE_POLICY
+    assert service_of("/boundary-service/boundary/_search?x=1") == "boundary-service"
+
+
+def test_create_retries_only_requests_that_were_never_sent():
+    policy = RetryPolicy(idempotent=False)
+    assert policy.should_retry_error(requests.ConnectTimeout())
+    assert policy.should_retry_error(connection_error(NewConnectionError(None, "Connection refused")))
+    # The request may have reached the service
+    assert not policy.should_retry_error(requests.ReadTimeout())
+    assert not policy.should_retry_error(requests.ConnectionError(ProtocolError("Connection aborted.")))
+    assert not policy.should_retry_status(502)
+    assert policy.should_retry_status(503)
+
+
+def test_search_retries_any_connection_error():
+    policy = RetryPolicy(idempotent=True)
+    assert policy.should_retry_error(requests.ReadTimeout())
+    assert policy.should_retry_error(requests.ConnectionError(ProtocolError("Connection aborted.")))
+    assert policy.should_retry_status(502)
+    assert not policy.should_retry_status(500)
+
+
+def test_never_connected_follows_causes():
+    try:
+        try:
+            raise NewConnectionError(None, "Name or service not known")
+        except NewConnectionError as e:
+            raise RuntimeError("wrapped") from e
+    except RuntimeError as wrapped:
+        assert never_connected(wrapped)
+    assert not never_connected(requests.ReadTimeout())
+
+
+def test_backoff_honours_retry_after():
+    policy = RetryPolicy(base_delay=1, max_delay=10)
+    response = requests.Response()
+    response.headers["Retry-After"] = "3"
+    assert policy.backoff(0, response) == 3
+    response.headers["Retry-After"] = "120"
+    assert policy.backoff(0, response) == 10
+    assert all(0 <= policy.backoff(attempt) <= 10 for attempt in range(8))
+    assert parse_retry_after("not a date") is None
+
+
+def test_circuit_opens_and_admits_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.before_call("svc")
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("svc")
+
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+    breaker.before_call("svc")  # the probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("svc")
+
+    # A failed probe re-opens the circuit for another cooldown; a successful one closes it
+    breaker.record_failure()
+    assert breaker.state == "open"
+    time.sleep(0.06)
+    breaker.before_call("svc")
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call("svc")
+    breaker.before_call("svc")
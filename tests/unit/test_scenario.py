@@ -0,0 +1,40 @@
+import pytest
+
+from utils import resilience
+from utils.resilience import CircuitBreaker
+from utils.scenario import ScenarioRunner
+
+
+class FixedToken:
+    def get(self):
+        return "t"
+
+    def invalidate(self, token):
+        pass
+
+
+@pytest.fixture
+def open_breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    monkeypatch.setattr(resilience, "_breakers", {"unit-test": breaker})
+    return breaker
+
+
+def test_open_circuit_fails_the_step_instead_of_the_run(open_breaker):
+    scenario = {"name": "unit", "steps": [
+        {"name": "search", "endpoint": "/unit-test/_search", "method": "POST", "body": {}},
+        {"name": "after", "endpoint": "/unit-test/_search", "method": "POST", "body": {}},
+    ]}
+    result = ScenarioRunner(scenario, tokens=FixedToken()).run()
+    assert not result.ok and [step.name for step in result.steps] == ["search"]
+    assert result.steps[0].error.startswith("CircuitOpenError: Circuit open for unit-test")
+
+    result = ScenarioRunner(scenario, tokens=FixedToken()).run(stop_on_failure=False)
+    assert [step.ok for step in result.steps] == [False, False]
+
+
+def test_any_step_error_is_recorded():
+    # A malformed step (no endpoint) raises KeyError inside the step
+    result = ScenarioRunner({"name": "unit", "steps": [{"name": "broken"}]}, tokens=FixedToken()).run()
+    assert not result.ok and result.steps[0].error.startswith("KeyError")
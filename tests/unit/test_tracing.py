@@ -0,0 +1,60 @@
+import json
+import os
+
+import pytest
+
+from utils import tracing
+from utils.api_client import APIClient
+from utils.tracing import TraceWriter, current_span, msg_id, span
+
+
+@pytest.fixture
+def writer(tmp_path, monkeypatch):
+    writer = TraceWriter(str(tmp_path), flush_spans=2)
+    monkeypatch.setattr(tracing, "WRITER", writer)
+    return writer
+
+
+def test_spans_nest_into_one_trace(writer):
+    outer = current_span()  # the test's own span when the trace_tests plugin is active
+    with span("run") as root:
+        with span("POST /localization/messages/v1/_search", kind="CLIENT", remote_service="localization") as child:
+            assert current_span() is child
+        assert current_span() is root
+    assert current_span() is outer
+
+    assert child.trace_id == root.trace_id and child.parent_id == root.span_id
+    assert len(root.trace_id) == 32 and len(root.span_id) == 16
+    headers = child.headers()
+    assert headers["traceparent"] == f"00-{root.trace_id}-{child.span_id}-01"
+    assert headers["b3"] == f"{root.trace_id}-{child.span_id}-1-{root.span_id}"
+
+
+def test_failed_span_is_tagged_and_written(writer, tmp_path):
+    with pytest.raises(ValueError):
+        with span("step"):
+            raise ValueError("bad payload")
+    with span("next"):
+        pass
+    files = os.listdir(tmp_path)
+    assert len(files) == 1 and f"_{os.getpid()}" in files[0]
+    with open(tmp_path / files[0], encoding="utf-8") as f:
+        spans = json.load(f)
+    assert [s["name"] for s in spans] == ["step", "next"]
+    assert spans[0]["tags"]["error"] == "ValueError: bad payload"
+    assert spans[0]["localEndpoint"]["serviceName"] == tracing.SERVICE_NAME
+
+    with span("last"):
+        pass
+    writer.flush()
+    assert len(os.listdir(tmp_path)) == 2  # a second part for the spans left at exit
+
+
+def test_msg_id_carries_the_span_ids_and_leaves_the_payload_alone(writer):
+    payload = {"RequestInfo": {"msgId": "1700000000000|fr_MZ"}, "criteria": {}}
+    with span("call") as active:
+        assert msg_id("en_MZ").endswith(f"|en_MZ|{active.trace_id}-{active.span_id}")
+        headers, kwargs = APIClient(token="t")._trace({"Authorization": "Bearer t"}, {"json": payload})
+    assert headers["X-Correlation-Id"] == active.trace_id and headers["Authorization"] == "Bearer t"
+    assert kwargs["json"]["RequestInfo"]["msgId"].split("|")[1:] == ["fr_MZ", f"{active.trace_id}-{active.span_id}"]
+    assert payload["RequestInfo"]["msgId"] == "1700000000000|fr_MZ"
@@ -0,0 +1,50 @@
+from openpyxl import Workbook, load_workbook
+
+from utils import xlsx_reader
+from utils.xlsx_reader import XlsxReader, column_index, iter_rows
+
+
+def write_workbook(path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Boundary Data"
+    ws.append(["Country", "Province", "Code", "Latitude", "Active"])
+    for i in range(300):
+        ws.append([f"Country {i % 3}", f"Province {i}", f"H_{i}", -25.5 + i / 100, i % 2 == 0])
+    ws.cell(row=305, column=2, value="after a gap")
+    ws.cell(row=305, column=7, value=12)
+    wb.create_sheet("Other").append(["x"])
+    wb.save(path)
+
+
+def openpyxl_rows(path, sheet_name):
+    wb = load_workbook(path, read_only=True)
+    try:
+        return list(wb[sheet_name].iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+
+def test_column_index():
+    assert [column_index(c) for c in ("A", "L", "Z", "AA", "AB")] == [0, 11, 25, 26, 27]
+
+
+def test_rows_match_openpyxl(tmp_path):
+    path = str(tmp_path / "boundaries.xlsx")
+    write_workbook(path)
+    with XlsxReader(path) as reader:
+        assert reader.sheetnames == ["Boundary Data", "Other"]
+        assert reader.dimensions("Boundary Data") == (305, 7)
+        rows = list(reader.iter_rows("Boundary Data"))
+    assert rows == openpyxl_rows(path, "Boundary Data")
+    assert rows[1] == ("Country 0", "Province 0", "H_0", -25.5, True, None, None)
+    assert rows[302] == (None,) * 7
+    assert list(iter_rows(path)) == rows  # first sheet by default
+
+
+def test_parallel_parse_keeps_row_order(tmp_path, monkeypatch):
+    path = str(tmp_path / "boundaries.xlsx")
+    write_workbook(path)
+    monkeypatch.setattr(xlsx_reader, "PARALLEL_MIN_BYTES", 0)
+    with XlsxReader(path) as reader:
+        assert list(reader.iter_rows("Boundary Data", workers=3)) == list(reader.iter_rows("Boundary Data"))
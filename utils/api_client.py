@@ -1,9 +1,25 @@
 from utils.auth import get_auth_token
-from utils.config import BASE_URL
+from utils.config import BASE_URL, gzip_requests, gzip_request_min_bytes
+from utils.deadline import request_timeout, can_wait, check as check_deadline
+from utils.resilience import policy_for, service_of, breaker_for
+from utils.rate_limiter import default_rate_limiter
+from utils.metrics import RECORDER, GAUGES, endpoint_key
+from utils.contracts import ContractChecker
+from utils.logger import get_logger, log_response
+from utils import http_phases, tracing
+import gzip
+import json
+import logging
 import requests
+import time
+
+# Shared by every client so violation details are collected in one place
+CONTRACTS = ContractChecker()
+# Every request/response is logged at DEBUG (LOG_LEVEL=DEBUG); nothing is built otherwise
+_log = get_logger("client")
 
 class APIClient:
-    def __init__(self, service=None, token=None):
+    def __init__(self, service=None, token=None, retries=True, rate_limiter=None):
         if not token and service:
             token = get_auth_token(service)
         elif not token:
@@ -11,17 +27,157 @@ class APIClient:
 
         self.headers = {
             "Content-Type": "application/json",
+            "Accept-Encoding": "gzip, deflate",
             "Authorization": f"Bearer {token}"
         }
+        self.retries = retries
+        self.rate_limiter = rate_limiter or default_rate_limiter()
+
+    def request(self, method, endpoint, **kwargs):
+        """Send a request, record its latency (including retries) and check its response contract"""
+        path = endpoint.split("?", 1)[0]
+        with tracing.span(f"{method} {path}", kind="CLIENT", remote_service=service_of(endpoint),
+                          **{"http.method": method, "http.path": path}) as span:
+            start = time.perf_counter()
+            ok = False
+            contract_ok = None
+            GAUGES.add("requests_in_flight")
+            try:
+                response = self._request_with_retries(method, endpoint, **kwargs)
+                elapsed = time.perf_counter() - start
+                ok = response.status_code < 400
+                span.tag("http.status_code", response.status_code)
+                if not ok:
+                    span.tag("error", response.status_code)
+                # Streamed bodies are left unread for the caller: no contract check or transfer accounting
+                if not kwargs.get("stream"):
+                    contract_ok = CONTRACTS.check(endpoint, response)
+                    self._record_transfer(method, endpoint, response)
+                    # Errors are logged at WARNING; the DEBUG guard only skips building successful ones
+                    if not ok or _log.isEnabledFor(logging.DEBUG):
+                        log_response(_log, "request", response, level=logging.DEBUG,
+                                     trace_id=span.trace_id, span_id=span.span_id)
+                return response
+            finally:
+                GAUGES.add("requests_in_flight", -1)
+                if not ok:
+                    elapsed = time.perf_counter() - start
+                RECORDER.record(endpoint_key(method, endpoint), elapsed, ok, contract_ok)
+
+    def _request_with_retries(self, method, endpoint, **kwargs):
+        """Send a request with the endpoint's retry policy and the service's circuit breaker.
+        A retry whose backoff would run past the active deadline is not attempted."""
+        policy = policy_for(method, endpoint)
+        breaker = breaker_for(service_of(endpoint))
+        max_attempts = policy.max_attempts if self.retries else 1
+
+        for attempt in range(max_attempts):
+            breaker.before_call(service_of(endpoint))
+            try:
+                response = self._send(method, endpoint, **kwargs)
+            except requests.RequestException as e:
+                breaker.record_failure()
+                # A timeout cut short by the deadline is reported as the deadline, with its time report
+                check_deadline(endpoint.split("?", 1)[0])
+                delay = policy.backoff(attempt)
+                if attempt == max_attempts - 1 or not policy.should_retry_error(e) or not can_wait(delay):
+                    raise
+                time.sleep(delay)
+                continue
+
+            if response.status_code >= 500 or response.status_code == 429:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+            if attempt == max_attempts - 1 or not policy.should_retry_status(response.status_code):
+                return response
+            delay = policy.backoff(attempt, response)
+            if not can_wait(delay):
+                return response
+            time.sleep(delay)
+
+    def _record_transfer(self, method, endpoint, response):
+        """Account request bytes before/after compression and response bytes on the wire/decoded"""
+        request = response.request
+        sent_wire = len(request.body or b"")
+        sent_raw = getattr(request, "raw_body_size", sent_wire)
+        decoded = len(response.content)
+        try:
+            wire = response.raw.tell()  # bytes read from the socket, before gzip/deflate decoding
+        except (AttributeError, ValueError):
+            wire = int(response.headers.get("Content-Length", decoded))
+        RECORDER.record_transfer(endpoint_key(method, endpoint), sent_raw, sent_wire, wire or decoded, decoded)
+
+    def _compress_body(self, headers, kwargs):
+        """Gzip large JSON bodies when GZIP_REQUESTS is enabled"""
+        if not gzip_requests or kwargs.get("json") is None:
+            return headers, kwargs, None
+        raw = json.dumps(kwargs["json"]).encode("utf-8")
+        if len(raw) < gzip_request_min_bytes:
+            return headers, kwargs, None
+        kwargs = {k: v for k, v in kwargs.items() if k != "json"}
+        kwargs["data"] = gzip.compress(raw, compresslevel=5)
+        return dict(headers, **{"Content-Encoding": "gzip"}), kwargs, len(raw)
+
+    def _trace(self, headers, kwargs):
+        """Propagation headers and a msgId carrying the current span's IDs"""
+        span = tracing.current_span()
+        if span is None:
+            return headers, kwargs
+        headers = dict(headers, **span.headers())
+        body = kwargs.get("json")
+        request_info = body.get("RequestInfo") if isinstance(body, dict) else None
+        if isinstance(request_info, dict) and "msgId" in request_info:
+            # Copies, so the caller's payload is left as it was
+            fields = str(request_info["msgId"]).split("|")
+            locale = fields[1] if len(fields) > 1 else ""
+            request_info = dict(request_info, msgId=tracing.msg_id(locale, span))
+            kwargs = dict(kwargs, json=dict(body, RequestInfo=request_info))
+        return headers, kwargs
+
+    def _send(self, method, endpoint, headers=None, **kwargs):
+        headers, kwargs = self._trace(headers or self.headers, kwargs)
+        headers, kwargs, raw_size = self._compress_body(headers, kwargs)
+        response = self._dispatch(method, endpoint, headers, **kwargs)
+        if raw_size is not None:
+            response.request.raw_body_size = raw_size
+        return response
+
+    def _dispatch(self, method, endpoint, headers, **kwargs):
+        if self.rate_limiter is None:
+            return self._timed(method, endpoint, headers, **kwargs)
+        with self.rate_limiter.limit(endpoint):
+            return self._timed(method, endpoint, headers, **kwargs)
+
+    def _timed(self, method, endpoint, headers, **kwargs):
+        """Send one attempt and record its DNS/connect/TLS/send/TTFB/transfer phases"""
+        # Per attempt and after any rate-limit wait, so the attempt only gets what is left of the active deadline
+        kwargs.setdefault("timeout", request_timeout(endpoint))
+        with http_phases.timing() as timer:
+            response = http_phases.request(method, BASE_URL + endpoint, headers=headers, **kwargs)
+            if not kwargs.get("stream"):
+                timer.finish()  # requests has read the body
+        RECORDER.record_phases(endpoint_key(method, endpoint), timer.phases(), timer.new_connection)
+        return response
 
     def get(self, endpoint):
-        return requests.get(BASE_URL + endpoint, headers=self.headers)
+        return self.request("GET", endpoint)
 
     def post(self, endpoint, data):
-        return requests.post(BASE_URL + endpoint, headers=self.headers, json=data)
+        return self.request("POST", endpoint, json=data)
+
+    def post_stream(self, endpoint, data):
+        """POST without reading the body; consume it with response.iter_content() and close it"""
+        return self.request("POST", endpoint, json=data, stream=True)
 
     def put(self, endpoint, data):
-        return requests.put(BASE_URL + endpoint, headers=self.headers, json=data)
+        return self.request("PUT", endpoint, json=data)
 
     def delete(self, endpoint):
-        return requests.delete(BASE_URL + endpoint, headers=self.headers)
\ No newline at end of file
+        return self.request("DELETE", endpoint)
+
+    def upload(self, endpoint, files, data):
+        """Multipart upload; pass file contents as bytes so a retried attempt can resend them"""
+        headers = {"Authorization": self.headers["Authorization"]}
+        return self.request("POST", endpoint, files=files, data=data, headers=headers)
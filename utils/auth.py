@@ -1,31 +1,33 @@
-import os
 import requests
-from dotenv import load_dotenv
-from utils.config import tenantId
-
-# Load environment variables from .env file
-load_dotenv(override=True)  # This forces reloading of updated values
+from utils.config import BASE_URL, tenantId, username, password, userType, client_auth_header
+from utils.metrics import GAUGES
+from utils.deadline import request_timeout
+from utils import tracing
 
 def get_auth_token(service: str):
-    url = os.getenv("BASE_URL") + "/user/oauth/token"
+    url = BASE_URL + "/user/oauth/token"
     # print("URL ", url)
 
     # Build dynamic payload based on service (role)
     payload = {
-        "username": os.getenv("USERNAME"),
-        "password": os.getenv("PASSWORD"),
+        "username": username,
+        "password": password,
         "grant_type": "password",
         "scope": "read",
         "tenantId": tenantId,
-        "userType": os.getenv("USERTYPE")
+        "userType": userType
     }
 
     headers = {
         "accept": "application/json, text/plain, */*",
-        "authorization": os.getenv("CLIENT_AUTH_HEADER"),
+        "authorization": client_auth_header,
         "content-type": "application/x-www-form-urlencoded"
     }
 
-    response = requests.post(url, data=payload, headers=headers)
+    GAUGES.add("token_refreshes")
+    with tracing.span("POST /user/oauth/token", kind="CLIENT", remote_service="user") as span:
+        response = requests.post(url, data=payload, headers=dict(headers, **span.headers()),
+                                 timeout=request_timeout("/user/oauth/token"))
+        span.tag("http.status_code", response.status_code)
     assert response.status_code == 200, f"Auth failed: {response.text}"
     return response.json().get("access_token")
@@ -0,0 +1,198 @@
+"""
+Incremental parsing of /boundary-relationships/_search responses.
+
+With includeChildren=true the TenantBoundary tree of a country-scale hierarchy is very large;
+response.json() builds all of it at once. iter_boundary_nodes() instead consumes the response
+body chunk by chunk and yields one BoundaryNode per boundary as soon as its object closes, so
+peak memory is proportional to the depth of the tree (one partial node per level), not to the
+size of the response.
+
+Nodes are emitted in post-order (children before their parent). A node's parent_code is known
+as long as the service serializes "code" before "children", which it does.
+"""
+import codecs
+import json
+import re
+from collections import namedtuple
+
+CHUNK_SIZE = 64 * 1024
+# Arrays whose object elements are boundary nodes
+NODE_ARRAYS = ("boundary", "children")
+
+_TOKEN = re.compile(r'\s*(?:([{}\[\],:])|("(?:[^"\\]|\\.)*")|(-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)|(true|false|null))')
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+_LITERALS = {"true": True, "false": False, "null": None}
+
+BoundaryNode = namedtuple("BoundaryNode", "code boundary_type parent_code depth hierarchy_type fields")
+
+
+class StreamParseError(ValueError):
+    pass
+
+
+def iter_json_events(chunks):
+    """
+    Pull-parse JSON from an iterable of bytes/str chunks.
+
+    Yields (event, value) with events start_map, map_key, end_map, start_array, end_array and
+    value. Only the current token is held in memory besides the undecoded tail of a chunk.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    eof = False
+    chunks = iter(chunks)
+    stack = []          # "map" / "array"
+    expect_key = False  # next string inside a map is a key
+
+    while True:
+        match = _TOKEN.match(buffer, pos)
+        # A number or literal touching the end of the buffer may continue in the next chunk, and so may a
+        # number followed only by the start of its fraction or exponent ("-25" + "." | "96")
+        if match is None or (not eof and (match.group(3) or match.group(4))
+                             and _NUMBER_TAIL.fullmatch(buffer, match.end())):
+            if eof:
+                if buffer[pos:].strip():
+                    raise StreamParseError(f"Invalid JSON near: {buffer[pos:pos + 40]!r}")
+                if stack:
+                    raise StreamParseError("Unexpected end of JSON input")
+                return
+            chunk = next(chunks, None)
+            if chunk is None:
+                eof = True
+                buffer = buffer[pos:] + decoder.decode(b"", final=True)
+            else:
+                buffer = buffer[pos:] + (chunk if isinstance(chunk, str) else decoder.decode(chunk))
+            pos = 0
+            continue
+
+        pos = match.end()
+        punct, string, number, literal = match.groups()
+        if punct:
+            if punct == "{":
+                stack.append("map")
+                expect_key = True
+                yield "start_map", None
+            elif punct == "[":
+                stack.append("array")
+                yield "start_array", None
+            elif punct == "}":
+                stack.pop()
+                yield "end_map", None
+            elif punct == "]":
+                stack.pop()
+                yield "end_array", None
+            elif punct == ",":
+                expect_key = stack[-1] == "map"
+            # ":" carries no event
+        elif string is not None:
+            value = json.loads(string) if "\\" in string else string[1:-1]
+            if expect_key:
+                expect_key = False
+                yield "map_key", value
+            else:
+                yield "value", value
+        elif number is not None:
+            yield "value", float(number) if ("." in number or "e" in number or "E" in number) else int(number)
+        else:
+            yield "value", _LITERALS[literal]
+
+
+class _Frame:
+    __slots__ = ("kind", "key", "container_key", "is_node", "fields")
+
+    def __init__(self, kind, container_key, is_node):
+        self.kind = kind
+        self.key = None
+        self.container_key = container_key
+        self.is_node = is_node
+        self.fields = {}
+
+
+def iter_boundary_nodes(chunks, top_keys=None):
+    """Yield a BoundaryNode for every boundary in a TenantBoundary response body. The keys of the
+    top-level object are added to the `top_keys` set if one is given, e.g. to check the response
+    had a TenantBoundary key at all when it yields no nodes."""
+    stack = []
+    depth = 0  # node frames currently open
+
+    for event, value in iter_json_events(chunks):
+        if event == "map_key":
+            stack[-1].key = value
+            if top_keys is not None and len(stack) == 1:
+                top_keys.add(value)
+        elif event == "value":
+            if stack and stack[-1].kind == "map":
+                stack[-1].fields[stack[-1].key] = value
+        elif event in ("start_map", "start_array"):
+            parent = stack[-1] if stack else None
+            if parent is None:
+                container_key = None
+            elif parent.kind == "map":
+                container_key = parent.key
+            else:
+                container_key = parent.container_key
+            is_node = event == "start_map" and parent is not None and parent.kind == "array" \
+                and container_key in NODE_ARRAYS
+            stack.append(_Frame("map" if event == "start_map" else "array", container_key, is_node))
+            if is_node:
+                depth += 1
+        elif event == "end_array":
+            stack.pop()
+        else:  # end_map
+            frame = stack.pop()
+            if not frame.is_node:
+                continue
+            depth -= 1
+            parent_node = next((f for f in reversed(stack) if f.is_node), None)
+            tenant = next((f for f in reversed(stack) if f.kind == "map" and not f.is_node
+                           and "hierarchyType" in f.fields), None)
+            yield BoundaryNode(
+                code=frame.fields.get("code"),
+                boundary_type=frame.fields.get("boundaryType"),
+                parent_code=parent_node.fields.get("code") if parent_node else None,
+                depth=depth,
+                hierarchy_type=tenant.fields.get("hierarchyType") if tenant else None,
+                fields=frame.fields,
+            )
+
+
+def stream_boundary_nodes(response, chunk_size=CHUNK_SIZE, top_keys=None):
+    """Nodes from a response requested with stream=True (e.g. APIClient.post_stream)"""
+    try:
+        yield from iter_boundary_nodes(response.iter_content(chunk_size=chunk_size), top_keys)
+    finally:
+        response.close()
+
+
+class TreeSummary:
+    """Aggregate of a node stream: counts per level, depth, root codes and structural problems.
+    Its size does not depend on the node count. It keeps one counter per boundary type, the codes of
+    the top-level boundaries and at most max_problems problems."""
+
+    def __init__(self, max_problems=20):
+        self.nodes = 0
+        self.by_type = {}
+        self.max_depth = 0
+        self.roots = []
+        self.problems = []
+        self.max_problems = max_problems
+        self.top_keys = set()  # filled by stream_boundary_nodes(..., top_keys=summary.top_keys)
+
+    def add(self, node):
+        self.nodes += 1
+        self.by_type[node.boundary_type] = self.by_type.get(node.boundary_type, 0) + 1
+        self.max_depth = max(self.max_depth, node.depth)
+        if node.depth == 0:
+            self.roots.append(node.code)
+        problem = None
+        if not node.code or not node.boundary_type:
+            problem = f"node at depth {node.depth} without code/boundaryType: {node.fields}"
+        elif node.depth > 0 and not node.parent_code:
+            problem = f"{node.code} has no parent code"
+        if problem and len(self.problems) < self.max_problems:
+            self.problems.append(problem)
+
+    def __str__(self):
+        levels = ", ".join(f"{t}={n}" for t, n in self.by_type.items())
+        return f"{self.nodes} boundaries, depth {self.max_depth + 1 if self.nodes else 0}, roots {self.roots}: {levels}"
@@ -3,6 +3,15 @@ from dotenv import load_dotenv
 
 load_dotenv(override=True)  # This forces reloading of updated values
 
+# Optional named profile (profiles/<name>.env) or explicit path layered over .env
+PROFILES_DIR = os.path.join(os.path.dirname(__file__), "..", "profiles")
+profile = os.getenv("PROFILE")
+if profile:
+    profile_path = profile if profile.endswith(".env") else os.path.join(PROFILES_DIR, f"{profile}.env")
+    if not os.path.exists(profile_path):
+        raise ValueError(f"Config profile not found: {profile_path}")
+    load_dotenv(profile_path, override=True)
+
 BASE_URL = os.getenv("BASE_URL")
 tenantId = os.getenv("TENANTID", "mz")
 locale = os.getenv("LOCALE", "en_MZ")
@@ -14,6 +23,85 @@ search_offset = os.getenv("SEARCH_OFFSET", "0")
 hierarchyType = os.getenv("HIERARCHYTYPE")
 boundaryCode = os.getenv("BOUNDARY_CODE")
 boundaryType=os.getenv("BOUNDARY_TYPE")
+# Batched ID searches: IDs per request (defaults to the page limit) and concurrent requests
+search_batch_size = int(os.getenv("SEARCH_BATCH_SIZE", search_limit))
+search_concurrency = int(os.getenv("SEARCH_CONCURRENCY", "4"))
+
+# Authentication
+username = os.getenv("USERNAME")
+password = os.getenv("PASSWORD")
+userType = os.getenv("USERTYPE")
+client_auth_header = os.getenv("CLIENT_AUTH_HEADER")
+
+# Per-run state (ids.txt, downloaded templates) lives here so parallel targets don't collide
+output_dir = os.getenv("OUTPUT_DIR", "output")
+ids_file = os.path.join(output_dir, "ids.txt")
+template_file = os.path.join(output_dir, "template_downloaded.xlsx")
+upload_file = os.path.join(output_dir, "sample_boundary.xlsx")
+
+# Resilience: retries for idempotent searches, guarded retries for creates, per-service circuit breaker
+retry_max_attempts = int(os.getenv("RETRY_MAX_ATTEMPTS", "4"))
+retry_base_delay = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+retry_max_delay = float(os.getenv("RETRY_MAX_DELAY", "10"))
+circuit_failure_threshold = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+circuit_reset_timeout = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+
+# Timeouts (seconds) for every outgoing call; TIMEOUTS overrides them per endpoint prefix:
+# "<prefix>=[<connect>:]<read>,...". RUN_DEADLINE (seconds, 0 = none) bounds a whole pytest run.
+connect_timeout = float(os.getenv("CONNECT_TIMEOUT", "5"))
+read_timeout = float(os.getenv("READ_TIMEOUT", "60"))
+timeouts = os.getenv("TIMEOUTS", "")
+run_deadline = float(os.getenv("RUN_DEADLINE", "0"))
+
+# Client-side rate limits per endpoint prefix: "<prefix>=<rps>[:<max_in_flight>],..."
+rate_limits = os.getenv("RATE_LIMITS", "")
+
+# Fraction of successful responses validated against their endpoint contract (0 disables)
+contract_sample_rate = float(os.getenv("CONTRACT_SAMPLE_RATE", "1"))
+
+# Compression: responses are always negotiated with gzip/deflate; JSON request bodies of at
+# least GZIP_REQUEST_MIN_BYTES are gzipped when GZIP_REQUESTS is enabled (e.g. bulk upserts)
+gzip_requests = os.getenv("GZIP_REQUESTS", "false").lower() == "true"
+gzip_request_min_bytes = int(os.getenv("GZIP_REQUEST_MIN_BYTES", "16384"))
+
+# Content-addressed cache for filestore downloads (default: <OUTPUT_DIR>/cache/filestore), LRU-bounded
+filestore_cache = os.getenv("FILESTORE_CACHE", "true").lower() == "true"
+filestore_cache_dir = os.getenv("FILESTORE_CACHE_DIR")
+filestore_cache_max_mb = int(os.getenv("FILESTORE_CACHE_MAX_MB", "512"))
+
+# Incremental mode: reuse the generated template of an identical hierarchy definition instead of
+# calling _generate and polling for it (see utils/generate_cache.py)
+incremental_generate = os.getenv("INCREMENTAL_GENERATE", "false").lower() == "true"
+
+# Warm pool of pre-provisioned hierarchies (see utils/pool.py and hierarchy_pool.py); with
+# HIERARCHY_POOL=true the pytest suite claims one instead of creating and generating its own
+hierarchy_pool = os.getenv("HIERARCHY_POOL", "false").lower() == "true"
+pool_size = int(os.getenv("POOL_SIZE", "5"))
+pool_max_age_hours = float(os.getenv("POOL_MAX_AGE_HOURS", "24"))
+
+# Connection reuse: with HTTP_KEEPALIVE=true each thread keeps its connections to the services open
+# between APIClient requests; otherwise every request opens a new one. Per-phase timings
+# (DNS, connect, TLS, TTFB, transfer; see utils/http_phases.py) show what that costs.
+http_keepalive = os.getenv("HTTP_KEEPALIVE", "false").lower() == "true"
+
+# Distributed load (run_scenario.py --coordinator/--worker): workers must present this shared token in
+# their hello; with --local-workers the coordinator generates one when it is unset
+distributed_token = os.getenv("DISTRIBUTED_TOKEN", "")
+
+# Tracing: trace/span IDs are always sent; with TRACING=true spans are written as Zipkin v2 JSON to
+# TRACE_DIR (default <OUTPUT_DIR>/traces), one file per TRACE_FLUSH_SPANS spans
+tracing = os.getenv("TRACING", "false").lower() == "true"
+trace_dir = os.getenv("TRACE_DIR") or os.path.join(output_dir, "traces")
+trace_flush_spans = int(os.getenv("TRACE_FLUSH_SPANS", "10000"))
+
+# Structured logs: JSON lines written by a background thread to LOG_DIR/api.jsonl, rotated and gzipped.
+# Response bodies above LOG_MAX_BODY_BYTES are truncated; LOG_SAMPLE_RATE samples successful responses.
+log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+log_dir = os.getenv("LOG_DIR", "logs")
+log_max_body_bytes = int(os.getenv("LOG_MAX_BODY_BYTES", "4096"))
+log_sample_rate = float(os.getenv("LOG_SAMPLE_RATE", "1"))
+log_file_max_mb = float(os.getenv("LOG_FILE_MAX_MB", "10"))
+log_backup_count = int(os.getenv("LOG_BACKUP_COUNT", "5"))
 
 if not BASE_URL:
     raise ValueError("BASE_URL not found in .env")
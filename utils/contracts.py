@@ -0,0 +1,170 @@
+"""
+Response contracts compiled into fast validator functions.
+
+A contract is a small spec: a Python type (or tuple of types), a dict of key -> spec
+(keys ending in "?" are optional), a one-element list [item_spec], OneOf(spec, ...) or
+Nullable(spec). compile_contract() turns a spec into straight-line Python once, so checking
+a response is a handful of isinstance() calls - cheap enough to run on every load request.
+
+Validators return None when the body matches, or a short description of the first violation.
+"""
+import random
+import threading
+
+from utils.config import contract_sample_rate
+
+
+class OneOf:
+    def __init__(self, *specs):
+        self.specs = specs
+
+
+class Nullable:
+    def __init__(self, spec):
+        self.spec = spec
+
+
+class _Compiler:
+    def __init__(self):
+        self.lines = []
+        self.names = {}
+        self.counter = 0
+
+    def var(self, prefix="v"):
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def const(self, value):
+        name = self.var("t")
+        self.names[name] = value
+        return name
+
+    def emit(self, indent, line):
+        self.lines.append("    " * indent + line)
+
+    def check(self, spec, expr, path, indent):
+        """Emit code returning an error string if `expr` does not match `spec`"""
+        if isinstance(spec, Nullable):
+            self.emit(indent, f"if {expr} is not None:")
+            self.check(spec.spec, expr, path, indent + 1)
+        elif isinstance(spec, OneOf):
+            # Compile each alternative into its own validator and accept the first that passes
+            alternatives = self.const(tuple(compile_contract(s) for s in spec.specs))
+            self.emit(indent, f"if all(f({expr}) for f in {alternatives}):")
+            self.emit(indent + 1, f"return {path + ': matches none of the allowed shapes'!r}")
+        elif isinstance(spec, dict):
+            self.emit(indent, f"if not isinstance({expr}, dict):")
+            self.emit(indent + 1, f"return {path + ': expected object'!r}")
+            for key, sub in spec.items():
+                optional = key.endswith("?")
+                key = key.rstrip("?")
+                value = self.var()
+                self.emit(indent, f"{value} = {expr}.get({key!r}, _MISSING)")
+                if optional:
+                    self.emit(indent, f"if {value} is not _MISSING:")
+                    self.check(sub, value, f"{path}.{key}", indent + 1)
+                else:
+                    self.emit(indent, f"if {value} is _MISSING:")
+                    self.emit(indent + 1, f"return {path + '.' + key + ': missing'!r}")
+                    self.check(sub, value, f"{path}.{key}", indent)
+        elif isinstance(spec, list):
+            self.emit(indent, f"if not isinstance({expr}, list):")
+            self.emit(indent + 1, f"return {path + ': expected array'!r}")
+            if spec:
+                item = self.var("i")
+                self.emit(indent, f"for {item} in {expr}:")
+                self.check(spec[0], item, f"{path}[]", indent + 1)
+        else:
+            types = self.const(spec)
+            type_name = spec.__name__ if isinstance(spec, type) else "/".join(t.__name__ for t in spec)
+            self.emit(indent, f"if not isinstance({expr}, {types}):")
+            self.emit(indent + 1, f"return {path + ': expected ' + type_name!r}")
+
+
+_MISSING = object()
+
+
+def compile_contract(spec, name="contract"):
+    compiler = _Compiler()
+    compiler.check(spec, "body", "$", 1)
+    source = f"def {name}(body):\n" + "\n".join(compiler.lines) + "\n    return None\n"
+    namespace = dict(compiler.names, _MISSING=_MISSING)
+    exec(compile(source, f"<contract {name}>", "exec"), namespace)
+    validator = namespace[name]
+    validator.source = source
+    return validator
+
+
+OPT_STR = Nullable(str)
+
+RESOURCE_DETAILS = {"id": str, "tenantId?": OPT_STR, "status?": OPT_STR, "hierarchyType?": OPT_STR,
+                    "fileStoreId?": OPT_STR, "processedFilestoreId?": OPT_STR}
+
+# Keyed by the endpoint path (query string removed); the longest matching suffix wins
+CONTRACTS = {
+    "/boundary-hierarchy-definition/_create": {
+        "BoundaryHierarchy": [{"hierarchyType": str, "tenantId?": OPT_STR, "boundaryHierarchy?": [{"boundaryType": str}]}]
+    },
+    "/boundary-hierarchy-definition/_search": {
+        "BoundaryHierarchy": [{"hierarchyType": str, "tenantId?": OPT_STR,
+                               "boundaryHierarchy?": [{"boundaryType": str, "parentBoundaryType?": OPT_STR}]}]
+    },
+    "/boundary-relationships/_search": {
+        "TenantBoundary": [{"hierarchyType?": OPT_STR, "boundary?": list}]
+    },
+    "/localization/messages/v1/_upsert": {
+        "messages": [{"code": str, "message": str, "module?": OPT_STR, "locale?": OPT_STR}]
+    },
+    "/localization/messages/v1/_search": {
+        "messages": [{"code": str, "message": Nullable(str), "module?": OPT_STR, "locale?": OPT_STR}]
+    },
+    "/boundary-management/v1/_generate": {"ResourceDetails": OneOf([RESOURCE_DETAILS], RESOURCE_DETAILS)},
+    "/boundary-management/v1/_process": {"ResourceDetails": OneOf([RESOURCE_DETAILS], RESOURCE_DETAILS)},
+    "/boundary-management/v1/_process-search": {"ResourceDetails": [RESOURCE_DETAILS]},
+    "/boundary-management/v1/_generate-search": {
+        "GeneratedResource": [{"status": OPT_STR, "fileStoreid?": OPT_STR, "hierarchyType?": OPT_STR}]
+    },
+    "/filestore/v1/files/url": {"fileStoreIds": [{"id": str, "url": str}]},
+    "/filestore/v1/files": {"files": [{"fileStoreId": str}]},
+}
+
+_VALIDATORS = {suffix: compile_contract(spec, "contract") for suffix, spec in CONTRACTS.items()}
+_SUFFIXES = sorted(_VALIDATORS, key=len, reverse=True)
+_lookup_cache = {}
+
+
+def validator_for(endpoint):
+    path = endpoint.split("?", 1)[0]
+    if path not in _lookup_cache:
+        _lookup_cache[path] = next((_VALIDATORS[s] for s in _SUFFIXES if path.endswith(s)), None)
+    return _lookup_cache[path]
+
+
+class ContractChecker:
+    """Validates a sampled fraction of successful responses against their endpoint contract"""
+
+    def __init__(self, sample_rate=contract_sample_rate):
+        self.sample_rate = sample_rate
+        self.lock = threading.Lock()
+        self.last_violation = {}
+
+    def check(self, endpoint, response):
+        """Return None if not checked, True if valid, False on a violation"""
+        if self.sample_rate <= 0 or response.status_code >= 400:
+            return None
+        validator = validator_for(endpoint)
+        if validator is None or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return None
+        try:
+            data = response.json()
+        except ValueError:
+            error = "$: response is not JSON"
+        else:
+            # Reuse the parsed body for the caller instead of decoding it twice
+            response.json = lambda **kwargs: data
+            error = validator(data)
+        if error:
+            with self.lock:
+                self.last_violation[endpoint.split("?", 1)[0]] = error
+            return False
+        return True
@@ -1,5 +1,14 @@
 import json
 import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def _read_payload(file_path):
+    # Files are read once per process; callers always get a fresh, mutable copy
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
 
 def load_payload(service_name, filename):
     """
@@ -15,5 +24,4 @@ def load_payload(service_name, filename):
     base_path = os.path.dirname(__file__)  # current directory: utils/
     file_path = os.path.join(base_path, "..", "payloads", service_name, filename)
 
-    with open(os.path.abspath(file_path), 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return json.loads(_read_payload(os.path.abspath(file_path)))
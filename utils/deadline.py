@@ -0,0 +1,135 @@
+"""
+Per-endpoint timeouts and workflow deadlines.
+
+Every outgoing call (APIClient, auth, filestore/S3 downloads, raw uploads) takes its
+(connect, read) timeout from request_timeout(). Timeouts come from CONNECT_TIMEOUT/READ_TIMEOUT,
+overridden per endpoint prefix by TIMEOUTS.
+
+A Deadline is a budget for a whole workflow (a scenario run, or the pytest suite with
+--deadline). While a step runs inside `with deadline.step(name)`, the deadline is active on that
+thread: request timeouts are capped to the remaining budget, retries that cannot finish in time
+are abandoned and pollers sleep at most until the deadline. Once the budget is spent the next call
+raises DeadlineExceeded, whose message lists the steps that consumed the time.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.config import connect_timeout, read_timeout, timeouts
+
+_local = threading.local()
+
+
+class Timeouts:
+    """(connect, read) seconds per endpoint prefix; the longest matching prefix wins"""
+
+    def __init__(self, default, overrides=None):
+        self.default = default
+        self.overrides = sorted(overrides or [], key=lambda o: len(o[0]), reverse=True)
+
+    @classmethod
+    def from_spec(cls, spec, default=(connect_timeout, read_timeout)):
+        """Build from '<prefix>=[<connect>:]<read>' entries separated by commas,
+        e.g. '/filestore/v1/files=5:300,/boundary-management/=120'"""
+        overrides = []
+        for entry in filter(None, (e.strip() for e in (spec or "").split(","))):
+            prefix, _, limits = entry.partition("=")
+            connect, _, read = limits.rpartition(":")
+            overrides.append((prefix.strip(), (float(connect) if connect else default[0], float(read))))
+        return cls(default, overrides)
+
+    def for_endpoint(self, endpoint):
+        return next((t for prefix, t in self.overrides if endpoint.startswith(prefix)), self.default)
+
+
+TIMEOUTS = Timeouts.from_spec(timeouts)
+
+
+class DeadlineExceeded(Exception):
+    """The workflow's time budget ran out; the message says which steps used it"""
+
+    def __init__(self, deadline, where):
+        self.deadline = deadline
+        step = f"{deadline.current} ({where})" if deadline.current and where != deadline.current else where
+        super().__init__(f"{deadline.name} deadline of {deadline.seconds:g} s exceeded at {step}; "
+                         f"time spent: {deadline.report()}")
+
+
+class Deadline:
+    def __init__(self, seconds, name="run"):
+        self.seconds = seconds
+        self.name = name
+        self.expires = time.monotonic() + seconds
+        self.spent = {}
+        self.current = None
+        self._step_start = None
+
+    def remaining(self):
+        return self.expires - time.monotonic()
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self, where):
+        if self.expired:
+            raise DeadlineExceeded(self, where)
+
+    @contextmanager
+    def step(self, name):
+        """Run a step under this deadline, activating it for every call made on this thread"""
+        previous = getattr(_local, "deadline", None)
+        _local.deadline = self
+        self.current, self._step_start = name, time.monotonic()
+        try:
+            yield self
+        finally:
+            self.spent[name] = self.spent.get(name, 0.0) + time.monotonic() - self._step_start
+            self.current, self._step_start = None, None
+            _local.deadline = previous
+
+    def report(self, limit=5):
+        """The steps that used most of the budget, e.g. 'generate_search 52.1 s (87%), ...'"""
+        spent = dict(self.spent)
+        if self.current:
+            spent[self.current] = spent.get(self.current, 0.0) + time.monotonic() - self._step_start
+        top = sorted(spent.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+        parts = [f"{name} {seconds:.1f} s ({seconds / self.seconds:.0%})" for name, seconds in top]
+        return ", ".join(parts) or "nothing yet"
+
+
+def current_deadline():
+    """The deadline active on this thread, if any"""
+    return getattr(_local, "deadline", None)
+
+
+def check(where):
+    """Raise DeadlineExceeded if the deadline active on this thread has run out"""
+    deadline = current_deadline()
+    if deadline is not None:
+        deadline.check(where)
+
+
+def request_timeout(endpoint):
+    """(connect, read) timeout for a call to `endpoint`, capped to the active deadline"""
+    connect, read = TIMEOUTS.for_endpoint(endpoint)
+    deadline = current_deadline()
+    if deadline is None:
+        return connect, read
+    deadline.check(endpoint.split("?", 1)[0])
+    remaining = deadline.remaining()
+    return min(connect, remaining), min(read, remaining)
+
+
+def can_wait(seconds):
+    """False when waiting `seconds` (e.g. a retry backoff) would run past the active deadline"""
+    deadline = current_deadline()
+    return deadline is None or deadline.remaining() > seconds
+
+
+def sleep(seconds):
+    """time.sleep() that never sleeps past the active deadline (the next call then raises)"""
+    deadline = current_deadline()
+    if deadline is not None:
+        seconds = min(seconds, max(0.0, deadline.remaining()))
+    time.sleep(seconds)
@@ -0,0 +1,312 @@
+"""
+Distributed scenario load: one coordinator, many worker processes on one or more hosts.
+
+The coordinator waits for the expected number of workers, hands each a shard of the virtual
+users (and its share of the optional rate target), then merges the metrics they stream back
+into one live report. Workers need only this repository and their own .env/profile; the
+scenario definition itself is sent by the coordinator.
+
+Protocol: one JSON object per line over TCP.
+    worker -> coordinator   {"type": "hello", "host": ..., "pid": ..., "token": DISTRIBUTED_TOKEN}
+    coordinator -> worker   {"type": "assign", "shard": i, "scenario": {...}, "variables": {...},
+                             "users": n, "iterations": k, "rate": runs/s or null, "interval": s}
+    worker -> coordinator   {"type": "delta", "endpoints": {...}, "steps": {...},
+                             "runs": n, "passed": n, "failures": [...]}     every interval
+    worker -> coordinator   {"type": "done", ...same fields as delta...}
+
+The coordinator drops a connection whose hello does not arrive within HELLO_TIMEOUT or does not
+carry the shared token, so only workers given DISTRIBUTED_TOKEN can take a shard. The token is
+not a substitute for a trusted network: the stream itself is neither encrypted nor signed.
+
+Deltas carry per-endpoint EndpointStats recorded since the previous message; latency histograms
+use fixed buckets, so merging them on the coordinator gives exact combined percentiles.
+"""
+import hmac
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.config import distributed_token
+from utils.metrics import RECORDER, EndpointStats, MetricsRecorder
+from utils.scenario import ScenarioRunner, TokenProvider, STEP_RECORDER
+
+# Failure messages forwarded per delta; the rest are only counted
+MAX_FAILURES_PER_DELTA = 5
+# Seconds a connected worker has to send its hello
+HELLO_TIMEOUT = 10
+
+
+class DistributedError(Exception):
+    pass
+
+
+def parse_address(address):
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Expected HOST:PORT, got {address!r}")
+    return host, int(port)
+
+
+def split_users(users, workers):
+    """Spread virtual users as evenly as possible: 10 over 4 workers -> [3, 3, 2, 2]"""
+    return [users // workers + (1 if i < users % workers else 0) for i in range(workers)]
+
+
+class Connection:
+    """Line-delimited JSON over a socket; sends are serialized so several threads can report"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.reader = sock.makefile("r", encoding="utf-8")
+        self.lock = threading.Lock()
+
+    def send(self, message):
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        with self.lock:
+            self.sock.sendall(data)
+
+    def receive(self):
+        line = self.reader.readline()
+        if not line:
+            return None
+        return json.loads(line)
+
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def encode_stats(endpoints):
+    return {key: stats.to_dict() for key, stats in endpoints.items()}
+
+
+def decode_stats(data):
+    return {key: EndpointStats.from_dict(stats) for key, stats in data.items()}
+
+
+class Coordinator:
+    def __init__(self, address, workers, scenario, variables, users, iterations, rate=None, interval=5.0,
+                 accept_timeout=120, token=distributed_token):
+        if not token:
+            raise DistributedError("Set DISTRIBUTED_TOKEN to a secret shared with the workers")
+        self.host, self.port = parse_address(address)
+        self.token = token
+        self.expected_workers = workers
+        self.scenario = scenario
+        self.variables = variables
+        self.users = users
+        self.iterations = iterations
+        self.rate = rate
+        self.interval = interval
+        self.accept_timeout = accept_timeout
+
+        self.endpoints = MetricsRecorder()
+        self.steps = MetricsRecorder()
+        self.interval_endpoints = MetricsRecorder()
+        self.lock = threading.Lock()
+        self.runs = 0
+        self.passed = 0
+        self.failures = []
+        self.finished = 0
+        self.lost = 0
+        self.elapsed = 0.0
+        self.server = None
+
+    def listen(self):
+        """Bind before workers are started; returns the actual port (useful with port 0)"""
+        self.server = socket.create_server((self.host, self.port))
+        self.port = self.server.getsockname()[1]
+        return self.port
+
+    def _accept_workers(self):
+        self.server.settimeout(self.accept_timeout)
+        connections = []
+        while len(connections) < self.expected_workers:
+            try:
+                sock, peer = self.server.accept()
+            except socket.timeout:
+                raise DistributedError(f"Only {len(connections)}/{self.expected_workers} workers connected "
+                                       f"within {self.accept_timeout} s")
+            # A peer that connects and stays silent must not hold up the others
+            sock.settimeout(HELLO_TIMEOUT)
+            conn = Connection(sock)
+            try:
+                hello = conn.receive()
+            except (OSError, ValueError):
+                hello = None
+            if not hello or hello.get("type") != "hello" \
+                    or not hmac.compare_digest(str(hello.get("token", "")).encode(), self.token.encode()):
+                print(f"  rejected connection from {peer[0]}: no valid hello")
+                conn.close()
+                continue
+            sock.settimeout(None)
+            print(f"  worker {len(connections)} connected from {hello.get('host')} (pid {hello.get('pid')}, {peer[0]})")
+            connections.append(conn)
+        return connections
+
+    def _apply(self, message):
+        endpoints = decode_stats(message.get("endpoints", {}))
+        self.endpoints.merge(endpoints)
+        self.interval_endpoints.merge(endpoints)
+        self.steps.merge(decode_stats(message.get("steps", {})))
+        with self.lock:
+            self.runs += message.get("runs", 0)
+            self.passed += message.get("passed", 0)
+            self.failures.extend(message.get("failures", []))
+
+    def _serve(self, shard, conn):
+        try:
+            while True:
+                message = conn.receive()
+                if message is None:
+                    with self.lock:
+                        self.lost += 1
+                    print(f"  worker {shard} disconnected before finishing")
+                    return
+                self._apply(message)
+                if message.get("type") == "done":
+                    with self.lock:
+                        self.finished += 1
+                    return
+        finally:
+            conn.close()
+
+    def _print_interval(self, start):
+        rows = self.interval_endpoints.summary(reset=True)
+        requests = sum(r["count"] for r in rows)
+        worst = max((r["p95_ms"] for r in rows), default=0)
+        with self.lock:
+            active = self.expected_workers - self.finished - self.lost
+            runs, passed = self.runs, self.passed
+        print(f"[+{time.monotonic() - start:5.0f}s] workers={active} runs={runs} passed={passed} "
+              f"req/s={requests / self.interval:.1f} errors={sum(r['errors'] for r in rows)} worst_p95={worst:.0f}ms")
+
+    def run(self):
+        if self.server is None:
+            self.listen()
+        print(f"Coordinator on {self.host}:{self.port}, waiting for {self.expected_workers} worker(s)")
+        try:
+            connections = self._accept_workers()
+        finally:
+            self.server.close()
+
+        shards = split_users(self.users, len(connections))
+        for shard, (conn, users) in enumerate(zip(connections, shards)):
+            rate = self.rate * users / self.users if self.rate else None
+            conn.send({"type": "assign", "shard": shard, "scenario": self.scenario, "variables": self.variables,
+                       "users": users, "iterations": self.iterations, "rate": rate, "interval": self.interval})
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=self._serve, args=(shard, conn), daemon=True)
+                   for shard, conn in enumerate(connections)]
+        for t in threads:
+            t.start()
+        next_report = start + self.interval
+        while any(t.is_alive() for t in threads):
+            time.sleep(min(0.5, max(0.0, next_report - time.monotonic())))
+            if time.monotonic() >= next_report:
+                self._print_interval(start)
+                next_report += self.interval
+        self.elapsed = time.monotonic() - start
+        return self
+
+
+class Worker:
+    def __init__(self, address, connect_timeout=60, token=distributed_token):
+        if not token:
+            raise DistributedError("Set DISTRIBUTED_TOKEN to the coordinator's shared secret")
+        self.host, self.port = parse_address(address)
+        self.token = token
+        self.connect_timeout = connect_timeout
+        self.lock = threading.Lock()
+        self.runs = 0
+        self.passed = 0
+        self.failures = []
+
+    def _connect(self):
+        # Workers may be started before the coordinator is listening
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                return Connection(socket.create_connection((self.host, self.port), timeout=10))
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise DistributedError(f"Could not reach coordinator at {self.host}:{self.port}")
+                time.sleep(1)
+
+    def _delta(self, kind):
+        with self.lock:
+            runs, passed, failures = self.runs, self.passed, self.failures
+            self.runs = self.passed = 0
+            self.failures = []
+        return {"type": kind, "endpoints": encode_stats(RECORDER.snapshot(reset=True)),
+                "steps": encode_stats(STEP_RECORDER.snapshot(reset=True)),
+                "runs": runs, "passed": passed, "failures": failures}
+
+    def _record(self, result):
+        with self.lock:
+            self.runs += 1
+            if result.ok:
+                self.passed += 1
+            elif len(self.failures) < MAX_FAILURES_PER_DELTA:
+                failed = next(s for s in result.steps if not s.ok)
+                self.failures.append(f"{failed.name}: {(failed.error or '')[:200]}")
+
+    def run(self):
+        conn = self._connect()
+        conn.sock.settimeout(None)
+        conn.send({"type": "hello", "host": socket.gethostname(), "pid": os.getpid(), "token": self.token})
+        assign = conn.receive()
+        if not assign or assign.get("type") != "assign":
+            raise DistributedError("Coordinator closed the connection before assigning work "
+                                   "(is DISTRIBUTED_TOKEN the same as the coordinator's?)")
+
+        users, iterations, rate = assign["users"], assign["iterations"], assign["rate"]
+        runner = ScenarioRunner(assign["scenario"], TokenProvider())
+        print(f"Worker shard {assign['shard']}: {users} user(s) x {iterations} iteration(s)"
+              + (f" at {rate:.2f} runs/s" if rate else ""))
+
+        RECORDER.snapshot(reset=True)
+        STEP_RECORDER.snapshot(reset=True)
+        stop = threading.Event()
+
+        def report():
+            while not stop.wait(assign["interval"]):
+                conn.send(self._delta("delta"))
+
+        # Open-loop pacing when a rate is assigned: run n starts at start + n / rate
+        schedule = {"next": 0}
+        start = time.monotonic()
+
+        def wait_turn():
+            if not rate:
+                return
+            with self.lock:
+                due = start + schedule["next"] / rate
+                schedule["next"] += 1
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        def virtual_user(_):
+            for _ in range(iterations):
+                wait_turn()
+                self._record(runner.run(assign["variables"]))
+
+        reporter = threading.Thread(target=report, daemon=True)
+        reporter.start()
+        try:
+            if users:
+                with ThreadPoolExecutor(max_workers=users) as pool:
+                    list(pool.map(virtual_user, range(users)))
+        finally:
+            stop.set()
+            reporter.join()
+            conn.send(self._delta("done"))
+            conn.close()
@@ -0,0 +1,46 @@
+"""
+Cross-process exclusive lock on a file, for state shared by every process on the host.
+
+The lock is taken with flock() (LockFileEx through msvcrt on Windows) on an open lock file, so
+the operating system releases it when the holder exits or is killed: there are no stale locks
+to detect and break. The lock file itself is left in place, since removing it would let a
+waiting process lock the removed file while a new process locks a new one.
+
+Locks are held per open file, so threads of one process exclude each other as well.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on `path` (created if missing) for the duration of the block"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            return
+        # msvcrt locks a byte range from the current position; LK_NBLCK fails at once if it is held
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
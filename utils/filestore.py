@@ -0,0 +1,306 @@
+"""
+Filestore downloads with a content-addressed on-disk artifact cache.
+
+A fileStoreId always refers to the same bytes, so once an artifact has been downloaded it can be
+served from disk. Blobs are stored under objects/<sha256[:2]>/<sha256> (identical files are kept
+once); index.json maps each fileStoreId to its hash, size and last use. The cache is shared by
+every process on the host: each read-modify-write of the index holds a file lock and re-reads it.
+Every hit is re-hashed outside the lock before use, and a blob that fails the check is dropped and
+downloaded again. When the cache grows past its size budget the least recently used blobs are
+evicted; a blob is opened under the lock before it is read, so eviction never pulls it from under
+a copy. An artifact larger than the whole budget is not cached: each fetch downloads it to its own
+file under uncached/, moved to `dest` by fetch() or removed when the process exits.
+"""
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import requests
+
+from utils.config import tenantId, output_dir, filestore_cache, filestore_cache_dir, filestore_cache_max_mb
+from utils.deadline import request_timeout
+from utils.file_lock import file_lock
+from utils import tracing
+
+CHUNK_SIZE = 1024 * 1024
+# fileStoreIds per /filestore/v1/files/url call; keeps the query string well under URL limits
+URL_BATCH_SIZE = 50
+# Uncached files and partial downloads older than this were left by a process that did not exit cleanly
+UNCACHED_MAX_AGE_S = 24 * 3600
+
+
+class FilestoreError(Exception):
+    pass
+
+
+def get_download_urls(client, file_store_ids, tenant=tenantId):
+    """Resolve fileStoreIds to signed download URLs, batching many IDs into one lookup"""
+    urls = {}
+    file_store_ids = list(dict.fromkeys(file_store_ids))
+    for start in range(0, len(file_store_ids), URL_BATCH_SIZE):
+        batch = file_store_ids[start:start + URL_BATCH_SIZE]
+        response = client.get(f"/filestore/v1/files/url?tenantId={tenant}&fileStoreIds={','.join(batch)}")
+        if response.status_code != 200:
+            raise FilestoreError(f"File download URL retrieval failed: {response.text}")
+        for entry in response.json().get("fileStoreIds", []):
+            urls[entry["id"]] = entry["url"]
+    missing = [i for i in file_store_ids if i not in urls]
+    if missing:
+        raise FilestoreError(f"No download URL returned for {', '.join(missing)}")
+    return urls
+
+
+def get_download_url(client, file_store_id, tenant=tenantId):
+    """Resolve a fileStoreId to its signed download URL"""
+    return get_download_urls(client, [file_store_id], tenant)[file_store_id]
+
+
+def download_file(url, path):
+    """Stream a download to disk in chunks so large files never sit in memory; returns the sha256.
+    Signed URLs are matched against TIMEOUTS by their full URL; the read timeout applies per chunk."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    digest = hashlib.sha256()
+    # Object storage is outside the traced services, so the signed URL is fetched without propagation headers
+    with tracing.span("GET download", kind="CLIENT", remote_service="object-storage"), \
+            requests.get(url, stream=True, timeout=request_timeout(url)) as response:
+        if response.status_code != 200:
+            raise FilestoreError(f"Download failed with status {response.status_code}")
+        with open(path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                digest.update(chunk)
+                f.write(chunk)
+    return digest.hexdigest()
+
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return _sha256_of(f)
+
+
+def _sha256_of(f):
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    def __init__(self, root, max_bytes, enabled=True):
+        self.root = root
+        self.max_bytes = max_bytes
+        # Disabled: never serve from disk, every fetch downloads again
+        self.enabled = enabled
+        self.index_path = os.path.join(root, "index.json")
+        self.lock_path = self.index_path + ".lock"
+        # Guards the counters and handed_out between threads of this process
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Uncached files handed out by this process, removed when it exits
+        self.handed_out = set()
+        self.swept = False
+
+    def _locked(self):
+        """Cross-process lock on the index; every read-modify-write of it holds this"""
+        return file_lock(self.lock_path)
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index):
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp, self.index_path)
+
+    def blob_path(self, sha256):
+        return os.path.join(self.root, "objects", sha256[:2], sha256)
+
+    def uncached_dir(self):
+        return os.path.join(self.root, "uncached")
+
+    def _open_cached(self, index, file_store_ids):
+        """{fileStoreId: (entry, path, open file)} for the indexed artifacts. Opened under the lock, so
+        another process can evict the blob (its name) but not the bytes being read."""
+        opened = {}
+        for file_store_id in file_store_ids:
+            entry = index.get(file_store_id) if self.enabled else None
+            if not entry:
+                continue
+            path = self.blob_path(entry["sha256"])
+            try:
+                opened[file_store_id] = (entry, path, open(path, "rb"))
+            except OSError:
+                del index[file_store_id]
+                continue
+            entry["last_used"] = time.time()
+        return opened
+
+    def _drop(self, file_store_id, sha256):
+        """Forget a corrupt entry unless another process has already replaced it"""
+        print(f"  Artifact cache: dropping corrupt entry for {file_store_id}")
+        with self._locked():
+            index = self._read_index()
+            if index.get(file_store_id, {}).get("sha256") == sha256:
+                del index[file_store_id]
+                self._write_index(index)
+            path = self.blob_path(sha256)
+            if os.path.exists(path) and not any(e["sha256"] == sha256 for e in index.values()):
+                self._remove(path)
+
+    def _download(self, url):
+        """Download to a file of its own under uncached/; returns (sha256, path)"""
+        os.makedirs(self.uncached_dir(), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.uncached_dir(), suffix=".part")
+        os.close(fd)
+        try:
+            return download_file(url, tmp), tmp
+        except BaseException:
+            self._remove(tmp)
+            raise
+
+    @staticmethod
+    def _remove(path):
+        """Remove a file; False if it is gone already or still open elsewhere (Windows)"""
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def _evict(self, index):
+        """Remove least recently used blobs until the cache fits its size budget"""
+        blobs = {}
+        for file_store_id, entry in index.items():
+            blob = blobs.setdefault(entry["sha256"], {"size": entry["size"], "last_used": 0, "ids": []})
+            blob["last_used"] = max(blob["last_used"], entry["last_used"])
+            blob["ids"].append(file_store_id)
+        total = sum(b["size"] for b in blobs.values())
+        for sha256, blob in sorted(blobs.items(), key=lambda kv: kv[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            path = self.blob_path(sha256)
+            if os.path.exists(path) and not self._remove(path):
+                continue
+            for file_store_id in blob["ids"]:
+                del index[file_store_id]
+            total -= blob["size"]
+
+    def _sweep(self):
+        """Remove uncached files and partial downloads left behind by processes that did not exit cleanly"""
+        cutoff = time.time() - UNCACHED_MAX_AGE_S
+        for entry in os.scandir(self.uncached_dir()) if os.path.isdir(self.uncached_dir()) else ():
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                self._remove(entry.path)
+
+    def _cleanup(self):
+        with self.lock:
+            for path in self.handed_out:
+                self._remove(path)
+            self.handed_out.clear()
+
+    def _fetch(self, client, file_store_ids, tenant):
+        """{fileStoreId: (path, open file or None)}; the caller must close the files. An open file is
+        a cache blob, None marks an uncached file owned by this fetch."""
+        file_store_ids = list(dict.fromkeys(file_store_ids))
+        with self._locked():
+            if not self.swept:
+                self._sweep()
+                self.swept = True
+            index = self._read_index()
+            opened = self._open_cached(index, file_store_ids)
+            if opened:
+                self._write_index(index)
+
+        # Hits are re-hashed and misses downloaded outside the lock, so concurrent virtual users and
+        # processes don't queue behind each other
+        paths = {}
+        for file_store_id, (entry, path, f) in opened.items():
+            if os.fstat(f.fileno()).st_size == entry["size"] and _sha256_of(f) == entry["sha256"]:
+                f.seek(0)
+                paths[file_store_id] = (path, f)
+            else:
+                f.close()
+                self._drop(file_store_id, entry["sha256"])
+        missing = [i for i in file_store_ids if i not in paths]
+        downloaded = {}
+        try:
+            if missing:
+                urls = get_download_urls(client, missing, tenant)
+                for file_store_id in missing:
+                    downloaded[file_store_id] = self._download(urls[file_store_id])
+        except BaseException:
+            for path, f in paths.values():
+                f.close()
+            for _, path in downloaded.values():
+                self._remove(path)
+            raise
+
+        with self.lock:
+            self.hits += len(paths)
+            self.misses += len(missing)
+        if not downloaded:
+            return paths
+        with self._locked():
+            index = self._read_index()
+            for file_store_id, (sha256, path) in downloaded.items():
+                if not self.enabled or os.path.getsize(path) > self.max_bytes:
+                    # Larger than the whole budget: handed over uncached instead of evicting everything else.
+                    # Each fetch downloads to its own file, so concurrent fetches of one ID never collide
+                    paths[file_store_id] = (path, None)
+                    continue
+                blob = self.blob_path(sha256)
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                if os.path.exists(blob):
+                    self._remove(path)  # same bytes, already stored by another fetch
+                else:
+                    os.replace(path, blob)
+                index[file_store_id] = {"sha256": sha256, "size": os.path.getsize(blob), "last_used": time.time()}
+                paths[file_store_id] = (blob, open(blob, "rb"))
+            self._evict(index)
+            self._write_index(index)
+        return paths
+
+    def _hand_out(self, path, f):
+        if f is None:
+            with self.lock:
+                if not self.handed_out:
+                    atexit.register(self._cleanup)
+                self.handed_out.add(path)
+        else:
+            f.close()
+        return path
+
+    def fetch_many(self, client, file_store_ids, tenant=tenantId):
+        """Return {fileStoreId: local path}; misses share one batched URL lookup. Cached paths stay
+        valid until a later fetch evicts them; artifacts larger than the budget are not cached and
+        their files are removed when the process exits."""
+        return {i: self._hand_out(path, f) for i, (path, f) in self._fetch(client, file_store_ids, tenant).items()}
+
+    def fetch(self, client, file_store_id, dest=None, tenant=tenantId):
+        """Local path of the artifact, copied to `dest` when given (callers may modify their copy)"""
+        path, f = self._fetch(client, [file_store_id], tenant)[file_store_id]
+        if not dest:
+            return self._hand_out(path, f)
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        if f is None:
+            os.replace(path, dest)
+            return dest
+        # Copied from the blob opened under the lock, so a concurrent eviction cannot remove it mid-copy
+        with f, open(dest, "wb") as out:
+            shutil.copyfileobj(f, out, CHUNK_SIZE)
+        return dest
+
+
+ARTIFACT_CACHE = ArtifactCache(filestore_cache_dir or os.path.join(output_dir, "cache", "filestore"),
+                               filestore_cache_max_mb * 1024 * 1024, enabled=filestore_cache)
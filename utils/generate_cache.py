@@ -0,0 +1,171 @@
+"""
+Incremental template generation: skip _generate when nothing it depends on has changed.
+
+The generated template is a function of the hierarchy definition (boundary levels and their
+parents), the localized level names in the request locale and the boundaries already attached to
+the hierarchy. definition_key() hashes exactly those inputs, read back from the services, with the
+hierarchy type name factored out - every run creates a fresh TEST_xxxx hierarchy, and two
+hierarchies with the same levels, messages and boundaries produce the same template.
+
+GenerateCache maps that key to the fileStoreId of a completed generation. A remembered fileStoreId
+is only reused after checking it still resolves to a downloadable file; stale entries are dropped.
+The cache file is shared by every process on the host (parallel pytest runs, load workers) and
+each read-modify-write holds a file lock on it.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import requests
+
+from utils.boundary_stream import stream_boundary_nodes
+from utils.config import tenantId, locale, output_dir, incremental_generate
+from utils.data_loader import load_payload
+from utils.deadline import request_timeout
+from utils.file_lock import file_lock
+from utils.filestore import get_download_url, FilestoreError
+from utils.request_info import get_request_info
+
+# Bumped when the inputs to definition_key() change, so old entries stop matching
+KEY_VERSION = 1
+
+
+def _neutral(value, hierarchy_type):
+    """Factor the hierarchy type out of codes, module names and boundary types"""
+    if not isinstance(value, str):
+        return value
+    return value.replace(hierarchy_type, "{hierarchyType}").replace(hierarchy_type.lower(), "{hierarchytype}")
+
+
+def definition_hash(hierarchy_type, levels, messages, boundaries=()):
+    """
+    Hash of the generation inputs, independent of the hierarchy type name and of ordering.
+
+    Args:
+        levels: [(boundaryType, parentBoundaryType)]
+        messages: [(code, message)] for the request locale
+        boundaries: [(code, boundaryType, parentCode)]
+    """
+    canonical = {
+        "version": KEY_VERSION,
+        "levels": sorted([_neutral(t, hierarchy_type), _neutral(p, hierarchy_type) or ""] for t, p in levels),
+        "messages": sorted([_neutral(c, hierarchy_type), m] for c, m in messages),
+        "boundaries": sorted([_neutral(c, hierarchy_type), _neutral(t, hierarchy_type), _neutral(p, hierarchy_type) or ""]
+                             for c, t, p in boundaries),
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _post(client, token, endpoint, payload):
+    payload["RequestInfo"] = get_request_info(token)
+    response = client.post(endpoint, payload)
+    if response.status_code != 200:
+        raise ValueError(f"{endpoint.split('?')[0]} failed while computing the generate key: {response.text[:300]}")
+    return response.json()
+
+
+def definition_key(client, token, hierarchy_type, tenant=tenantId, request_locale=locale):
+    """Read the hierarchy definition, its localization and its boundaries, and hash them"""
+    payload = load_payload("boundary_hierarchy", "search_hierarchy.json")
+    payload["BoundaryTypeHierarchySearchCriteria"]["tenantId"] = tenant
+    payload["BoundaryTypeHierarchySearchCriteria"]["hierarchyType"] = hierarchy_type
+    data = _post(client, token, "/boundary-service/boundary-hierarchy-definition/_search?limit=10&offset=0", payload)
+    hierarchies = [h for h in data.get("BoundaryHierarchy", []) if h.get("hierarchyType") == hierarchy_type]
+    if not hierarchies:
+        raise ValueError(f"Hierarchy {hierarchy_type} not found")
+    levels = [(level.get("boundaryType"), level.get("parentBoundaryType"))
+              for level in hierarchies[0].get("boundaryHierarchy", [])]
+
+    data = _post(client, token, f"/localization/messages/v1/_search?tenantId={tenant}&locale={request_locale}"
+                                f"&module=hcm-boundary-{hierarchy_type.lower()}",
+                 load_payload("localization", "search_localization.json"))
+    messages = [(m.get("code"), m.get("message")) for m in data.get("messages", [])]
+
+    payload = load_payload("boundary_relationships", "search_relationships.json")
+    payload["RequestInfo"] = get_request_info(token)
+    payload["BoundaryRelationshipSearchCriteria"]["tenantId"] = tenant
+    payload["BoundaryRelationshipSearchCriteria"]["hierarchyType"] = hierarchy_type
+    response = client.post_stream(f"/boundary-service/boundary-relationships/_search?tenantId={tenant}"
+                                  f"&includeChildren=true&hierarchyType={hierarchy_type}", payload)
+    if response.status_code != 200:
+        response.close()
+        raise ValueError(f"Boundary relationship search failed while computing the generate key: {response.status_code}")
+    boundaries = [(n.code, n.boundary_type, n.parent_code) for n in stream_boundary_nodes(response)]
+
+    return definition_hash(hierarchy_type, levels, messages, boundaries)
+
+
+def is_downloadable(client, file_store_id, tenant=tenantId):
+    """True when the fileStoreId still resolves to a URL that serves the file"""
+    try:
+        url = get_download_url(client, file_store_id, tenant)
+    except FilestoreError:
+        return False
+    try:
+        # Signed URLs are often method-bound, so open a GET and close it after the status line
+        with requests.get(url, stream=True, timeout=request_timeout(url)) as response:
+            return response.status_code == 200
+    except requests.RequestException:
+        return False
+
+
+class GenerateCache:
+    def __init__(self, path, enabled=True):
+        self.path = path
+        self.enabled = enabled
+        self.lock_path = path + ".lock"
+
+    def _locked(self):
+        """Cross-process lock on the cache file"""
+        return file_lock(self.lock_path)
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, entries):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def lookup(self, client, key, tenant=tenantId):
+        """Cached entry ({"fileStoreId", "hierarchyType", "created"}) for the key, if still downloadable"""
+        if not self.enabled:
+            return None
+        with self._locked():
+            entry = self._read().get(key)
+        if not entry:
+            return None
+        if is_downloadable(client, entry["fileStoreId"], tenant):
+            return entry
+        print(f"  Generate cache: {entry['fileStoreId']} is no longer downloadable, dropping it")
+        self.forget(key, entry["fileStoreId"])
+        return None
+
+    def store(self, key, file_store_id, hierarchy_type):
+        if not self.enabled:
+            return
+        with self._locked():
+            entries = self._read()
+            entries[key] = {"fileStoreId": file_store_id, "hierarchyType": hierarchy_type, "created": time.time()}
+            self._write(entries)
+
+    def forget(self, key, file_store_id=None):
+        """Drop the entry; with file_store_id only if it still points there (another process may have
+        stored a fresh generation in the meantime)"""
+        with self._locked():
+            entries = self._read()
+            entry = entries.get(key)
+            if entry is not None and file_store_id in (None, entry["fileStoreId"]):
+                del entries[key]
+                self._write(entries)
+
+
+GENERATE_CACHE = GenerateCache(os.path.join(output_dir, "cache", "generate.json"), enabled=incremental_generate)
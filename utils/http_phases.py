@@ -0,0 +1,181 @@
+"""
+HTTP phase timings for APIClient requests: DNS, TCP connect, TLS, send, time to first byte, transfer.
+
+APIClient sends through a requests Session whose connections time themselves while a
+PhaseTimer is active on the calling thread:
+
+    dns       getaddrinfo for the host           } only when the request opened a new
+    connect   TCP handshake                      } connection; a reused keep-alive
+    tls       TLS handshake (https)              } connection costs nothing here
+    send      writing the request line, headers and body
+    ttfb      from the end of the send to the parsed response headers (server time + one RTT)
+    transfer  reading the body (not measured for streamed responses)
+
+Whether the connection was new or reused is recorded too, so a drop in latency from pooling
+(HTTP_KEEPALIVE=true) shows up in dns/connect/tls and the new/reused counts, and a server-side
+change shows up in ttfb.
+"""
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+from utils.config import http_keepalive
+
+_local = threading.local()
+
+
+class PhaseTimer:
+    __slots__ = ("dns", "connect", "tls", "send", "ttfb", "transfer", "new_connection", "setup", "headers_at")
+
+    def __init__(self):
+        self.dns = self.connect = self.tls = None
+        self.send = self.ttfb = self.transfer = None
+        self.new_connection = False
+        self.setup = 0.0  # time spent inside connect(), so a lazy connect is not counted as send
+        self.headers_at = None
+
+    def finish(self):
+        """Mark the body as read"""
+        if self.headers_at is not None:
+            self.transfer = time.perf_counter() - self.headers_at
+
+    def phases(self):
+        """{phase: seconds} for the phases this request went through"""
+        return {name: getattr(self, name) for name in ("dns", "connect", "tls", "send", "ttfb", "transfer")
+                if getattr(self, name) is not None}
+
+
+def current():
+    """The PhaseTimer active on this thread, if any"""
+    return getattr(_local, "timer", None)
+
+
+@contextmanager
+def timing():
+    """Time the HTTP exchange made in the block"""
+    previous = current()
+    _local.timer = timer = PhaseTimer()
+    try:
+        yield timer
+    finally:
+        _local.timer = previous
+
+
+class _TimedConnection:
+    """Records connection setup, send and wait for the response on the active PhaseTimer"""
+
+    def _new_conn(self):
+        timer = current()
+        if timer is None:
+            return super()._new_conn()
+        start = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(self._dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        resolved = time.perf_counter()
+        timer.dns = resolved - start
+        # Try every resolved address in order, as create_connection() does; urllib3 still sets each
+        # socket up and maps its errors. TLS SNI and certificate checks use self.host, which is unchanged.
+        host, error = self._dns_host, None
+        try:
+            for address in dict.fromkeys(info[4][0] for info in infos):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except ConnectTimeoutError as e:  # also NewConnectionError
+                    error = e
+            raise error or NewConnectionError(self, f"Failed to establish a new connection: no address for {host}")
+        finally:
+            self._dns_host = host
+            timer.connect = time.perf_counter() - resolved
+
+    def connect(self):
+        timer = current()
+        if timer is None:
+            return super().connect()
+        timer.new_connection = True
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            elapsed = time.perf_counter() - start
+            timer.setup += elapsed
+            if isinstance(self, HTTPSConnection):
+                timer.tls = max(0.0, elapsed - (timer.dns or 0.0) - (timer.connect or 0.0))
+
+    def request(self, *args, **kwargs):
+        timer = current()
+        if timer is None:
+            return super().request(*args, **kwargs)
+        setup, start = timer.setup, time.perf_counter()
+        super().request(*args, **kwargs)
+        # Plain HTTP connections are opened by the first write
+        timer.send = time.perf_counter() - start - (timer.setup - setup)
+
+    def getresponse(self):
+        timer = current()
+        if timer is None:
+            return super().getresponse()
+        start = time.perf_counter()
+        response = super().getresponse()
+        timer.headers_at = time.perf_counter()
+        timer.ttfb = timer.headers_at - start
+        return response
+
+
+class _PhaseHTTPConnection(_TimedConnection, HTTPConnection):
+    pass
+
+
+class _PhaseHTTPSConnection(_TimedConnection, HTTPSConnection):
+    pass
+
+
+class _PhaseHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _PhaseHTTPConnection
+
+
+class _PhaseHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _PhaseHTTPSConnection
+
+
+class PhaseAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report to the active PhaseTimer"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _PhaseHTTPConnectionPool,
+                                                   "https": _PhaseHTTPSConnectionPool}
+
+
+def new_session():
+    session = requests.Session()
+    adapter = PhaseAdapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _thread_session():
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = new_session()
+    return session
+
+
+def request(method, url, **kwargs):
+    """requests.request() through an instrumented session: this thread's pooled one with
+    HTTP_KEEPALIVE=true, otherwise a new one (and a new connection) per request"""
+    if http_keepalive:
+        return _thread_session().request(method, url, **kwargs)
+    with new_session() as session:
+        return session.request(method, url, **kwargs)
@@ -0,0 +1,159 @@
+"""
+Cross-locale coverage of a localization module (e.g. hcm-boundary-<hierarchy type>).
+
+For each locale, every message of the module is read page by page. Pages are requested with
+stream=True and parsed with the boundary_stream tokenizer, so a large page is never built in
+memory as one JSON document. Only the codes are kept: one set per locale, with each code string
+interned so the same code held by several locales is stored once. The reference locale also keeps
+its message texts when an upsert payload is wanted.
+
+Set differences against the reference locale then give, per locale:
+    missing     codes the reference has and the locale does not
+    extra       codes the locale has and the reference does not
+    duplicates  codes returned more than once for the locale
+"""
+import sys
+
+from utils.boundary_stream import iter_json_events, CHUNK_SIZE
+from utils.config import tenantId
+from utils.data_loader import load_payload
+from utils.request_info import get_request_info
+
+PAGE_SIZE = 5000
+
+
+def iter_messages(chunks):
+    """(code, message) for every object in the top-level "messages" array of a search response"""
+    depth = 0
+    in_messages = False
+    key = None
+    fields = None
+    for event, value in iter_json_events(chunks):
+        if event == "start_map":
+            depth += 1
+            if in_messages and depth == 2:
+                fields = {}
+        elif event == "end_map":
+            if fields is not None and depth == 2:
+                yield fields.get("code"), fields.get("message")
+                fields = None
+            depth -= 1
+        elif event == "map_key":
+            key = value
+            if depth == 1:
+                in_messages = value == "messages"
+        elif event == "value":
+            if fields is not None and depth == 2:
+                fields[key] = value
+        elif event == "end_array" and depth == 1:
+            in_messages = False
+
+
+class LocaleCodes:
+    """Codes of one locale, with duplicates and (optionally) the message texts"""
+
+    def __init__(self, locale, keep_messages=False):
+        self.locale = locale
+        self.codes = set()
+        self.duplicates = set()
+        self.messages = {} if keep_messages else None
+        self.count = 0
+        self.pages = 0
+
+    def add(self, code, message):
+        self.count += 1
+        code = sys.intern(code)
+        if code in self.codes:
+            self.duplicates.add(code)
+            return
+        self.codes.add(code)
+        if self.messages is not None:
+            self.messages[code] = message
+
+
+def fetch_codes(client, token, module, locale, tenant=tenantId, page_size=PAGE_SIZE, keep_messages=False):
+    """Page through every message of `module` in `locale`"""
+    result = LocaleCodes(locale, keep_messages)
+    payload = load_payload("localization", "search_localization.json")
+    offset = 0
+    while True:
+        payload["RequestInfo"] = get_request_info(token)
+        response = client.post_stream(f"/localization/messages/v1/_search?tenantId={tenant}&locale={locale}"
+                                      f"&module={module}&limit={page_size}&offset={offset}", payload)
+        try:
+            if response.status_code != 200:
+                raise ValueError(f"Localization search for {locale} failed: {response.status_code} "
+                                 f"{response.text[:300]}")
+            page = [(code, message) for code, message in iter_messages(response.iter_content(chunk_size=CHUNK_SIZE))
+                    if code is not None]
+        finally:
+            response.close()
+        # A service that ignores limit/offset returns everything at once, or the same page again
+        if offset and len(page) == page_size and all(code in result.codes for code, _ in page):
+            break
+        result.pages += 1
+        for code, message in page:
+            result.add(code, message)
+        if len(page) != page_size:
+            break
+        offset += page_size
+    return result
+
+
+class CoverageReport:
+    def __init__(self, module, reference):
+        self.module = module
+        self.reference = reference
+        self.locales = {}
+
+    def add(self, codes):
+        self.locales[codes.locale] = codes
+
+    def missing(self, locale):
+        return self.locales[self.reference].codes - self.locales[locale].codes
+
+    def extra(self, locale):
+        return self.locales[locale].codes - self.locales[self.reference].codes
+
+    def rows(self):
+        """One summary dict per locale, the reference first"""
+        rows = []
+        for locale, codes in self.locales.items():
+            rows.append({
+                "locale": locale,
+                "messages": codes.count,
+                "codes": len(codes.codes),
+                "pages": codes.pages,
+                "missing": len(self.missing(locale)),
+                "extra": len(self.extra(locale)),
+                "duplicates": len(codes.duplicates),
+            })
+        return rows
+
+    @property
+    def complete(self):
+        return all(not self.missing(locale) and not codes.duplicates for locale, codes in self.locales.items())
+
+
+def analyze(client, token, module, locales, reference, tenant=tenantId, page_size=PAGE_SIZE, keep_messages=False):
+    """Coverage of `locales` against `reference`; the reference keeps its texts when keep_messages is set"""
+    report = CoverageReport(module, reference)
+    for locale in dict.fromkeys([reference, *locales]):
+        report.add(fetch_codes(client, token, module, locale, tenant, page_size,
+                               keep_messages=keep_messages and locale == reference))
+    return report
+
+
+def upsert_payloads(report, locale, tenant=tenantId, batch_size=1000):
+    """Upsert payloads (RequestInfo left for the caller) that add the locale's missing codes, using
+    the reference locale's text as a placeholder translation"""
+    reference = report.locales[report.reference]
+    if reference.messages is None:
+        raise ValueError("The reference locale was analyzed without keep_messages")
+    missing = sorted(report.missing(locale))
+    for start in range(0, len(missing), batch_size):
+        payload = load_payload("localization", "upsert_localization.json")
+        payload["tenantId"] = tenant
+        payload["messages"] = [{"code": code, "message": reference.messages[code], "module": report.module,
+                                "locale": locale} for code in missing[start:start + batch_size]]
+        yield payload
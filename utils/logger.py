@@ -0,0 +1,149 @@
+"""
+Structured, low-overhead logging for tests and runners.
+
+Loggers from get_logger() hand records to a queue; a background listener thread formats them as
+JSON lines and writes LOG_DIR/api.jsonl, rotating it at LOG_FILE_MAX_MB and gzipping rotated
+files. The calling thread never formats anything: records are queued as-is, and response bodies
+are wrapped so they are decoded, truncated and serialized only by the listener - and only if the
+level is enabled at all.
+
+    logger = get_logger(__name__)
+    log_response(logger, "TEST 01 - BOUNDARY HIERARCHY CREATE", response)
+    log_event(logger, "tree summary", nodes=1200, depth=5)
+"""
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import random
+import shutil
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from utils.config import (log_level, log_dir, log_max_body_bytes, log_sample_rate, log_file_max_mb,
+                          log_backup_count)
+
+ROOT_LOGGER = "api"
+LOG_FILE = "api.jsonl"
+
+_listener = None
+
+
+class Body:
+    """Response/request body rendered lazily by the listener thread, truncated to `limit` bytes"""
+
+    __slots__ = ("content", "content_type", "limit")
+
+    def __init__(self, content, content_type=None, limit=log_max_body_bytes):
+        self.content = content or b""
+        self.content_type = content_type or ""
+        self.limit = limit
+
+    def render(self):
+        size = len(self.content)
+        data = self.content[:self.limit] if self.limit and size > self.limit else self.content
+        if "json" in self.content_type and len(data) == size:
+            try:
+                return {"size": size, "json": json.loads(data)}
+            except ValueError:
+                pass
+        text = data.decode("utf-8", errors="replace") if isinstance(data, bytes) else str(data)
+        rendered = {"size": size, "text": text}
+        if len(data) < size:
+            rendered["truncated"] = True
+        return rendered
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in getattr(record, "fields", {}).items():
+            entry[key] = value.render() if isinstance(value, Body) else value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler.prepare() formats the message in the caller; defer all of it to the listener"""
+
+    def prepare(self, record):
+        return record
+
+
+def _gzip_rotator(source, dest):
+    with open(source, "rb") as src, gzip.open(dest, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def setup_logging():
+    """Start the queue listener once per process; safe to call repeatedly"""
+    global _listener
+    if _listener is not None:
+        return
+    os.makedirs(log_dir, exist_ok=True)
+    file_handler = RotatingFileHandler(os.path.join(log_dir, LOG_FILE), maxBytes=int(log_file_max_mb * 1024 * 1024),
+                                       backupCount=log_backup_count, encoding="utf-8")
+    file_handler.namer = lambda name: name + ".gz"
+    file_handler.rotator = _gzip_rotator
+    file_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(log_level)
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    # Keep records away from root handlers (and pytest's capture), which would format them inline
+    root.propagate = False
+
+    _listener = QueueListener(log_queue, file_handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Drain the queue and close the file; called automatically at exit"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def get_logger(name):
+    setup_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def log_event(logger, message, level=logging.INFO, **fields):
+    if logger.isEnabledFor(level):
+        logger.log(level, message, extra={"fields": fields})
+
+
+def log_response(logger, label, response, level=logging.INFO, **fields):
+    """Log a response's status, latency and body; successful responses are sampled at LOG_SAMPLE_RATE"""
+    ok = response.status_code < 400
+    # Error responses are always logged, at WARNING or above, whatever the caller's level
+    if not ok:
+        level = max(level, logging.WARNING)
+    if not logger.isEnabledFor(level):
+        return
+    if ok and log_sample_rate < 1 and random.random() >= log_sample_rate:
+        return
+    request = response.request
+    logger.log(level, label, extra={"fields": {
+        "method": getattr(request, "method", None),
+        "url": getattr(request, "url", None),
+        "status": response.status_code,
+        "elapsed_ms": round(response.elapsed.total_seconds() * 1000, 1) if response.elapsed else None,
+        "body": Body(response.content, response.headers.get("Content-Type")),
+        **fields,
+    }})
@@ -0,0 +1,309 @@
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Log-spaced latency bucket upper bounds in seconds (1 ms .. ~2 min); fixed so histograms
+# from different intervals, processes or hosts can be merged bucket by bucket
+BUCKETS = [0.001 * (1.25 ** i) for i in range(53)]
+
+# HTTP phases timed per request (see utils/http_phases.py); dns/connect/tls only for new connections
+PHASES = ("dns", "connect", "tls", "send", "ttfb", "transfer")
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot is overflow
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        """Approximate percentile (q in 0..100), interpolated linearly within its bucket and capped at max"""
+        if self.count == 0:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                if i == len(BUCKETS):
+                    return self.max
+                # Observations are taken to be spread evenly over the bucket; returning its upper bound
+                # instead would overstate a steady latency by up to a whole bucket (25%)
+                low = BUCKETS[i - 1] if i else 0.0
+                return min(low + (BUCKETS[i] - low) * max(rank - seen, 0) / c, self.max)
+            seen += c
+        return self.max
+
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def merge(self, other):
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def subtract(self, other):
+        """Observations recorded since `other` (an earlier copy of this histogram)"""
+        delta = Histogram()
+        delta.counts = [a - b for a, b in zip(self.counts, other.counts)]
+        delta.count = self.count - other.count
+        delta.sum = self.sum - other.sum
+        # The exact per-interval max is not recoverable; bound it by the highest bucket observed in the
+        # interval, so one old slow request does not make every later interval's max look slow. The
+        # interval's sum bounds it too: every other observation took at least its bucket's lower bound
+        top = next((i for i in range(len(delta.counts) - 1, -1, -1) if delta.counts[i]), None)
+        if top is not None:
+            floor = sum(c * (BUCKETS[i - 1] if i else 0.0) for i, c in enumerate(delta.counts))
+            low = BUCKETS[top - 1] if top else 0.0
+            high = BUCKETS[top] if top < len(BUCKETS) else self.max
+            delta.max = max(min(high, self.max, delta.sum - floor + low), low)
+        return delta
+
+    def to_dict(self):
+        return {"counts": {i: c for i, c in enumerate(self.counts) if c}, "count": self.count,
+                "sum": self.sum, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        h = cls()
+        for i, c in data["counts"].items():
+            h.counts[int(i)] = c
+        h.count, h.sum, h.max = data["count"], data["sum"], data["max"]
+        return h
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.errors = 0
+        self.contract_checked = 0
+        self.contract_violations = 0
+        # Request bodies before/after compression and response bodies on the wire/after decoding
+        self.sent_raw = 0
+        self.sent_wire = 0
+        self.received_wire = 0
+        self.received_decoded = 0
+        self.phases = {name: Histogram() for name in PHASES}
+        self.connections_new = 0
+        self.connections_reused = 0
+
+    def merge(self, other):
+        self.latency.merge(other.latency)
+        self.errors += other.errors
+        self.contract_checked += other.contract_checked
+        self.contract_violations += other.contract_violations
+        self.sent_raw += other.sent_raw
+        self.sent_wire += other.sent_wire
+        self.received_wire += other.received_wire
+        self.received_decoded += other.received_decoded
+        for name in PHASES:
+            self.phases[name].merge(other.phases[name])
+        self.connections_new += other.connections_new
+        self.connections_reused += other.connections_reused
+
+    COUNTERS = ("errors", "contract_checked", "contract_violations",
+                "sent_raw", "sent_wire", "received_wire", "received_decoded",
+                "connections_new", "connections_reused")
+
+    def to_dict(self):
+        return {"latency": self.latency.to_dict(), **{name: getattr(self, name) for name in self.COUNTERS},
+                "phases": {name: h.to_dict() for name, h in self.phases.items() if h.count}}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.latency = Histogram.from_dict(data["latency"])
+        for name in cls.COUNTERS:
+            setattr(stats, name, data.get(name, 0))
+        for name, h in data.get("phases", {}).items():
+            stats.phases[name] = Histogram.from_dict(h)
+        return stats
+
+
+def endpoint_key(method, endpoint):
+    """Metrics are grouped by method and path; query strings carry per-run IDs"""
+    return f"{method.upper()} {endpoint.split('?', 1)[0]}"
+
+
+class MetricsRecorder:
+    """Thread-safe per-endpoint latency histograms and error counts"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+        # Intervals handed out by snapshot(reset=True), kept so cumulative() stays monotonic
+        self.retired = {}
+
+    def record(self, key, seconds, ok=True, contract_ok=None):
+        """contract_ok is None when the response was not contract-checked"""
+        with self.lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats()
+            stats.latency.observe(seconds)
+            if not ok:
+                stats.errors += 1
+            if contract_ok is not None:
+                stats.contract_checked += 1
+                if not contract_ok:
+                    stats.contract_violations += 1
+
+    def record_transfer(self, key, sent_raw, sent_wire, received_wire, received_decoded):
+        with self.lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats()
+            stats.sent_raw += sent_raw
+            stats.sent_wire += sent_wire
+            stats.received_wire += received_wire
+            stats.received_decoded += received_decoded
+
+    def record_phases(self, key, phases, new_connection):
+        """One HTTP exchange's {phase: seconds} and whether it had to open a connection"""
+        with self.lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats()
+            for name, seconds in phases.items():
+                stats.phases[name].observe(seconds)
+            if new_connection:
+                stats.connections_new += 1
+            else:
+                stats.connections_reused += 1
+
+    def merge(self, endpoints):
+        """Add per-endpoint stats recorded elsewhere (another interval, process or host)"""
+        with self.lock:
+            for key, stats in endpoints.items():
+                target = self.endpoints.get(key)
+                if target is None:
+                    target = self.endpoints[key] = EndpointStats()
+                target.merge(stats)
+
+    def snapshot(self, reset=False):
+        """Copy of the current stats; with reset=True the recorder starts a fresh interval"""
+        with self.lock:
+            current = self.endpoints
+            if reset:
+                self.endpoints = {}
+                for key, stats in current.items():
+                    self.retired.setdefault(key, EndpointStats()).merge(stats)
+                return current
+            copy = {}
+            for key, stats in current.items():
+                copy[key] = EndpointStats()
+                copy[key].merge(stats)
+            return copy
+
+    def cumulative(self):
+        """Everything recorded since the process started, regardless of interval resets"""
+        with self.lock:
+            total = {}
+            for source in (self.retired, self.endpoints):
+                for key, stats in source.items():
+                    total.setdefault(key, EndpointStats()).merge(stats)
+            return total
+
+    def delta(self, before):
+        """Per-endpoint stats recorded since `before`, a snapshot() taken earlier"""
+        delta = {}
+        for key, stats in self.snapshot().items():
+            prior = before.get(key)
+            if prior is None:
+                delta[key] = stats
+                continue
+            if stats.latency.count == prior.latency.count:
+                continue
+            delta[key] = EndpointStats()
+            delta[key].latency = stats.latency.subtract(prior.latency)
+            delta[key].errors = stats.errors - prior.errors
+            delta[key].contract_checked = stats.contract_checked - prior.contract_checked
+            delta[key].contract_violations = stats.contract_violations - prior.contract_violations
+            for field in ("sent_raw", "sent_wire", "received_wire", "received_decoded",
+                          "connections_new", "connections_reused"):
+                setattr(delta[key], field, getattr(stats, field) - getattr(prior, field))
+            for name in PHASES:
+                delta[key].phases[name] = stats.phases[name].subtract(prior.phases[name])
+        return delta
+
+    def summary(self, reset=False):
+        rows = []
+        for key, stats in sorted(self.snapshot(reset).items()):
+            h = stats.latency
+            rows.append({
+                "endpoint": key,
+                "count": h.count,
+                "errors": stats.errors,
+                "error_rate": stats.errors / h.count if h.count else 0.0,
+                "mean_ms": h.mean() * 1000,
+                "p50_ms": h.percentile(50) * 1000,
+                "p95_ms": h.percentile(95) * 1000,
+                "p99_ms": h.percentile(99) * 1000,
+                "max_ms": h.max * 1000,
+                "contract_checked": stats.contract_checked,
+                "contract_violations": stats.contract_violations,
+                "sent_raw": stats.sent_raw,
+                "sent_wire": stats.sent_wire,
+                "received_wire": stats.received_wire,
+                "received_decoded": stats.received_decoded,
+                # None when the phase was never measured (no new connection, plain http, streamed body)
+                **{f"{name}_ms": stats.phases[name].mean() * 1000 if stats.phases[name].count else None
+                   for name in PHASES},
+                "ttfb_p95_ms": stats.phases["ttfb"].percentile(95) * 1000 if stats.phases["ttfb"].count else None,
+                "connections_new": stats.connections_new,
+                "connections_reused": stats.connections_reused
+            })
+        return rows
+
+
+class Gauges:
+    """Process-wide named counters and gauges (in-flight requests, waiting polls, token refreshes)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def add(self, name, amount=1):
+        with self.lock:
+            self.values[name] = self.values.get(name, 0) + amount
+
+    @contextmanager
+    def track(self, name):
+        """Gauge of how many callers are currently inside the block"""
+        self.add(name)
+        try:
+            yield
+        finally:
+            self.add(name, -1)
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.values)
+
+
+# Process-wide recorder fed by APIClient
+RECORDER = MetricsRecorder()
+GAUGES = Gauges()
+
+
+def rss_bytes():
+    """Current resident set size of this process (falls back to peak RSS off Linux)"""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    import sys
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
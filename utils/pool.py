@@ -0,0 +1,161 @@
+"""
+Warm pool of pre-provisioned hierarchies.
+
+Creating a hierarchy, upserting its localization and generating its template takes tens of
+seconds before the upload/process steps most tests and load runs care about. The pool runs
+those setup steps ahead of time - the steps of boundary_onboarding before its "provision_until"
+step - and keeps the resulting variables (hierarchyType, generateId, generatedFileStoreId) in
+output/pool/hierarchies.json. Tests (HIERARCHY_POOL=true) and load users (run_scenario.py --pool)
+claim an entry and start straight at upload; hierarchy_pool.py fills the pool and tops it up.
+
+Each entry is handed out once. The pool file is shared by every process on the host and guarded
+by an OS lock on a lock file (utils/file_lock.py); entries older than POOL_MAX_AGE_HOURS, or whose template no longer downloads,
+are discarded instead of being handed out.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.config import output_dir, pool_max_age_hours
+from utils.file_lock import file_lock
+from utils.generate_cache import is_downloadable
+from utils.scenario import ScenarioRunner, TokenProvider, load_scenario, write_ids
+
+PROVISION_SCENARIO = "boundary_onboarding"
+
+
+class PoolError(Exception):
+    pass
+
+
+def provision_scenario(name=PROVISION_SCENARIO):
+    """The scenario's setup steps: everything before its provision_until step"""
+    scenario = load_scenario(name)
+    until = scenario.get("provision_until")
+    names = [step.get("name") for step in scenario["steps"]]
+    if until not in names:
+        raise PoolError(f"Scenario {scenario.get('name')} has no provision_until step")
+    return dict(scenario, steps=scenario["steps"][:names.index(until)])
+
+
+class HierarchyPool:
+    def __init__(self, path, max_age_s, scenario=PROVISION_SCENARIO):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.max_age_s = max_age_s
+        self.scenario_name = scenario
+        self._scenario = None
+
+    @property
+    def scenario(self):
+        if self._scenario is None:
+            self._scenario = provision_scenario(self.scenario_name)
+        return self._scenario
+
+    def _locked(self):
+        """Cross-process lock on the pool file"""
+        return file_lock(self.lock_path)
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _write(self, entries):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def _fresh(self, entries):
+        cutoff = time.time() - self.max_age_s
+        return [e for e in entries if e["created"] >= cutoff]
+
+    def entries(self):
+        with self._locked():
+            return self._fresh(self._read())
+
+    def add(self, variables):
+        with self._locked():
+            entries = self._fresh(self._read())
+            entries.append({"variables": variables, "created": time.time()})
+            self._write(entries)
+
+    def claim(self, client):
+        """Take the oldest usable entry out of the pool; returns its variables, or None if the pool is empty"""
+        while True:
+            with self._locked():
+                entries = self._fresh(self._read())
+                entry = entries.pop(0) if entries else None
+                self._write(entries)
+            if entry is None:
+                return None
+            file_store_id = entry["variables"].get("generatedFileStoreId")
+            if file_store_id and is_downloadable(client, file_store_id):
+                return entry["variables"]
+            print(f"  Pool: discarding {entry['variables'].get('hierarchyType')}, its template is no longer downloadable")
+
+    def provision(self, runner=None):
+        """Run the setup steps once and add the result to the pool"""
+        runner = runner or ScenarioRunner(self.scenario, TokenProvider())
+        result = runner.run()
+        if not result.ok:
+            failed = next(s for s in result.steps if not s.ok)
+            raise PoolError(f"Provisioning failed at {failed.name}: {(failed.error or '')[:300]}")
+        variables = {var: result.variables[var] for var in self.scenario.get("ids", {}).values()
+                     if var in result.variables}
+        self.add(variables)
+        return variables
+
+    def fill(self, size, workers=1):
+        """Provision until the pool holds `size` entries; returns how many were added"""
+        missing = size - len(self.entries())
+        if missing <= 0:
+            return 0
+        runner = ScenarioRunner(self.scenario, TokenProvider())
+        added = 0
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, missing))) as executor:
+            for outcome in executor.map(lambda _: self._try_provision(runner), range(missing)):
+                added += outcome is not None
+        return added
+
+    def _try_provision(self, runner):
+        try:
+            variables = self.provision(runner)
+            print(f"  Pool: provisioned {variables.get('hierarchyType')}")
+            return variables
+        except PoolError as e:
+            print(f"  Pool: {e}")
+            return None
+
+    def keep_filled(self, size, workers=1, interval=10, stop=None):
+        """Top the pool back up to `size` every `interval` seconds until `stop` is set"""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.fill(size, workers)
+            stop.wait(interval)
+
+    def clear(self):
+        with self._locked():
+            removed = len(self._read())
+            self._write([])
+        return removed
+
+
+def claim_for_test(client, path):
+    """Claim a hierarchy for the pytest suite and write it to ids.txt; returns its variables or None"""
+    variables = POOL.claim(client)
+    if variables is None:
+        return None
+    write_ids(POOL.scenario, variables, path)
+    with open(path, "a") as f:
+        f.write("Provisioned: pool\n")
+    return variables
+
+
+POOL = HierarchyPool(os.path.join(output_dir, "pool", "hierarchies.json"), pool_max_age_hours * 3600)
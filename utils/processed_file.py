@@ -0,0 +1,152 @@
+"""
+Streaming verification of the processed boundary file returned by /_process.
+
+The service writes a per-row status and error column next to the boundary columns. Rows are
+streamed one at a time (utils.xlsx_reader), so memory does not grow with the row count: besides
+the workbook's shared-strings table, which the reader loads whole, only a counter per boundary
+level, at most MAX_ERROR_TYPES error types and the first N errors are kept.
+"""
+import re
+
+from utils.template import BOUNDARY_SHEET
+from utils.xlsx_reader import XlsxReader
+
+STATUS_HEADERS = {"status"}
+ERROR_HEADERS = {"errordetails", "error", "errors", "errormessage"}
+FAILURE_STATUSES = {"invalid", "failed", "failure", "error"}
+# Headers that end the run of boundary level columns in the template
+NON_LEVEL_HEADERS = {"serviceboundarycode", "hcm_admin_console_boundary_code", "latitude", "longitude"}
+# Distinct error types counted; further types are folded into OTHER_ERRORS
+MAX_ERROR_TYPES = 50
+OTHER_ERRORS = "Other errors"
+# Row-specific values in an error's leading text: quoted values and numbers (as in codes like MZ_PROV_12)
+_ROW_VALUES = re.compile(r"'[^']*'|\"[^\"]*\"|\d+")
+
+
+def _normalize(header):
+    return str(header or "").strip().strip("#").replace(" ", "").lower()
+
+
+def error_type(message):
+    """Group errors by their leading text, e.g. 'Boundary code already exists: X' -> 'Boundary code already exists'.
+    Quoted values and numbers are replaced, so 'Row 12 has no parent' and 'Row 40 has no parent' are one type."""
+    text = str(message).strip().split("\n", 1)[0].split(":", 1)[0]
+    return _ROW_VALUES.sub("#", text).strip()[:80] or "Unknown error"
+
+
+class ProcessedFileReport:
+    def __init__(self, max_errors):
+        self.max_errors = max_errors
+        self.rows = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.by_level = {}        # level -> [succeeded, failed]
+        self.by_error_type = {}   # error type -> count, at most MAX_ERROR_TYPES types plus OTHER_ERRORS
+        self.first_errors = []    # (row number, level, boundary, status, error)
+        self.status_column = None
+        self.error_column = None
+
+    @property
+    def ok(self):
+        return self.failed == 0
+
+    def count_error(self, kind):
+        if kind not in self.by_error_type and len(self.by_error_type) >= MAX_ERROR_TYPES:
+            kind = OTHER_ERRORS
+        self.by_error_type[kind] = self.by_error_type.get(kind, 0) + 1
+
+    def summary(self):
+        lines = [f"{self.rows} rows: {self.succeeded} succeeded, {self.failed} failed"]
+        for level, (ok, failed) in self.by_level.items():
+            lines.append(f"  {level}: {ok} succeeded, {failed} failed")
+        if self.by_error_type:
+            lines.append("Errors by type:")
+            for kind, count in sorted(self.by_error_type.items(), key=lambda kv: kv[1], reverse=True):
+                lines.append(f"  {count:>7}  {kind}")
+        if self.first_errors:
+            lines.append(f"First {len(self.first_errors)} errors:")
+            for row, level, boundary, status, error in self.first_errors:
+                lines.append(f"  row {row} [{level}] {boundary}: {status or ''} {error or ''}".rstrip())
+        return "\n".join(lines)
+
+
+def _find_columns(headers, hierarchy_type=None):
+    normalized = [_normalize(h) for h in headers]
+    status_col = next((i for i, h in enumerate(normalized) if h in STATUS_HEADERS), None)
+    error_col = next((i for i, h in enumerate(normalized) if h in ERROR_HEADERS), None)
+
+    if hierarchy_type:
+        prefix = f"{hierarchy_type}_".lower()
+        levels = [i for i, h in enumerate(headers) if str(h or "").lower().startswith(prefix)]
+    else:
+        levels = []
+        for i, h in enumerate(normalized):
+            if not h or h in NON_LEVEL_HEADERS or i in (status_col, error_col) or h.startswith("boundary("):
+                break
+            levels.append(i)
+    return levels, status_col, error_col
+
+
+def iter_processed_rows(path, sheet_name=BOUNDARY_SHEET):
+    """Yield the header row and then each data row as a tuple, streaming from disk"""
+    with XlsxReader(path) as reader:
+        yield from reader.iter_rows(sheet_name if sheet_name in reader.sheetnames else None)
+
+
+def verify_processed_file(path, hierarchy_type=None, max_errors=20, rows=None):
+    """
+    Aggregate per-row status/error columns of a processed boundary file.
+
+    Args:
+        path (str): Processed xlsx on disk.
+        hierarchy_type (str): Optional; identifies the level columns by their '<hierarchyType>_' prefix.
+        max_errors (int): Number of failing rows kept verbatim for the summary.
+        rows (iterable): Optional row source (header row first); defaults to streaming `path`.
+
+    Returns:
+        ProcessedFileReport
+    """
+    report = ProcessedFileReport(max_errors)
+    rows = iter(rows if rows is not None else iter_processed_rows(path))
+    headers = next(rows, None)
+    if headers is None:
+        raise ValueError(f"Processed file is empty: {path}")
+
+    levels, status_col, error_col = _find_columns(headers, hierarchy_type)
+    if status_col is None and error_col is None:
+        raise ValueError(f"No status or error column in processed file headers: {list(headers)}")
+    report.status_column = headers[status_col] if status_col is not None else None
+    report.error_column = headers[error_col] if error_col is not None else None
+    level_names = {i: str(headers[i]) for i in levels}
+    if hierarchy_type:
+        level_names = {i: name[len(hierarchy_type) + 1:] for i, name in level_names.items()}
+
+    width = len(headers)
+    data_cols = [i for i in range(width) if i not in (status_col, error_col)]
+    for row_number, row in enumerate(rows, start=2):
+        if len(row) < width:
+            row = tuple(row) + (None,) * (width - len(row))
+        error = row[error_col] if error_col is not None else None
+        # Formatted sheets can carry trailing rows with nothing but a status; only rows with data or an error count
+        if not error and not any(row[i] not in (None, "") for i in data_cols):
+            continue
+
+        # A row's level is its deepest filled boundary column
+        level_col = next((i for i in reversed(levels) if row[i] not in (None, "")), None)
+        level = level_names.get(level_col, "unknown")
+        boundary = row[level_col] if level_col is not None else None
+        status = row[status_col] if status_col is not None else None
+
+        failed = bool(error) or _normalize(status) in FAILURE_STATUSES
+        counts = report.by_level.setdefault(level, [0, 0])
+        report.rows += 1
+        if failed:
+            report.failed += 1
+            counts[1] += 1
+            report.count_error(error_type(error) if error else f"status {status}")
+            if len(report.first_errors) < max_errors:
+                report.first_errors.append((row_number, level, boundary, status, error))
+        else:
+            report.succeeded += 1
+            counts[0] += 1
+    return report
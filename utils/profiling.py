@@ -0,0 +1,214 @@
+"""
+Pytest plugin: per-test CPU (cProfile) and memory (tracemalloc) profiling.
+
+    pytest tests/test_08_file_upload.py --profile
+    pytest tests/ --profile --profile-calls
+
+Writes into output/profiles/:
+    <test>.pstats     - cProfile stats (open with `python -m pstats` or snakeviz)
+    <test>.collapsed  - collapsed stacks for flamegraph.pl / speedscope
+    <test>.alloc.txt  - top allocation sites
+    <test>.calls.txt  - per APIClient call wall time and peak memory (with --profile-calls)
+"""
+import cProfile
+import functools
+import os
+import pstats
+import re
+import time
+import tracemalloc
+
+import pytest
+
+from utils.config import output_dir
+
+PROFILE_DIR = os.path.join(output_dir, "profiles")
+TOP_N = 15
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("profiling")
+    group.addoption("--profile", action="store_true", default=False,
+                    help="Profile each test with cProfile and tracemalloc into output/profiles/")
+    group.addoption("--profile-calls", action="store_true", default=False,
+                    help="Also record wall time and peak memory of every APIClient call")
+
+
+def pytest_configure(config):
+    if config.getoption("--profile") or config.getoption("--profile-calls"):
+        config.pluginmanager.register(Profiler(config), "api-profiler")
+
+
+def _safe_name(nodeid):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", nodeid.split("/")[-1])
+
+
+def _func_label(func):
+    filename, lineno, name = func
+    return f"{os.path.basename(filename)}:{lineno}:{name}" if lineno else name
+
+
+def write_collapsed(stats, path, max_depth=64):
+    """Approximate collapsed stacks from the caller graph: each function's self time is
+    split across its callers in proportion to the time spent under each caller."""
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller, (_, _, _, cum) in callers.items():
+            callees.setdefault(caller, []).append((func, cum))
+
+    lines = {}
+
+    def walk(func, stack, fraction):
+        cc, nc, tt, ct, callers = stats.stats[func]
+        stack = stack + [_func_label(func)]
+        self_us = int(tt * fraction * 1e6)
+        if self_us > 0:
+            key = ";".join(stack)
+            lines[key] = lines.get(key, 0) + self_us
+        if len(stack) >= max_depth:
+            return
+        for child, edge_cum in callees.get(func, []):
+            if _func_label(child) in stack:
+                continue  # recursion, already accounted for in the child's own frames
+            child_ct = stats.stats[child][3]
+            if child_ct > 0:
+                walk(child, stack, fraction * min(1.0, edge_cum / child_ct))
+
+    roots = [func for func, value in stats.stats.items() if not value[4]]
+    for root in roots:
+        walk(root, [], 1.0)
+
+    with open(path, "w", encoding="utf-8") as f:
+        for key, value in sorted(lines.items()):
+            f.write(f"{key} {value}\n")
+
+
+class Profiler:
+    def __init__(self, config):
+        self.per_test = config.getoption("--profile")
+        self.per_call = config.getoption("--profile-calls")
+        self.merged_stats = None
+        self.test_times = []
+        self.alloc_sites = {}
+        self.call_totals = {}
+        self.current_calls = None
+        self.test_peak = 0        # highest traced memory seen before a per-call reset_peak()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+
+    def pytest_sessionstart(self, session):
+        if self.per_call:
+            self._patch_client()
+
+    def _patch_client(self):
+        from utils.api_client import APIClient
+
+        original = APIClient.request
+        profiler = self
+
+        @functools.wraps(original)
+        def profiled_request(client, method, endpoint, **kwargs):
+            if profiler.current_calls is None:
+                return original(client, method, endpoint, **kwargs)
+            tracing = tracemalloc.is_tracing()
+            if tracing:
+                base, peak_so_far = tracemalloc.get_traced_memory()
+                # Keep the test's peak up to here; the reset below would otherwise lose it
+                profiler.test_peak = max(profiler.test_peak, peak_so_far)
+                tracemalloc.reset_peak()
+            start = time.perf_counter()
+            try:
+                return original(client, method, endpoint, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1] - base if tracing else 0
+                key = f"{method} {endpoint.split('?', 1)[0]}"
+                profiler.current_calls.append((key, elapsed, peak))
+                total = profiler.call_totals.setdefault(key, [0, 0.0, 0])
+                total[0] += 1
+                total[1] += elapsed
+                total[2] = max(total[2], peak)
+
+        APIClient.request = profiled_request
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        name = _safe_name(item.nodeid)
+        self.current_calls = [] if self.per_call else None
+        self.test_peak = 0
+        profile = cProfile.Profile() if self.per_test else None
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(10 if self.per_test else 1)
+        else:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+            elapsed = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot() if self.per_test else None
+            peak = max(self.test_peak, tracemalloc.get_traced_memory()[1])
+            if started_tracing:
+                tracemalloc.stop()
+            self.test_times.append((item.nodeid, elapsed, peak))
+            if profile:
+                self._write_test_profile(name, profile, snapshot)
+            if self.current_calls:
+                self._write_calls(name, self.current_calls)
+            self.current_calls = None
+
+    def _write_test_profile(self, name, profile, snapshot):
+        stats = pstats.Stats(profile)
+        stats.dump_stats(os.path.join(PROFILE_DIR, f"{name}.pstats"))
+        write_collapsed(stats, os.path.join(PROFILE_DIR, f"{name}.collapsed"))
+        if self.merged_stats is None:
+            self.merged_stats = stats
+        else:
+            self.merged_stats.add(stats)
+
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        top = snapshot.statistics("lineno")
+        with open(os.path.join(PROFILE_DIR, f"{name}.alloc.txt"), "w", encoding="utf-8") as f:
+            for stat in top[:50]:
+                f.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {stat.traceback[0]}\n")
+        for stat in top:
+            site = str(stat.traceback[0])
+            self.alloc_sites[site] = self.alloc_sites.get(site, 0) + stat.size
+
+    def _write_calls(self, name, calls):
+        with open(os.path.join(PROFILE_DIR, f"{name}.calls.txt"), "w", encoding="utf-8") as f:
+            for key, elapsed, peak in calls:
+                f.write(f"{elapsed * 1000:10.1f} ms {peak / 1024:10.1f} KiB peak  {key}\n")
+
+    def pytest_terminal_summary(self, terminalreporter):
+        tr = terminalreporter
+        tr.section("profiling summary")
+        tr.write_line(f"Profiles written to {PROFILE_DIR}/")
+
+        tr.write_line("\nSlowest tests (wall time, peak traced memory):")
+        for nodeid, elapsed, peak in sorted(self.test_times, key=lambda t: t[1], reverse=True)[:TOP_N]:
+            tr.write_line(f"  {elapsed:8.2f} s {peak / 1048576:8.1f} MiB  {nodeid}")
+
+        if self.merged_stats is not None:
+            tr.write_line("\nTop CPU consumers across the run (self time):")
+            rows = sorted(self.merged_stats.stats.items(), key=lambda kv: kv[1][2], reverse=True)
+            for func, (cc, nc, tt, ct, _) in rows[:TOP_N]:
+                tr.write_line(f"  {tt:8.3f} s self {ct:8.3f} s cum {nc:8d} calls  {_func_label(func)}")
+
+        if self.alloc_sites:
+            tr.write_line("\nTop allocation sites across the run (live at test end):")
+            for site, size in sorted(self.alloc_sites.items(), key=lambda kv: kv[1], reverse=True)[:TOP_N]:
+                tr.write_line(f"  {size / 1024:10.1f} KiB  {site}")
+
+        if self.call_totals:
+            tr.write_line("\nAPIClient calls (count, total wall time, max peak memory):")
+            for key, (count, total, peak) in sorted(self.call_totals.items(), key=lambda kv: kv[1][1], reverse=True)[:TOP_N]:
+                tr.write_line(f"  {count:5d} {total:8.2f} s {peak / 1024:10.1f} KiB  {key}")
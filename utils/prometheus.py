@@ -0,0 +1,104 @@
+"""
+Live metrics in Prometheus text format (exposition format 0.0.4) for load and soak runs.
+
+Nothing is added to the request path beyond what APIClient already records: the text is built
+from the recorders only when /metrics is scraped, from cumulative totals, so counters stay
+monotonic even though the runners reset their recorders every reporting interval.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.metrics import BUCKETS, RECORDER, GAUGES, rss_bytes
+from utils.scenario import STEP_RECORDER
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram(lines, name, label, key, histogram):
+    cumulative = 0
+    for bound, count in zip(BUCKETS, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{label}="{_label(key)}",le="{bound:.6g}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{label}="{_label(key)}",le="+Inf"}} {histogram.count}')
+    lines.append(f'{name}_sum{{{label}="{_label(key)}"}} {histogram.sum:.6f}')
+    lines.append(f'{name}_count{{{label}="{_label(key)}"}} {histogram.count}')
+
+
+def _family(lines, name, kind, help_text):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def render(endpoints=RECORDER, steps=STEP_RECORDER):
+    """Prometheus text for the given recorders plus this process's gauges and memory"""
+    api = sorted(endpoints.cumulative().items())
+    step_stats = sorted(steps.cumulative().items())
+    gauges = GAUGES.snapshot()
+    lines = []
+
+    _family(lines, "api_requests_total", "counter", "Requests sent, by method and path")
+    lines += [f'api_requests_total{{endpoint="{_label(k)}"}} {s.latency.count}' for k, s in api]
+    _family(lines, "api_request_errors_total", "counter", "Requests that failed or returned status >= 400")
+    lines += [f'api_request_errors_total{{endpoint="{_label(k)}"}} {s.errors}' for k, s in api]
+    _family(lines, "api_contract_violations_total", "counter", "Responses that did not match their contract")
+    lines += [f'api_contract_violations_total{{endpoint="{_label(k)}"}} {s.contract_violations}' for k, s in api]
+    _family(lines, "api_sent_bytes_total", "counter", "Request body bytes on the wire")
+    lines += [f'api_sent_bytes_total{{endpoint="{_label(k)}"}} {s.sent_wire}' for k, s in api]
+    _family(lines, "api_received_bytes_total", "counter", "Response body bytes on the wire")
+    lines += [f'api_received_bytes_total{{endpoint="{_label(k)}"}} {s.received_wire}' for k, s in api]
+    _family(lines, "api_connections_opened_total", "counter", "Requests that had to open a new connection")
+    lines += [f'api_connections_opened_total{{endpoint="{_label(k)}"}} {s.connections_new}' for k, s in api]
+    _family(lines, "api_connections_reused_total", "counter", "Requests sent on a kept-alive connection")
+    lines += [f'api_connections_reused_total{{endpoint="{_label(k)}"}} {s.connections_reused}' for k, s in api]
+    _family(lines, "api_request_phase_seconds_total", "counter",
+            "Time spent per HTTP phase (dns, connect, tls, send, ttfb, transfer)")
+    lines += [f'api_request_phase_seconds_total{{endpoint="{_label(k)}",phase="{name}"}} {h.sum:.6f}'
+              for k, s in api for name, h in s.phases.items()]
+    _family(lines, "api_request_duration_seconds", "histogram", "Request latency including retries")
+    for key, stats in api:
+        _histogram(lines, "api_request_duration_seconds", "endpoint", key, stats.latency)
+
+    _family(lines, "scenario_step_failures_total", "counter", "Failed scenario steps")
+    lines += [f'scenario_step_failures_total{{step="{_label(k)}"}} {s.errors}' for k, s in step_stats]
+    _family(lines, "scenario_step_duration_seconds", "histogram", "Scenario step duration")
+    for key, stats in step_stats:
+        _histogram(lines, "scenario_step_duration_seconds", "step", key, stats.latency)
+
+    _family(lines, "api_requests_in_flight", "gauge", "Requests currently waiting for a response")
+    lines.append(f"api_requests_in_flight {gauges.get('requests_in_flight', 0)}")
+    _family(lines, "poller_queue_depth", "gauge", "Async jobs (generate/process) currently being polled")
+    lines.append(f"poller_queue_depth {gauges.get('polls_waiting', 0)}")
+    _family(lines, "auth_token_refreshes_total", "counter", "Auth tokens requested")
+    lines.append(f"auth_token_refreshes_total {gauges.get('token_refreshes', 0)}")
+    _family(lines, "process_resident_memory_bytes", "gauge", "Resident memory of the load client")
+    lines.append(f"process_resident_memory_bytes {rss_bytes()}")
+    return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(port, host="127.0.0.1", endpoints=RECORDER, steps=STEP_RECORDER):
+    """Serve /metrics from a daemon thread; returns the server (server.server_port is the bound port)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render(endpoints, steps).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Metrics: http://{host}:{server.server_port}/metrics")
+    return server
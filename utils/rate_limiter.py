@@ -0,0 +1,206 @@
+import asyncio
+import threading
+import time
+from contextlib import contextmanager, asynccontextmanager
+
+from utils.config import rate_limits
+from utils.deadline import current_deadline, check as check_deadline, sleep as deadline_sleep
+
+
+class TokenBucket:
+    """Requests/second budget; tokens refill continuously up to `burst`"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take one token and return how long the caller must wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class Budget:
+    """Rate and max-in-flight limits for one endpoint prefix, with throttling metrics"""
+
+    def __init__(self, prefix, rate=None, max_in_flight=None):
+        self.prefix = prefix
+        self.bucket = TokenBucket(rate) if rate else None
+        self.max_in_flight = max_in_flight
+        self.slots = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+        self.in_flight = 0
+        self._waiters = []
+
+    def _record(self, waited):
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            if waited > 0:
+                self.throttled += 1
+                self.throttled_seconds += waited
+
+    def _release(self, admitted):
+        if admitted:
+            with self.lock:
+                self.in_flight -= 1
+        if self.slots:
+            self.slots.release()
+            with self.lock:
+                waiters, self._waiters = self._waiters, []
+            # Async callers wait on a future rather than the semaphore; wake them to try again
+            for future in waiters:
+                if not future.get_loop().is_closed():
+                    future.get_loop().call_soon_threadsafe(_wake, future)
+
+    async def _acquire_slot_async(self):
+        """Take a slot of the semaphore shared with sync callers without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        while True:
+            future = loop.create_future()
+            # Registered before trying, so a release between the try and the await is not missed
+            with self.lock:
+                self._waiters.append(future)
+            try:
+                if self.slots.acquire(blocking=False):
+                    return
+                await future
+            finally:
+                with self.lock:
+                    if future in self._waiters:
+                        self._waiters.remove(future)
+
+    @contextmanager
+    def acquire(self):
+        start = time.monotonic()
+        if self.slots:
+            # Never wait past the active deadline; DeadlineExceeded names the throttled prefix
+            deadline = current_deadline()
+            while not self.slots.acquire(timeout=None if deadline is None else max(0.0, deadline.remaining())):
+                check_deadline(self.prefix)
+        # The slot is released even if the caller is interrupted while waiting for a token
+        admitted = False
+        try:
+            if self.bucket:
+                delay = self.bucket.reserve()
+                if delay > 0:
+                    deadline_sleep(delay)
+                    check_deadline(self.prefix)
+            self._record(time.monotonic() - start)
+            admitted = True
+            yield
+        finally:
+            self._release(admitted)
+
+    @asynccontextmanager
+    async def acquire_async(self):
+        start = time.monotonic()
+        deadline = current_deadline()
+        if self.slots:
+            while True:
+                try:
+                    await asyncio.wait_for(self._acquire_slot_async(),
+                                           None if deadline is None else max(0.0, deadline.remaining()))
+                    break
+                except asyncio.TimeoutError:
+                    check_deadline(self.prefix)
+        admitted = False
+        try:
+            if self.bucket:
+                delay = self.bucket.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay if deadline is None else min(delay, max(0.0, deadline.remaining())))
+                    check_deadline(self.prefix)
+            self._record(time.monotonic() - start)
+            admitted = True
+            yield
+        finally:
+            self._release(admitted)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "prefix": self.prefix,
+                "rate": self.bucket.rate if self.bucket else None,
+                "max_in_flight": self.max_in_flight,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+                "in_flight": self.in_flight
+            }
+
+
+class RateLimiter:
+    """Per-endpoint-prefix budgets; the longest matching prefix wins, unmatched endpoints are not limited"""
+
+    def __init__(self, budgets=None):
+        self.budgets = sorted(budgets or [], key=lambda b: len(b.prefix), reverse=True)
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Build from '<prefix>=<rps>[:<max_in_flight>]' entries separated by commas,
+        e.g. '/boundary-management/=2:4,/localization/=20'. Use 0 rps for in-flight only."""
+        budgets = []
+        for entry in filter(None, (e.strip() for e in (spec or "").split(","))):
+            prefix, _, limits = entry.partition("=")
+            rate, _, in_flight = limits.partition(":")
+            budgets.append(Budget(prefix.strip(), float(rate) or None, int(in_flight) if in_flight else None))
+        return cls(budgets)
+
+    def budget_for(self, endpoint):
+        return next((b for b in self.budgets if endpoint.startswith(b.prefix)), None)
+
+    @contextmanager
+    def limit(self, endpoint):
+        budget = self.budget_for(endpoint)
+        if budget is None:
+            yield
+            return
+        with budget.acquire():
+            yield
+
+    @asynccontextmanager
+    async def limit_async(self, endpoint):
+        budget = self.budget_for(endpoint)
+        if budget is None:
+            yield
+            return
+        async with budget.acquire_async():
+            yield
+
+    def stats(self):
+        return [b.stats() for b in self.budgets]
+
+    def print_stats(self):
+        print(f"{'PREFIX':<30} {'RPS':>6} {'INFLIGHT':>8} {'REQUESTS':>9} {'THROTTLED':>9} {'WAIT (s)':>9}")
+        for s in self.stats():
+            print(f"{s['prefix']:<30} {str(s['rate'] or '-'):>6} {str(s['max_in_flight'] or '-'):>8} "
+                  f"{s['requests']:>9} {s['throttled']:>9} {s['throttled_seconds']:>9.2f}")
+
+
+_default_limiter = None
+_default_lock = threading.Lock()
+
+
+def default_rate_limiter():
+    """Process-wide limiter built from RATE_LIMITS, shared by every client so budgets are global"""
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None and rate_limits:
+            _default_limiter = RateLimiter.from_spec(rate_limits)
+        return _default_limiter
@@ -1,10 +1,9 @@
-import time
-from utils.config import locale
+from utils.config import locale, tenantId
+from utils.tracing import msg_id as traced_msg_id
 
 def get_request_info(token: str) -> dict:
-    # Generate timestamp|locale format for msgId
-    timestamp = int(time.time() * 1000)
-    msg_id = f"{timestamp}|{locale}"
+    # timestamp|locale|traceId-spanId; APIClient replaces the IDs with those of the request's own span
+    msg_id = traced_msg_id(locale)
 
     return {
         "apiId": "Rainmaker",
@@ -18,12 +17,12 @@ def get_request_info(token: str) -> dict:
             "userName": "auto_user",
             "type": "EMPLOYEE",
             "uuid": "ac775061-7078-41b9-83bc-bfd1d064d20b",
-            "tenantId": "mz",
+            "tenantId": tenantId,
             "roles": [
                 {
                     "name": "District Supervisor",
                     "code": "DISTRICT_SUPERVISOR",
-                    "tenantId": "mz"
+                    "tenantId": tenantId
                 }
             ]
         },
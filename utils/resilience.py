@@ -0,0 +1,152 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from utils.config import (retry_max_attempts, retry_base_delay, retry_max_delay,
+                          circuit_failure_threshold, circuit_reset_timeout)
+
+# Status codes that mean the gateway/service did not handle the request
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+# Statuses where the request was certainly not processed, safe to retry even for creates
+UNPROCESSED_STATUSES = {429, 503}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a service's circuit breaker is open and calls are being shed"""
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=retry_max_attempts, base_delay=retry_base_delay,
+                 max_delay=retry_max_delay, idempotent=True):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.idempotent = idempotent
+
+    def should_retry_status(self, status_code):
+        statuses = RETRYABLE_STATUSES if self.idempotent else UNPROCESSED_STATUSES
+        return status_code in statuses
+
+    def should_retry_error(self, error):
+        # A create may have reached the service on a read timeout or a dropped connection
+        # ("Connection aborted"), so only retry errors raised before the request was sent
+        if self.idempotent:
+            return isinstance(error, (requests.ConnectionError, requests.Timeout))
+        return isinstance(error, requests.ConnectTimeout) or never_connected(error)
+
+    def backoff(self, attempt, response=None):
+        """Full-jitter exponential backoff, honouring Retry-After when the server sends it"""
+        retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+def never_connected(error):
+    """True when the connection could not be opened (name resolution or TCP connect failed),
+    so nothing was sent. requests wraps urllib3's error: ConnectionError(MaxRetryError(reason=...))"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, NewConnectionError):  # includes NameResolutionError
+            return True
+        reason = getattr(error, "reason", None)
+        if reason is None and getattr(error, "args", None) and isinstance(error.args[0], BaseException):
+            reason = error.args[0]
+        error = reason or error.__cause__
+    return False
+
+
+# Searches are idempotent and retried; creates/process calls only on unprocessed statuses
+SEARCH_POLICY = RetryPolicy(idempotent=True)
+CREATE_POLICY = RetryPolicy(max_attempts=min(2, retry_max_attempts), idempotent=False)
+
+IDEMPOTENT_MARKERS = ("_search", "-search", "/files/url")
+
+
+def policy_for(method, endpoint):
+    """Pick the retry policy for an endpoint based on its method and path"""
+    path = endpoint.split("?", 1)[0]
+    if method.upper() == "GET" or any(marker in path for marker in IDEMPOTENT_MARKERS):
+        return SEARCH_POLICY
+    return CREATE_POLICY
+
+
+def parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def service_of(endpoint):
+    """Circuit breakers are kept per service, e.g. '/boundary-service/...' -> 'boundary-service'"""
+    return endpoint.lstrip("/").split("/", 1)[0].split("?", 1)[0]
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures, sheds calls while open, lets a single probe through after a cooldown"""
+
+    def __init__(self, failure_threshold=circuit_failure_threshold, reset_timeout=circuit_reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        # When the half-open probe was admitted; a probe that never reports back (its caller raised
+        # something other than a request error) is given up on after another reset_timeout
+        self.probe_started = None
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self, service):
+        with self.lock:
+            state = self.state
+            if state == "half-open":
+                now = time.monotonic()
+                if self.probe_started is None or now - self.probe_started >= self.reset_timeout:
+                    self.probe_started = now
+                    return
+            if state != "closed":
+                raise CircuitOpenError(f"Circuit open for {service}: shedding call after {self.failures} consecutive failures")
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probe_started = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probe_started = None
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                # A failed half-open probe re-opens the circuit for another cooldown
+                self.opened_at = time.monotonic()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(service):
+    with _breakers_lock:
+        if service not in _breakers:
+            _breakers[service] = CircuitBreaker()
+        return _breakers[service]
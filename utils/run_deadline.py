@@ -0,0 +1,48 @@
+"""
+Pytest plugin: one time budget for the whole functional run.
+
+    pytest tests/ --deadline 600      # or RUN_DEADLINE=600
+
+Each test runs as a step of a utils.deadline.Deadline, so every request it makes gets at most the
+remaining budget and its pollers stop at the deadline. When the budget runs out the current test
+fails with the time spent per test, and the run stops instead of starting the remaining tests.
+"""
+import pytest
+
+from utils.config import run_deadline
+from utils.deadline import Deadline
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("deadline")
+    group.addoption("--deadline", type=float, default=run_deadline,
+                    help="Time budget in seconds for the whole run (default RUN_DEADLINE, 0 = none)")
+
+
+def pytest_configure(config):
+    if config.getoption("--deadline"):
+        config.pluginmanager.register(RunDeadline(config.getoption("--deadline")), "run-deadline")
+
+
+class RunDeadline:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.deadline = None
+        self.stopped_at = None
+
+    def pytest_sessionstart(self, session):
+        self.deadline = Deadline(self.seconds, "Run")
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        with self.deadline.step(item.name):
+            yield
+        if self.deadline.expired and self.stopped_at is None:
+            self.stopped_at = item.nodeid
+            item.session.shouldstop = f"run deadline of {self.seconds:g} s exceeded"
+
+    def pytest_terminal_summary(self, terminalreporter):
+        used = self.seconds - self.deadline.remaining()
+        state = f"exceeded at {self.stopped_at}" if self.stopped_at else f"{used:.1f} s used"
+        terminalreporter.section(f"run deadline {self.seconds:g} s ({state})")
+        terminalreporter.write_line(f"Time spent: {self.deadline.report(limit=10)}")
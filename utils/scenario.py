@@ -0,0 +1,374 @@
+"""
+Declarative workflow scenarios.
+
+A scenario is a JSON file (see scenarios/) listing steps that reference payloads/<service>/<file>.json,
+with ${var} substitutions, values extracted from responses and polling conditions. One engine runs
+it once for functional testing or many times concurrently for load (see run_scenario.py).
+
+Step fields:
+    name            step name used in reports
+    action          request (default) | upload | download | populate_template | generate_cache
+    method          HTTP method (default POST)
+    endpoint        path with ${var} substitutions
+    payload         "<service>/<file>.json" loaded via load_payload (RequestInfo is filled in)
+    body            inline JSON body instead of a payload file
+    set             {"Dotted.path": value} applied to the payload
+    expect_status   accepted status codes (default [200])
+    assert          {"present": [paths], "nonempty": [paths], "equals": {path: value}}
+    extract         {"var": "Dotted.path"}; extract_optional does not fail when missing
+    poll            {"until": {path: value}, "fail_if": {path: value}, "interval_s": 2, "max_attempts": 30}
+    skip_if_set     variable name; the step is skipped (and not recorded) when it is already set
+
+A scenario-level "deadline_s" (or ScenarioRunner(deadline_s=...)) bounds each run: every request
+gets at most the remaining budget, polls stop sleeping at the deadline, and the step that runs out
+of time fails with the time spent per step (see utils/deadline.py).
+
+generate_cache steps implement incremental generation (INCREMENTAL_GENERATE, utils/generate_cache.py):
+"mode": "lookup" sets the "var" variable to a cached fileStoreId for the hierarchy definition, so the
+generate steps can be skipped with skip_if_set; "mode": "store" remembers "var" after a real generation.
+
+Dotted paths index lists with numbers; a non-numeric key applied to a list uses its first element,
+so "ResourceDetails.id" works whether the service returns a list or a single object.
+"""
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import nullcontext
+
+import requests
+
+from utils.api_client import APIClient
+from utils.auth import get_auth_token
+from utils.config import tenantId, locale, locale_french, locale_portuguese, output_dir
+from utils.data_loader import load_payload
+from utils.deadline import Deadline, DeadlineExceeded, sleep as deadline_sleep
+from utils.filestore import ARTIFACT_CACHE, FilestoreError
+from utils.generate_cache import GENERATE_CACHE, definition_key
+from utils.metrics import MetricsRecorder, GAUGES
+from utils.request_info import get_request_info
+from utils import tracing
+from utils.template import populate_template
+
+SCENARIOS_DIR = os.path.join(os.path.dirname(__file__), "..", "scenarios")
+VAR_PATTERN = re.compile(r"\$\{([A-Za-z0-9_]+)(?:\|([a-z]+))?\}")
+FILTERS = {"lower": str.lower, "upper": str.upper}
+
+# Per-step latency across every scenario run in this process
+STEP_RECORDER = MetricsRecorder()
+
+
+class ScenarioError(Exception):
+    """A scenario step failed (unexpected status, assertion, missing value or poll failure)"""
+
+
+def load_scenario(name_or_path):
+    path = name_or_path
+    if not os.path.exists(path):
+        path = os.path.join(SCENARIOS_DIR, f"{name_or_path}.json")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def builtin_variables():
+    return {
+        "tenantId": tenantId,
+        "locale": locale,
+        "locale_french": locale_french,
+        "locale_portuguese": locale_portuguese,
+        "output_dir": output_dir,
+    }
+
+
+def substitute(value, ctx):
+    """Resolve ${var} and ${var|filter} in strings, recursively through lists and dicts"""
+    if isinstance(value, dict):
+        return {k: substitute(v, ctx) for k, v in value.items()}
+    if isinstance(value, list):
+        return [substitute(v, ctx) for v in value]
+    if not isinstance(value, str) or "${" not in value:
+        return value
+
+    def lookup(match):
+        name, flt = match.group(1), match.group(2)
+        if name == "uuid8":
+            resolved = uuid.uuid4().hex[:8].upper()
+        elif name in ctx:
+            resolved = ctx[name]
+        else:
+            raise ScenarioError(f"Undefined variable: {name}")
+        return FILTERS[flt](str(resolved)) if flt else resolved
+
+    whole = VAR_PATTERN.fullmatch(value)
+    if whole:
+        return lookup(whole)  # keep non-string values (lists, numbers) intact
+    return VAR_PATTERN.sub(lambda m: str(lookup(m)), value)
+
+
+_MISSING = object()
+
+
+def get_path(data, path):
+    current = data
+    for part in path.split("."):
+        if isinstance(current, list):
+            if part.isdigit():
+                index = int(part)
+                current = current[index] if index < len(current) else _MISSING
+            else:
+                current = current[0].get(part, _MISSING) if current and isinstance(current[0], dict) else _MISSING
+        elif isinstance(current, dict):
+            current = current.get(part, _MISSING)
+        else:
+            current = _MISSING
+        if current is _MISSING:
+            return _MISSING
+    return current
+
+
+def set_path(data, path, value):
+    parts = path.split(".")
+    current = data
+    for part in parts[:-1]:
+        current = current[int(part)] if isinstance(current, list) else current.setdefault(part, {})
+    if isinstance(current, list):
+        current[int(parts[-1])] = value
+    else:
+        current[parts[-1]] = value
+
+
+class TokenProvider:
+    """One auth token shared by every step and virtual user; re-authenticates only when asked"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.token = None
+
+    def get(self):
+        with self.lock:
+            if self.token is None:
+                self.token = get_auth_token("user")
+            return self.token
+
+    def invalidate(self, token):
+        with self.lock:
+            if self.token == token:
+                self.token = None
+
+
+class StepResult:
+    def __init__(self, name, ok, duration, error=None):
+        self.name = name
+        self.ok = ok
+        self.duration = duration
+        self.error = error
+
+
+class ScenarioResult:
+    def __init__(self, scenario_name):
+        self.scenario = scenario_name
+        self.steps = []
+        self.variables = {}
+
+    @property
+    def ok(self):
+        return all(step.ok for step in self.steps)
+
+    @property
+    def duration(self):
+        return sum(step.duration for step in self.steps)
+
+
+class ScenarioRunner:
+    def __init__(self, scenario, tokens=None, deadline_s=None):
+        self.scenario = scenario
+        self.tokens = tokens or TokenProvider()
+        self.deadline_s = deadline_s or scenario.get("deadline_s")
+        self.clients = threading.local()
+
+    def _client(self):
+        token = self.tokens.get()
+        client = getattr(self.clients, "client", None)
+        if client is None or self.clients.token != token:
+            self.clients.client = client = APIClient(token=token)
+            self.clients.token = token
+        return token, client
+
+    def run(self, variables=None, stop_on_failure=True):
+        """Run every step once with a fresh variable context"""
+        ctx = builtin_variables()
+        for name, value in self.scenario.get("variables", {}).items():
+            ctx[name] = substitute(value, ctx)
+        ctx.update(variables or {})
+
+        result = ScenarioResult(self.scenario.get("name", "scenario"))
+        deadline = Deadline(self.deadline_s, result.scenario) if self.deadline_s else None
+        # One trace per run: scenario -> step -> HTTP call spans
+        with tracing.span(f"scenario {result.scenario}") as run_span:
+            for step in self.scenario["steps"]:
+                name = step.get("name", step.get("endpoint", "step"))
+                if step.get("skip_if_set") in ctx:
+                    continue
+                start = time.perf_counter()
+                try:
+                    with tracing.span(name), deadline.step(name) if deadline else nullcontext():
+                        if deadline:
+                            deadline.check(name)
+                        self.run_step(step, ctx)
+                    outcome = StepResult(name, True, time.perf_counter() - start)
+                except Exception as e:
+                    # Any step error (an open circuit breaker, a key missing from a response, ...) fails the
+                    # step and is recorded; letting it escape would end the whole load run or soak iteration
+                    error = str(e) if isinstance(e, (ScenarioError, DeadlineExceeded)) else f"{type(e).__name__}: {e}"
+                    outcome = StepResult(name, False, time.perf_counter() - start, error)
+                STEP_RECORDER.record(name, outcome.duration, outcome.ok)
+                result.steps.append(outcome)
+                if not outcome.ok and stop_on_failure:
+                    break
+            run_span.tag("passed", result.ok)
+            ctx["traceId"] = run_span.trace_id
+        result.variables = ctx
+        return result
+
+    def run_step(self, step, ctx):
+        action = step.get("action", "request")
+        if action == "request":
+            self._request_step(step, ctx)
+        elif action == "upload":
+            self._upload_step(step, ctx)
+        elif action == "download":
+            self._download_step(step, ctx)
+        elif action == "populate_template":
+            rows = populate_template(substitute(step["template"], ctx), substitute(step["output"], ctx))
+            ctx[step.get("rows_var", "populatedRows")] = rows
+        elif action == "generate_cache":
+            self._generate_cache_step(step, ctx)
+        else:
+            raise ScenarioError(f"Unknown action: {action}")
+
+    def _build_body(self, step, ctx, token):
+        if "payload" in step:
+            service, filename = step["payload"].split("/", 1)
+            body = load_payload(service, filename)
+        else:
+            body = substitute(step.get("body", {}), ctx)
+        if "RequestInfo" in body:
+            body["RequestInfo"] = get_request_info(token)
+        for path, value in step.get("set", {}).items():
+            set_path(body, path, substitute(value, ctx))
+        return body
+
+    def _send(self, step, ctx):
+        token, client = self._client()
+        method = step.get("method", "POST").upper()
+        endpoint = substitute(step["endpoint"], ctx)
+        body = self._build_body(step, ctx, token) if method in ("POST", "PUT") else None
+        response = client.request(method, endpoint, json=body) if body is not None else client.request(method, endpoint)
+        if response.status_code == 401:
+            # Token expired mid-run: refresh once and retry
+            self.tokens.invalidate(token)
+            token, client = self._client()
+            if body is not None and "RequestInfo" in body:
+                body["RequestInfo"] = get_request_info(token)
+            response = client.request(method, endpoint, json=body) if body is not None else client.request(method, endpoint)
+        return response
+
+    def _check(self, step, response, ctx):
+        expected = step.get("expect_status", [200])
+        if response.status_code not in expected:
+            raise ScenarioError(f"{step.get('name')}: status {response.status_code} not in {expected}: {response.text[:500]}")
+        data = response.json() if response.content else {}
+
+        checks = step.get("assert", {})
+        for path in checks.get("present", []):
+            if get_path(data, path) is _MISSING:
+                raise ScenarioError(f"{step.get('name')}: '{path}' missing from response")
+        for path in checks.get("nonempty", []):
+            if not get_path(data, path) or get_path(data, path) is _MISSING:
+                raise ScenarioError(f"{step.get('name')}: '{path}' is empty")
+        for path, value in checks.get("equals", {}).items():
+            expected_value = substitute(value, ctx)
+            actual = get_path(data, path)
+            if actual != expected_value:
+                raise ScenarioError(f"{step.get('name')}: '{path}' is {actual!r}, expected {expected_value!r}")
+        return data
+
+    def _extract(self, step, data, ctx):
+        for var, path in step.get("extract", {}).items():
+            value = get_path(data, path)
+            if value is _MISSING or value is None:
+                raise ScenarioError(f"{step.get('name')}: could not extract '{path}' into {var}")
+            ctx[var] = value
+        for var, path in step.get("extract_optional", {}).items():
+            value = get_path(data, path)
+            if value is not _MISSING and value is not None:
+                ctx[var] = value
+
+    def _request_step(self, step, ctx):
+        poll = step.get("poll")
+        if not poll:
+            data = self._check(step, self._send(step, ctx), ctx)
+            self._extract(step, data, ctx)
+            return
+
+        max_attempts = poll.get("max_attempts", 30)
+        interval = poll.get("interval_s", 2)
+        # polls_waiting: async jobs (generate/process) currently being polled by any virtual user
+        with GAUGES.track("polls_waiting"):
+            for attempt in range(max_attempts):
+                data = self._check(step, self._send(step, ctx), ctx)
+                for path, value in poll.get("fail_if", {}).items():
+                    if get_path(data, path) == substitute(value, ctx):
+                        raise ScenarioError(f"{step.get('name')}: '{path}' reached {value!r}")
+                if all(get_path(data, path) == substitute(value, ctx) for path, value in poll.get("until", {}).items()):
+                    self._extract(step, data, ctx)
+                    return
+                if attempt < max_attempts - 1:
+                    deadline_sleep(interval)
+        raise ScenarioError(f"{step.get('name')}: condition not met within {max_attempts * interval} seconds")
+
+    def _upload_step(self, step, ctx):
+        _, client = self._client()
+        path = substitute(step["file"], ctx)
+        with open(path, "rb") as f:
+            content = f.read()
+        mime = step.get("content_type", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        files = {"file": (os.path.basename(path), content, mime)}
+        response = client.upload(substitute(step["endpoint"], ctx), files, substitute(step.get("form", {}), ctx))
+        step = dict(step, expect_status=step.get("expect_status", [200, 201]))
+        data = self._check(step, response, ctx)
+        self._extract(step, data, ctx)
+
+    def _download_step(self, step, ctx):
+        _, client = self._client()
+        file_store_id = substitute(step["fileStoreId"], ctx)
+        try:
+            ARTIFACT_CACHE.fetch(client, file_store_id, substitute(step["to"], ctx), tenant=ctx["tenantId"])
+        except FilestoreError as e:
+            raise ScenarioError(f"{step.get('name')}: {e}")
+
+    def _generate_cache_step(self, step, ctx):
+        if not GENERATE_CACHE.enabled:
+            return
+        hierarchy_type = substitute(step["hierarchyType"], ctx)
+        if step.get("mode", "lookup") == "store":
+            if "_generateCacheKey" in ctx:
+                GENERATE_CACHE.store(ctx.pop("_generateCacheKey"), substitute(step["fileStoreId"], ctx), hierarchy_type)
+            return
+        token, client = self._client()
+        key = definition_key(client, token, hierarchy_type, tenant=ctx["tenantId"], request_locale=ctx["locale"])
+        cached = GENERATE_CACHE.lookup(client, key, tenant=ctx["tenantId"])
+        if cached:
+            ctx[step["var"]] = cached["fileStoreId"]
+        else:
+            ctx["_generateCacheKey"] = key
+
+
+def write_ids(scenario, ctx, path):
+    """Write extracted values in the output/ids.txt format the pytest suite reads"""
+    with open(path, "w") as f:
+        for label, var in scenario.get("ids", {}).items():
+            if var in ctx:
+                f.write(f"{label}: {ctx[var]}\n")
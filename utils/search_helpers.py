@@ -1,7 +1,8 @@
 from utils.api_client import APIClient
 from utils.data_loader import load_payload
 from utils.request_info import get_request_info
-from utils.config import search_params
+from utils.config import search_params, ids_file, search_batch_size, search_concurrency
+from concurrent.futures import ThreadPoolExecutor
 
 def search_entity(entity_type, token, client, entity_id, payload_file, endpoint, response_key):
     payload = load_payload(entity_type, payload_file)
@@ -21,8 +22,47 @@ def search_entity(entity_type, token, client, entity_id, payload_file, endpoint,
     return response_data.get(response_key, [])
 
 
+def search_entities(entity_type, token, client, entity_ids, payload_file, endpoint, response_key,
+                    batch_size=search_batch_size, max_workers=search_concurrency):
+    """
+    Batched variant of search_entity: looks up any number of IDs in chunks of `batch_size`
+    (the API's page limit) with chunks sent concurrently.
+
+    Returns:
+        tuple: (dict of id -> entity for every ID found, list of IDs not found)
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    entity_ids = list(dict.fromkeys(entity_ids))  # drop duplicates, keep order
+    payload = load_payload(entity_type, payload_file)
+    # The criteria block is the first top-level key other than RequestInfo
+    top_key = next(key for key in payload if key != "RequestInfo")
+    payload["RequestInfo"] = get_request_info(token)
+
+    # A chunk never asks for more IDs than one page can return
+    params = dict(search_params, limit=batch_size, offset=0)
+    query_string = "&".join(f"{k}={v}" for k, v in params.items())
+    url = f"{endpoint}?{query_string}"
+
+    def search_chunk(chunk):
+        chunk_payload = dict(payload)
+        chunk_payload[top_key] = dict(payload[top_key], id=chunk)
+        res = client.post(url, chunk_payload)
+        assert res.status_code == 200, f"Batched search failed: {res.text}"
+        return res.json().get(response_key, [])
+
+    chunks = [entity_ids[i:i + batch_size] for i in range(0, len(entity_ids), batch_size)]
+    found = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for entities in pool.map(search_chunk, chunks):
+            for entity in entities:
+                found[entity.get("id")] = entity
+
+    missing = [entity_id for entity_id in entity_ids if entity_id not in found]
+    return found, missing
+
 
 def extract_id_from_file(label):
-    with open("output/ids.txt", "r") as f:
+    with open(ids_file, "r") as f:
         lines = f.readlines()
     return next((line.split(":", 1)[1].strip() for line in lines if line.startswith(label)), None)
@@ -0,0 +1,144 @@
+"""
+Pytest plugin: latency budgets (SLOs) enforced on the functional suite.
+
+Budgets come from the `slo` marker on a test:
+
+    @pytest.mark.slo(duration_s=60)                                  # whole test (e.g. a polled job)
+    @pytest.mark.slo("/boundary-service/boundary-hierarchy-definition/_search", p95_ms=300)
+
+or from data/slo.json ("tests" keyed by test function name, "endpoints" keyed by endpoint,
+checked over the whole run). An endpoint is either a path prefix or "METHOD /path".
+Supported budgets: duration_s (tests only), p50_ms, p95_ms, p99_ms, max_ms, error_rate.
+
+    pytest tests/ --slo=fail    # exceeded budgets fail the test (default: warn)
+"""
+import json
+import os
+import time
+
+import pytest
+
+from utils.metrics import RECORDER
+
+SLO_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "slo.json")
+PERCENTILES = {"p50_ms": 50, "p95_ms": 95, "p99_ms": 99}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("slo")
+    group.addoption("--slo", choices=["off", "warn", "fail"], default="warn",
+                    help="Latency budget enforcement: off, warn (report only) or fail")
+    group.addoption("--slo-file", default=SLO_FILE, help="JSON file with test and endpoint budgets")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slo(endpoint=None, **budgets): latency budget for a test or endpoint")
+    if config.getoption("--slo") != "off":
+        config.pluginmanager.register(SLOEnforcer(config), "slo-enforcer")
+
+
+def load_budgets(path):
+    if not os.path.exists(path):
+        return {"tests": {}, "endpoints": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {"tests": data.get("tests", {}), "endpoints": data.get("endpoints", {})}
+
+
+def matches(endpoint, key):
+    """`endpoint` is a path prefix or 'METHOD /path' prefix; `key` is a metrics key 'METHOD /path'"""
+    if " " in endpoint:
+        return key.startswith(endpoint)
+    return key.split(" ", 1)[1].startswith(endpoint)
+
+
+def measure(stats, budget_name):
+    h = stats.latency
+    if budget_name in PERCENTILES:
+        return h.percentile(PERCENTILES[budget_name]) * 1000
+    if budget_name == "max_ms":
+        return h.max * 1000
+    if budget_name == "error_rate":
+        return stats.errors / h.count if h.count else 0.0
+    raise ValueError(f"Unknown SLO budget: {budget_name}")
+
+
+def check_endpoint(endpoint, budgets, endpoint_stats):
+    """Evaluate budgets against every recorded endpoint matching `endpoint`"""
+    results = []
+    for key, stats in sorted(endpoint_stats.items()):
+        if not matches(endpoint, key) or not stats.latency.count:
+            continue
+        for name, limit in budgets.items():
+            actual = measure(stats, name)
+            results.append((key, name, limit, actual))
+    return results
+
+
+def format_result(subject, name, limit, actual):
+    margin = limit - actual
+    unit = "" if name == "error_rate" else (" s" if name == "duration_s" else " ms")
+    status = "OK  " if margin >= 0 else "MISS"
+    return f"{status} {subject} {name}: {actual:.3f}{unit} (budget {limit}{unit}, margin {margin:+.3f}{unit})"
+
+
+class SLOEnforcer:
+    def __init__(self, config):
+        self.mode = config.getoption("--slo")
+        self.budgets = load_budgets(config.getoption("--slo-file"))
+        self.lines = []
+        self.misses = 0
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        before = RECORDER.snapshot()
+        start = time.perf_counter()
+        yield
+        item._slo_results = self._evaluate(item, time.perf_counter() - start, RECORDER.delta(before))
+
+    def _evaluate(self, item, duration, endpoint_stats):
+        results = []
+        declared = [dict(self.budgets["tests"].get(item.originalname or item.name, {}))]
+        for marker in item.iter_markers("slo"):
+            budgets = dict(marker.kwargs)
+            endpoint = marker.args[0] if marker.args else budgets.pop("endpoint", None)
+            if endpoint:
+                results.extend(check_endpoint(endpoint, budgets, endpoint_stats))
+            else:
+                declared.append(budgets)
+        for budgets in declared:
+            if "duration_s" in budgets:
+                results.append((item.name, "duration_s", budgets["duration_s"], duration))
+        return results
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        report = outcome.get_result()
+        results = getattr(item, "_slo_results", None)
+        if call.when != "call" or not results:
+            return
+
+        misses = [r for r in results if r[3] > r[2]]
+        for r in results:
+            self.lines.append(format_result(*r))
+        self.misses += len(misses)
+        if misses and self.mode == "fail" and report.passed:
+            report.outcome = "failed"
+            report.longrepr = "Latency budget exceeded:\n" + "\n".join(format_result(*r) for r in misses)
+
+    def pytest_sessionfinish(self, session):
+        for endpoint, budgets in self.budgets["endpoints"].items():
+            for r in check_endpoint(endpoint, budgets, RECORDER.snapshot()):
+                self.lines.append(format_result(*r) + " [run]")
+                if r[3] > r[2]:
+                    self.misses += 1
+                    if self.mode == "fail":
+                        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.lines:
+            return
+        terminalreporter.section(f"latency budgets ({self.misses} exceeded)")
+        for line in self.lines:
+            terminalreporter.write_line(line)
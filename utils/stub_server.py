@@ -0,0 +1,231 @@
+"""
+In-memory stand-in for the services the boundary workflow calls, for measuring client-side costs.
+
+    python -m utils.stub_server --port 8099
+    PROFILE=local-stub python3 benchmark_scaling.py --stub    # starts it on the profile's port
+
+It implements just enough of each API for the workflow to complete with real payload sizes:
+auth, hierarchy create/search, localization upsert/search (limit/offset paging), generate (an
+xlsx template with one column per level), filestore upload/URL/download, process (the uploaded
+sheet becomes boundaries and en_MZ messages) and relationship search (the full tree). Work is
+done synchronously, so the first poll of generate-search or process-search sees "completed".
+It does not validate payloads and does not import utils.config.
+"""
+import argparse
+import gzip
+import io
+import itertools
+import json
+import os
+import re
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from openpyxl import Workbook
+
+from utils.xlsx_reader import XlsxReader
+
+BOUNDARY_SHEET = "Boundary Data"
+EXTRA_HEADERS = ["Service Boundary Code", "Latitude", "Longitude"]
+
+
+class StubState:
+    def __init__(self, locale="en_MZ"):
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.locale = locale
+        self.hierarchies = {}   # hierarchyType -> [boundaryType], root first
+        self.messages = {}      # (module, locale) -> {code: message}
+        self.files = {}         # fileStoreId -> bytes
+        self.generated = {}     # hierarchyType -> fileStoreId
+        self.processed = {}     # process id -> resource
+        self.trees = {}         # hierarchyType -> serialized TenantBoundary response
+
+    def new_id(self, prefix):
+        return f"{prefix}-{next(self.ids)}"
+
+    def template(self, hierarchy_type):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(BOUNDARY_SHEET)
+        ws.append([f"{hierarchy_type}_{level}" for level in self.hierarchies.get(hierarchy_type, [])] + EXTRA_HEADERS)
+        buffer = io.BytesIO()
+        wb.save(buffer)
+        return buffer.getvalue()
+
+    def process(self, hierarchy_type, file_store_id):
+        """Boundaries from the uploaded sheet: one per row, its path given by the level columns"""
+        levels = self.hierarchies.get(hierarchy_type, [])
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        with os.fdopen(fd, "wb") as f:
+            f.write(self.files[file_store_id])
+        codes = {}      # path tuple -> code
+        nodes = {}      # code -> node
+        roots = []
+        messages = {}
+        try:
+            with XlsxReader(path) as reader:
+                rows = reader.iter_rows(BOUNDARY_SHEET if BOUNDARY_SHEET in reader.sheetnames else None)
+                next(rows, None)
+                for row in rows:
+                    names = [str(v) for v in row[:len(levels)] if v not in (None, "")]
+                    if not names:
+                        continue
+                    key = tuple(names)
+                    if key in codes:
+                        continue
+                    code = f"{hierarchy_type}_{len(codes) + 1}"
+                    codes[key] = code
+                    node = nodes[code] = {"id": code.lower(), "code": code, "boundaryType": levels[len(names) - 1],
+                                          "children": []}
+                    parent = codes.get(key[:-1])
+                    (nodes[parent]["children"] if parent else roots).append(node)
+                    messages[code] = names[-1]
+        finally:
+            os.remove(path)
+        tree = {"TenantBoundary": [{"tenantId": "mz", "hierarchyType": hierarchy_type, "boundary": roots}]}
+        with self.lock:
+            self.trees[hierarchy_type] = json.dumps(tree).encode("utf-8")
+            self.messages.setdefault((f"hcm-boundary-{hierarchy_type.lower()}", self.locale), {}).update(messages)
+        return len(codes)
+
+
+def _multipart_file(body, content_type):
+    """Content of the first file part of a multipart/form-data body"""
+    boundary = re.search(r'boundary="?([^";]+)"?', content_type).group(1).encode()
+    for part in body.split(b"--" + boundary):
+        head, _, content = part.partition(b"\r\n\r\n")
+        if b"filename=" in head:
+            return content[:-2] if content.endswith(b"\r\n") else content
+    return b""
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, content_type="application/json"):
+            if not isinstance(body, bytes):
+                body = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path == "/filestore/v1/files/url":
+                host = f"http://{self.headers.get('Host')}"
+                ids = [i for i in query.get("fileStoreIds", "").split(",") if i in state.files]
+                return self._send(200, {"fileStoreIds": [{"id": i, "url": f"{host}/download/{i}"} for i in ids]})
+            if url.path.startswith("/download/"):
+                content = state.files.get(url.path.rsplit("/", 1)[1])
+                if content is None:
+                    return self._send(404, {})
+                return self._send(200, content, "application/octet-stream")
+            self._send(404, {"Errors": [{"message": f"Not stubbed: GET {url.path}"}]})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            content_type = self.headers.get("Content-Type", "")
+            if self.headers.get("Content-Encoding") == "gzip":
+                raw = gzip.decompress(raw)
+            body = json.loads(raw) if raw and "json" in content_type else {}
+            path = url.path
+
+            if path == "/user/oauth/token":
+                return self._send(200, {"access_token": "stub-token"})
+            if path.endswith("/boundary-hierarchy-definition/_create"):
+                hierarchy = body["BoundaryHierarchy"]
+                levels = [level["boundaryType"] for level in hierarchy.get("boundaryHierarchy", [])]
+                with state.lock:
+                    state.hierarchies[hierarchy["hierarchyType"]] = levels
+                return self._send(202, {"BoundaryHierarchy": [hierarchy]})
+            if path.endswith("/boundary-hierarchy-definition/_search"):
+                hierarchy_type = body.get("BoundaryTypeHierarchySearchCriteria", {}).get("hierarchyType")
+                levels = state.hierarchies.get(hierarchy_type)
+                found = [] if levels is None else [{"hierarchyType": hierarchy_type, "boundaryHierarchy": [
+                    {"boundaryType": t, "parentBoundaryType": levels[i - 1] if i else None}
+                    for i, t in enumerate(levels)]}]
+                return self._send(200, {"BoundaryHierarchy": found})
+            if path == "/localization/messages/v1/_upsert":
+                with state.lock:
+                    for m in body.get("messages", []):
+                        state.messages.setdefault((m["module"], m["locale"]), {})[m["code"]] = m["message"]
+                return self._send(200, {"messages": body.get("messages", [])})
+            if path == "/localization/messages/v1/_search":
+                module, locale = query.get("module"), query.get("locale")
+                with state.lock:
+                    codes = list(state.messages.get((module, locale), {}).items())
+                if "limit" in query:
+                    offset = int(query.get("offset", 0))
+                    codes = codes[offset:offset + int(query["limit"])]
+                return self._send(200, {"messages": [{"code": c, "message": m, "module": module, "locale": locale}
+                                                     for c, m in codes]})
+            if path == "/boundary-management/v1/_generate":
+                hierarchy_type = query["hierarchyType"]
+                file_store_id = state.new_id("template")
+                with state.lock:
+                    state.files[file_store_id] = state.template(hierarchy_type)
+                    state.generated[hierarchy_type] = file_store_id
+                return self._send(200, {"ResourceDetails": {"id": state.new_id("generate"),
+                                                            "hierarchyType": hierarchy_type}})
+            if path == "/boundary-management/v1/_generate-search":
+                file_store_id = state.generated.get(query.get("hierarchyType"))
+                found = [{"status": "completed", "fileStoreid": file_store_id}] if file_store_id else []
+                return self._send(200, {"GeneratedResource": found})
+            if path == "/filestore/v1/files":
+                file_store_id = state.new_id("upload")
+                with state.lock:
+                    state.files[file_store_id] = _multipart_file(raw, content_type)
+                return self._send(201, {"files": [{"fileStoreId": file_store_id, "tenantId": "mz"}]})
+            if path == "/boundary-management/v1/_process":
+                details = body["ResourceDetails"]
+                resource = {"id": state.new_id("process"), "status": "completed",
+                            "hierarchyType": details["hierarchyType"],
+                            "processedFilestoreId": details["fileStoreId"],
+                            "boundaries": state.process(details["hierarchyType"], details["fileStoreId"])}
+                with state.lock:
+                    state.processed[resource["id"]] = resource
+                return self._send(200, {"ResourceDetails": resource})
+            if path == "/boundary-management/v1/_process-search":
+                ids = body.get("SearchCriteria", {}).get("id", [])
+                return self._send(200, {"ResourceDetails": [state.processed[i] for i in ids if i in state.processed]})
+            if path == "/boundary-service/boundary-relationships/_search":
+                tree = state.trees.get(query.get("hierarchyType"))
+                return self._send(200, tree if tree is not None else {"TenantBoundary": []})
+            self._send(404, {"Errors": [{"message": f"Not stubbed: POST {path}"}]})
+
+    return Handler
+
+
+def serve(port=8099, host="127.0.0.1"):
+    server = ThreadingHTTPServer((host, port), make_handler(StubState()))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-memory stub of the boundary workflow services")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--host", default="127.0.0.1")
+    args = parser.parse_args()
+    server = serve(args.port, args.host)
+    print(f"Stub services on http://{args.host}:{server.server_port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
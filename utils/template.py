@@ -0,0 +1,34 @@
+from openpyxl import load_workbook
+
+SAMPLE_FILE = "utils/sample_boundary.xlsx"
+BOUNDARY_SHEET = "Boundary Data"
+
+
+def populate_template(template_path, output_path, sample_path=SAMPLE_FILE):
+    """
+    Copy the data rows (row 2 onwards) of the reference sample into a downloaded template,
+    keeping the template's own headers, and save the result for upload.
+
+    Returns:
+        int: Number of data rows copied.
+    """
+    template_wb = load_workbook(template_path)
+    sample_wb = load_workbook(sample_path, data_only=True, read_only=True)
+
+    template_ws = template_wb[BOUNDARY_SHEET]
+    sample_ws = sample_wb[BOUNDARY_SHEET]
+
+    data_rows = []
+    for row in sample_ws.iter_rows(min_row=2, values_only=True):
+        if any(cell for cell in row):
+            data_rows.append(row)
+    sample_wb.close()
+
+    # Row 1 headers of the template are preserved
+    for row_idx, row_data in enumerate(data_rows, start=2):
+        for col_idx, value in enumerate(row_data, start=1):
+            template_ws.cell(row=row_idx, column=col_idx, value=value)
+
+    template_wb.save(output_path)
+    template_wb.close()
+    return len(data_rows)
@@ -0,0 +1,42 @@
+"""
+Pytest plugin: the functional run as one trace.
+
+A root span covers the session and every test gets a child span, so the HTTP call spans made by
+APIClient nest under the test that made them. The trace ID is printed at the end of the run; it is
+also sent as X-Correlation-Id, so server logs for the whole run can be found with it. Spans are
+written only with TRACING=true (see utils/tracing.py).
+"""
+from contextlib import ExitStack
+
+import pytest
+
+from utils import tracing
+
+
+class RunTracer:
+    def __init__(self):
+        self.stack = ExitStack()
+        self.root = None
+
+    def pytest_sessionstart(self, session):
+        self.root = self.stack.enter_context(tracing.span("pytest session"))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        with tracing.span(item.name, **{"test.nodeid": item.nodeid}) as span:
+            outcome = yield
+            if outcome.excinfo is not None:
+                span.tag("error", f"{outcome.excinfo[0].__name__}: {str(outcome.excinfo[1])[:200]}")
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        self.root.tag("exitstatus", int(exitstatus))
+        self.stack.close()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        where = (f"spans in {tracing.WRITER.directory}/{tracing.WRITER.prefix}*.json" if tracing.WRITER.enabled
+                 else "set TRACING=true to write spans")
+        terminalreporter.write_line(f"Trace {self.root.trace_id} ({where})")
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(RunTracer(), "test-tracer")
@@ -0,0 +1,153 @@
+"""
+Client-side tracing: trace/span IDs on every request and spans written as Zipkin v2 JSON.
+
+Every HTTP call made through APIClient runs in a CLIENT span. Its IDs are sent in the
+traceparent (W3C), b3 and X-Correlation-Id headers and in RequestInfo.msgId, which becomes
+"<ms timestamp>|<locale>|<traceId>-<spanId>" (services still read the locale from the second
+field). Server logs can then be joined to the client span that caused them.
+
+Workflow steps (scenario steps, pytest tests) open spans of their own, so each trace is a tree:
+run -> step -> HTTP call. IDs are always generated; spans are only recorded when TRACING=true,
+into output/traces/trace_<timestamp>_<pid>[_<part>].json - a JSON array of Zipkin v2 spans that can be
+POSTed to a Zipkin /api/v2/spans endpoint or opened in Jaeger/Zipkin UIs.
+"""
+import atexit
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.config import tracing, trace_dir, trace_flush_spans
+
+SERVICE_NAME = "boundary-api-tests"
+
+_local = threading.local()
+_random = random.SystemRandom()
+
+
+def new_id(bits=64):
+    return f"{_random.getrandbits(bits):0{bits // 4}x}"
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind", "remote_service", "tags", "start", "_t0", "duration")
+
+    def __init__(self, name, parent=None, kind=None, remote_service=None, tags=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else new_id(128)
+        self.span_id = new_id()
+        self.parent_id = parent.span_id if parent else None
+        self.kind = kind
+        self.remote_service = remote_service
+        self.tags = tags or {}
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.duration = None
+
+    def tag(self, key, value):
+        self.tags[key] = str(value)
+
+    def headers(self):
+        """Propagation headers for a request made in this span"""
+        b3 = f"{self.trace_id}-{self.span_id}-1" + (f"-{self.parent_id}" if self.parent_id else "")
+        return {
+            "traceparent": f"00-{self.trace_id}-{self.span_id}-01",
+            "b3": b3,
+            "X-Correlation-Id": self.trace_id,
+        }
+
+    def to_zipkin(self):
+        span = {
+            "traceId": self.trace_id,
+            "id": self.span_id,
+            "name": self.name,
+            "timestamp": int(self.start * 1_000_000),
+            "duration": max(1, int((self.duration or 0) * 1_000_000)),
+            "localEndpoint": {"serviceName": SERVICE_NAME},
+        }
+        if self.parent_id:
+            span["parentId"] = self.parent_id
+        if self.kind:
+            span["kind"] = self.kind
+        if self.remote_service:
+            span["remoteEndpoint"] = {"serviceName": self.remote_service}
+        if self.tags:
+            span["tags"] = {k: str(v) for k, v in self.tags.items()}
+        return span
+
+
+class TraceWriter:
+    """Buffers finished spans; every `flush_spans` spans (and at exit) they are written as one file"""
+
+    def __init__(self, directory, flush_spans, enabled=True):
+        self.directory = directory
+        self.flush_spans = flush_spans
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.spans = []
+        self.parts = 0
+        # Processes started in the same second (distributed workers, pytest-xdist) must not overwrite each other
+        self.prefix = time.strftime("trace_%Y%m%d_%H%M%S") + f"_{os.getpid()}"
+        if enabled:
+            atexit.register(self.flush)
+
+    def record(self, span):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.spans.append(span.to_zipkin())
+            if len(self.spans) < self.flush_spans:
+                return
+            spans, self.spans = self.spans, []
+        self._write(spans)
+
+    def flush(self):
+        with self.lock:
+            spans, self.spans = self.spans, []
+        if spans:
+            self._write(spans)
+
+    def _write(self, spans):
+        with self.lock:
+            self.parts += 1
+            part = self.parts
+        os.makedirs(self.directory, exist_ok=True)
+        name = self.prefix + (f"_{part}" if part > 1 else "") + ".json"
+        with open(os.path.join(self.directory, name), "w", encoding="utf-8") as f:
+            json.dump(spans, f)
+
+
+WRITER = TraceWriter(trace_dir, trace_flush_spans, enabled=tracing)
+
+
+def current_span():
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def span(name, kind=None, remote_service=None, **tags):
+    """Open a child of the current span on this thread (or a new trace) for the duration of the block"""
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    current = Span(name, stack[-1] if stack else None, kind, remote_service, tags)
+    stack.append(current)
+    try:
+        yield current
+    except Exception as e:
+        current.tag("error", f"{type(e).__name__}: {str(e)[:200]}")
+        raise
+    finally:
+        current.duration = time.perf_counter() - current._t0
+        stack.pop()
+        WRITER.record(current)
+
+
+def msg_id(locale, active=None):
+    """RequestInfo.msgId carrying the span's IDs; the locale stays in the second field"""
+    active = active or current_span()
+    ids = f"{active.trace_id}-{active.span_id}" if active else f"{new_id(128)}-{new_id()}"
+    return f"{int(time.time() * 1000)}|{locale}|{ids}"
@@ -0,0 +1,257 @@
+"""
+Fast read-only xlsx row source.
+
+An xlsx file is a zip of XML parts. XlsxReader opens the zip once, loads the shared-strings
+table once, and stream-parses a worksheet's XML with iterparse, yielding plain tuples of cell
+values - the same rows as openpyxl's `iter_rows(values_only=True)` in read-only mode, without
+building cell objects or reading styles. Number cells come back as int/float; date-formatted
+cells are returned as their serial number, since styles are never read.
+
+Memory does not grow with the number of rows: parsed rows are dropped as they are yielded. It does
+grow with the shared-strings table (every distinct string in the workbook), which is held for the
+reader's lifetime and copied into each worker process.
+
+For large sheets, `workers=N` splits the sheet's <row> elements into N byte ranges and parses
+them in a process pool; rows are still yielded in order.
+"""
+import re
+import zipfile
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree.ElementTree import iterparse, fromstring
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+ROW = MAIN_NS + "row"
+CELL = MAIN_NS + "c"
+VALUE = MAIN_NS + "v"
+TEXT = MAIN_NS + "t"
+INLINE = MAIN_NS + "is"
+SHARED_ITEM = MAIN_NS + "si"
+PHONETIC = MAIN_NS + "rPh"
+
+# Sheets smaller than this are parsed serially even when workers are requested
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+_ROW_START = re.compile(rb"<(?:\w+:)?row[\s>]")
+_COORD = re.compile(r"([A-Z]+)(\d+)")
+
+
+def column_index(letters):
+    """'A' -> 0, 'L' -> 11, 'AB' -> 27"""
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - 64
+    return index - 1
+
+
+def _number(text):
+    """Same rule as openpyxl: integers stay int, anything with a fraction or exponent is float"""
+    if "." in text or "E" in text or "e" in text:
+        return float(text)
+    return int(text)
+
+
+def _text(element):
+    """Concatenate <t> runs of a shared or inline string, skipping phonetic hints"""
+    parts = []
+    for child in element:
+        if child.tag == TEXT:
+            parts.append(child.text or "")
+        elif child.tag != PHONETIC:
+            parts.extend(t.text or "" for t in child.iter(TEXT))
+    return "".join(parts)
+
+
+def _parse_row(row, shared_strings):
+    """Return (row number or None, {column index: value}) for a <row> element"""
+    cells = {}
+    next_col = 0
+    for c in row.iter(CELL):
+        ref = c.get("r")
+        if ref:
+            col = column_index(_COORD.match(ref).group(1))
+        else:
+            col = next_col
+        next_col = col + 1
+
+        kind = c.get("t", "n")
+        if kind == "inlineStr":
+            inline = c.find(INLINE)
+            value = _text(inline) if inline is not None else None
+        else:
+            v = c.find(VALUE)
+            if v is None or v.text is None:
+                continue
+            text = v.text
+            if kind == "s":
+                value = shared_strings[int(text)]
+            elif kind == "n":
+                value = _number(text)
+            elif kind == "b":
+                value = text == "1"
+            else:  # str (formula result), e (error), d (ISO date)
+                value = text
+        cells[col] = value
+    r = row.get("r")
+    return (int(r) if r else None), cells
+
+
+def _materialize(cells, width):
+    if not cells:
+        return (None,) * width
+    size = max(width, max(cells) + 1)
+    return tuple(cells.get(i) for i in range(size))
+
+
+_worker_shared_strings = None
+
+
+def _init_worker(shared_strings):
+    global _worker_shared_strings
+    _worker_shared_strings = shared_strings
+
+
+def _parse_chunk(args):
+    """Process-pool worker: parse a byte range of <row> elements wrapped in the sheet's root tag"""
+    root_open, root_close, chunk = args
+    root = fromstring(root_open + chunk + root_close)
+    return [_parse_row(row, _worker_shared_strings) for row in root.iter(ROW)]
+
+
+class XlsxReader:
+    """
+    Usage:
+        with XlsxReader(path) as reader:
+            for row in reader.iter_rows("Boundary Data"):
+                ...
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.zip = zipfile.ZipFile(path)
+        self._sheets = self._read_sheet_parts()
+        self._shared_strings = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.zip.close()
+
+    @property
+    def sheetnames(self):
+        return list(self._sheets)
+
+    def _read_sheet_parts(self):
+        rels = fromstring(self.zip.read("xl/_rels/workbook.xml.rels"))
+        targets = {}
+        for rel in rels.iter(PKG_REL_NS + "Relationship"):
+            target = rel.get("Target")
+            targets[rel.get("Id")] = target.lstrip("/") if target.startswith("/") else posixpath.join("xl", target)
+        workbook = fromstring(self.zip.read("xl/workbook.xml"))
+        return {s.get("name"): targets[s.get(REL_NS + "id")] for s in workbook.iter(MAIN_NS + "sheet")}
+
+    @property
+    def shared_strings(self):
+        """Loaded once per reader; every string cell is an index into this list"""
+        if self._shared_strings is None:
+            strings = []
+            if "xl/sharedStrings.xml" in self.zip.namelist():
+                with self.zip.open("xl/sharedStrings.xml") as f:
+                    for _, element in iterparse(f):
+                        if element.tag == SHARED_ITEM:
+                            strings.append(_text(element))
+                            element.clear()
+            self._shared_strings = strings
+        return self._shared_strings
+
+    def _part(self, sheet_name):
+        if sheet_name is None:
+            sheet_name = self.sheetnames[0]
+        if sheet_name not in self._sheets:
+            raise KeyError(f"Worksheet {sheet_name} does not exist")
+        return self._sheets[sheet_name]
+
+    def dimensions(self, sheet_name=None):
+        """(max_row, max_column) from the sheet's <dimension> element, or None if it has none"""
+        with self.zip.open(self._part(sheet_name)) as f:
+            head = f.read(64 * 1024)
+        match = re.search(rb'<(?:\w+:)?dimension ref="[A-Z]+\d+:([A-Z]+)(\d+)"', head)
+        if not match:
+            return None
+        return int(match.group(2)), column_index(match.group(1).decode()) + 1
+
+    def iter_rows(self, sheet_name=None, workers=0):
+        """Yield every row as a tuple of values; missing rows come back as all-None tuples"""
+        part = self._part(sheet_name)
+        dims = self.dimensions(sheet_name)
+        width = dims[1] if dims else 0
+        if workers and workers > 1 and self.zip.getinfo(part).file_size >= PARALLEL_MIN_BYTES:
+            parsed = self._parse_parallel(part, workers)
+        else:
+            parsed = self._parse_serial(part)
+
+        expected = 1
+        for number, cells in parsed:
+            number = number or expected
+            while expected < number:
+                yield (None,) * width
+                expected += 1
+            yield _materialize(cells, width)
+            expected = number + 1
+        if dims:
+            while expected <= dims[0]:
+                yield (None,) * width
+                expected += 1
+
+    def _parse_serial(self, part):
+        shared_strings = self.shared_strings
+        with self.zip.open(part) as f:
+            sheet_data = None
+            for event, element in iterparse(f, events=("start", "end")):
+                if event == "start":
+                    if sheet_data is None and element.tag == MAIN_NS + "sheetData":
+                        sheet_data = element
+                elif element.tag == ROW:
+                    yield _parse_row(element, shared_strings)
+                    # Drop parsed rows so memory does not grow with the length of the sheet
+                    sheet_data.clear()
+
+    def _parse_parallel(self, part, workers):
+        data = self.zip.read(part)
+        root_open = data[:re.search(rb"<(?:\w+:)?worksheet[\s>][^>]*>", data).end()]
+        root_name = re.match(rb"<((?:\w+:)?worksheet)", root_open[root_open.rindex(b"<"):]).group(1)
+        root_close = b"</" + root_name + b">"
+
+        start = data.index(b"sheetData")
+        start = _ROW_START.search(data, start).start()
+        end = data.rindex(b"sheetData>")
+        end = data.rindex(b"<", 0, end)
+
+        step = max(1, (end - start) // workers)
+        bounds = [start]
+        while bounds[-1] + step < end:
+            match = _ROW_START.search(data, bounds[-1] + step, end)
+            if not match:
+                break
+            bounds.append(match.start())
+        bounds.append(end)
+        chunks = [(root_open, root_close, data[a:b]) for a, b in zip(bounds, bounds[1:])]
+        del data
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.shared_strings,)) as pool:
+            for rows in pool.map(_parse_chunk, chunks):
+                yield from rows
+
+
+def iter_rows(path, sheet_name=None, workers=0):
+    """Convenience row source: open `path`, yield tuples from one sheet (default: first), close"""
+    with XlsxReader(path) as reader:
+        yield from reader.iter_rows(sheet_name, workers=workers)